@@ -7,18 +7,25 @@ main.py - Ponto de entrada da aplicação FastAPI
 - Serve frontend estático
 """
 
+import asyncio
+import json
+import time
 import traceback
 from pathlib import Path
-from fastapi import FastAPI, Request, UploadFile, File
+from fastapi import Depends, FastAPI, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
-from uuid import uuid4
-import shutil
+from pydantic import BaseModel, Field
 
 from app.utils.logger import logger
-from app.utils import config
-from app.services import stt_service, tts_service, summary_service
+from app.utils import config, executor, metrics
+from app.utils import artifact_store, audio_delivery, upload_ingest
+from app.utils.audio_decoder import AudioDecodeError
+from app.services import answer_service, job_service, streaming_service, summary_service, tts_service
+from app.services import model_manager, stt_router
+from app.services.bot_service import DEFAULT_QUESTIONS, FINAL_MESSAGE
+from app.routes import advance_interview, get_session_id, peek_interview, router
 
 # ------------------------
 # Criação da aplicação
@@ -72,85 +79,339 @@ async def health_check():
         "status": "ok",
         "env": config.ENVIRONMENT,
         "debug": config.DEBUG,
+        "pipeline": executor.stats(),
+        "tts_cache": tts_service.cache.stats(),
+        "tts": tts_service.stats(),
+        "summary": summary_service.stats(),
+        "llm": summary_service.client.stats(),
+        "stt_model": _stt_model_status(),
+        "stt_router": stt_router.stats(),
+        "artifacts": artifact_store.store.stats(),
+        "audio_delivery": audio_delivery.stats(),
     }
 
+def _stt_model_status() -> dict:
+    # Em modo processo o modelo vive nos workers; reporta o status de cada um
+    # (registrado pelo warmup e a cada transcrição)
+    if config.CPU_EXECUTOR == "process":
+        warmup = getattr(app.state, "stt_warmup", None)
+        return model_manager.manager.worker_summary(loading=warmup is not None and not warmup.done())
+    return model_manager.manager.status()
+
+# ------------------------
+# Ciclo de vida: warmup do modelo/cache TTS e encerramento dos pools
+# ------------------------
+async def _warmup_stt():
+    if config.CPU_EXECUTOR == "process":
+        # Um warmup por worker do pool (o pool pode repetir um worker: os demais
+        # aparecem na primeira transcrição); cada um carrega sua própria instância
+        results = await asyncio.gather(
+            *(executor.run_cpu(model_manager.warmup) for _ in range(config.CPU_WORKERS)),
+            return_exceptions=True,
+        )
+        for status in results:
+            if isinstance(status, dict):
+                model_manager.manager.record_worker_status(status)
+    else:
+        await executor.run_cpu(model_manager.warmup)
+
+@app.on_event("startup")
+async def warmup_stt_model():
+    if config.STT_WARMUP_ON_STARTUP:
+        # Em background: a API responde (e /api/health mostra "loading") durante a carga
+        app.state.stt_warmup = asyncio.create_task(_warmup_stt())
+
+@app.on_event("startup")
+async def prewarm_tts_cache():
+    if config.TTS_PREWARM:
+        texts = [*DEFAULT_QUESTIONS, answer_service.NEXT_QUESTION_TEXT, FINAL_MESSAGE]
+        # Em background: a API fica disponível enquanto o gTTS responde
+        app.state.tts_warmup = asyncio.create_task(executor.run_io(tts_service.warmup, texts))
+
+@app.on_event("startup")
+async def start_artifact_sweeper():
+    app.state.artifact_sweeper = asyncio.create_task(artifact_store.run_sweeper())
+
+@app.on_event("shutdown")
+async def shutdown_executors():
+    sweeper = getattr(app.state, "artifact_sweeper", None)
+    if sweeper is not None:
+        sweeper.cancel()
+    await summary_service.client.aclose()
+    executor.shutdown()
+
+# ------------------------
+# Métricas - GET /metrics (formato de texto do Prometheus)
+# ------------------------
+ANSWER_SECONDS = metrics.Histogram(
+    "sidekick_answer_seconds",
+    "Duração total do POST /answer (upload + pipeline), por status HTTP",
+    ("status",),
+)
+
+@app.get("/metrics", tags=["Health"], response_class=PlainTextResponse)
+async def read_metrics():
+    return PlainTextResponse(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+# ------------------------
+# Helpers
+# ------------------------
+def _busy_response(exc: executor.PipelineBusyError) -> JSONResponse:
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Servidor ocupado. Tente novamente em instantes."},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+_UPLOAD_ERRORS = (
+    upload_ingest.UploadTooLargeError,
+    upload_ingest.UnsupportedMediaError,
+    AudioDecodeError,
+)
+
+def _upload_error_response(exc: Exception) -> JSONResponse:
+    if isinstance(exc, upload_ingest.UploadTooLargeError):
+        status_code = 413
+    elif isinstance(exc, upload_ingest.UnsupportedMediaError):
+        status_code = 415
+    else:
+        status_code = 400
+    return JSONResponse(status_code=status_code, content={"detail": str(exc)})
+
 # ------------------------
 # Endpoint /answer - Recebe áudio e processa
 # ------------------------
-@app.post("/answer")
-async def answer(audio: UploadFile = File(...)):
+@app.post("/answer", openapi_extra=upload_ingest.OPENAPI_BODY)
+async def answer(request: Request, session_id: str = Depends(get_session_id)):
     """
-    Recebe o áudio enviado pelo frontend, processa:
-    1. Converte para WAV
+    Recebe o áudio enviado pelo frontend para a entrevista `session_id`
+    (header X-Session-Id ou ?session_id=) e processa:
+    1. Decodifica para PCM enquanto o upload chega (limite de tamanho e
+       formato verificados nos primeiros bytes)
     2. Transcreve (STT)
     3. Resume (GPT)
-    4. Retorna JSON com transcrição, resumo e arquivo de áudio da próxima pergunta
+    4. Em paralelo com 1-3, gera o áudio da próxima pergunta (TTS)
+    5. Só então avança a sessão: upload recusado, erro ou 503 não consomem
+       a pergunta
+    6. Retorna JSON com session_id, transcrição, resumo, arquivo de áudio
+       da próxima pergunta e o tempo de cada etapa
     """
+    start = time.perf_counter()
     try:
-        # ------------------------
-        # Pastas temporárias
-        # ------------------------
-        tmp_dir = Path("tmp")
-        audio_dir = tmp_dir / "audio"
-        audio_dir.mkdir(parents=True, exist_ok=True)
-
-        # ------------------------
-        # Salvar arquivo enviado
-        # ------------------------
-        original_ext = Path(audio.filename).suffix
-        input_path = audio_dir / f"input_{uuid4().hex}{original_ext}"
-        with open(input_path, "wb") as f:
-            shutil.copyfileobj(audio.file, f)
-
-        # ------------------------
-        # Converter para WAV
-        # ------------------------
-        from app.utils.config_ffmpeg import AudioSegment
-        wav_filename = f"response_{uuid4().hex}.wav"
-        wav_path = audio_dir / wav_filename
-
-        sound = AudioSegment.from_file(input_path)
-        sound.export(wav_path, format="wav")
-
-        # ------------------------
-        # Processamento STT e Summary
-        # ------------------------
-        transcription = stt_service.transcribe(str(wav_path))
-        summary = summary_service.summarize(transcription)
-
-        # ------------------------
-        # Próxima pergunta TTS
-        # ------------------------
-        next_question_text = "Qual sua experiência anterior?"
-        next_audio_filename = f"question_{uuid4().hex}.wav"
-        next_audio_path = audio_dir / next_audio_filename
-        tts_service.generate_audio(next_question_text, str(next_audio_path))
-
-        # ------------------------
-        # Retornar JSON
-        # ------------------------
-        return {
-            "transcription": transcription,
-            "summary": summary,
-            "next_question_audio": next_audio_filename
-        }
+        async with executor.admission():
+            next_question = await executor.run_io(peek_interview, session_id)
+            # O TTS da próxima pergunta roda enquanto o upload chega
+            result = await answer_service.process_answer(
+                upload_ingest.read_audio(request), next_question=next_question
+            )
+            await executor.run_io(advance_interview, session_id)
+        response = {"session_id": session_id, **result}
+        status_code = 200
+
+    except executor.PipelineBusyError as e:
+        logger.warning(f"/answer recusado por backpressure: {e}")
+        response = _busy_response(e)
+        status_code = response.status_code
+
+    except _UPLOAD_ERRORS as e:
+        logger.warning(f"/answer: upload recusado: {e}")
+        response = _upload_error_response(e)
+        status_code = response.status_code
 
     except Exception as e:
         logger.error(f"Erro ao processar /answer: {e}")
-        return JSONResponse(
+        metrics.ERRORS.inc(component="answer")
+        response = JSONResponse(
             status_code=500,
             content={"detail": "Erro ao processar áudio."}
         )
+        status_code = 500
+
+    ANSWER_SECONDS.observe(time.perf_counter() - start, status=str(status_code))
+    return response
+
+# ------------------------
+# Jobs assíncronos - /jobs/answer e /jobs/{id}
+# ------------------------
+@app.post("/jobs/answer", status_code=202, openapi_extra=upload_ingest.OPENAPI_BODY)
+async def submit_answer_job(request: Request):
+    """
+    Recebe o áudio e retorna o id do job assim que o upload termina.
+    O pipeline roda em background; consulte GET /jobs/{job_id}.
+    """
+    try:
+        job_service.check_capacity()
+        audio = await upload_ingest.read_audio(request)
+        job_id = await job_service.submit(audio)
+    except job_service.JobQueueFullError as e:
+        logger.warning(f"/jobs/answer recusado: {e}")
+        return _busy_response(executor.PipelineBusyError(config.RETRY_AFTER_SECONDS))
+    except _UPLOAD_ERRORS as e:
+        logger.warning(f"/jobs/answer: upload recusado: {e}")
+        return _upload_error_response(e)
+    return {"job_id": job_id, "status": "queued"}
+
+@app.get("/jobs/{job_id}")
+async def get_answer_job(job_id: str):
+    job = await executor.run_io(job_service.get, job_id)
+    if job is None:
+        return JSONResponse(status_code=404, content={"detail": "Job não encontrado"})
+    return job
+
+# ------------------------
+# Resumo em streaming - POST /summary/stream (Server-Sent Events)
+# ------------------------
+class SummaryRequest(BaseModel):
+    text: str
+    max_tokens: int = Field(default=100, ge=1, le=1000)
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@app.post("/summary/stream")
+async def stream_summary(body: SummaryRequest):
+    """
+    Resume o texto enviando cada pedaço assim que é gerado:
+    - event "token": {"text": pedaço}
+    - event "done": {"summary": resumo completo}
+    - event "error": {"detail": ...}
+    """
+    async def events():
+        parts = []
+        try:
+            async for delta in summary_service.stream_summary(body.text, body.max_tokens):
+                parts.append(delta)
+                yield _sse("token", {"text": delta})
+            yield _sse("done", {"summary": "".join(parts).strip()})
+        except Exception as e:
+            logger.error(f"Erro no stream de resumo: {e}")
+            yield _sse("error", {"detail": "Erro ao gerar resumo."})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+# ------------------------
+# WebSocket /ws/transcribe - Transcrição incremental
+# ------------------------
+async def _send_summary_stream(websocket: WebSocket, text: str):
+    parts = []
+    try:
+        async for delta in summary_service.stream_summary(text):
+            parts.append(delta)
+            await websocket.send_json({"type": "summary_delta", "text": delta})
+    except WebSocketDisconnect:
+        raise
+    except Exception as e:
+        logger.warning(f"Falha no stream de resumo: {e}")
+    await websocket.send_json({"type": "summary", "text": "".join(parts).strip()})
+
+async def _next_question_message(session_id: str) -> dict:
+    question, bot = await executor.run_io(advance_interview, session_id)
+    try:
+        path = await executor.run_io(tts_service.generate_audio, question)
+    except Exception as e:
+        logger.warning(f"Falha no TTS da próxima pergunta: {e}")
+        path = None
+    return {
+        "type": "next_question",
+        "session_id": session_id,
+        "question": question,
+        "finished": bot.is_finished(),
+        "next_question_audio": Path(path).name if path else "",
+    }
+
+async def _close_stream_with_error(websocket: WebSocket, detail: str, code: int):
+    """Avisa o cliente da falha antes de fechar (ele pode já ter desconectado)."""
+    try:
+        await websocket.send_json({"type": "error", "detail": detail})
+        await websocket.close(code=code)
+    except Exception:
+        pass
+
+@app.websocket("/ws/transcribe")
+async def transcribe_stream(websocket: WebSocket, session_id: str = Depends(get_session_id)):
+    """
+    Protocolo (substitui o POST /answer quando o streaming está disponível):
+    - cliente envia mensagens binárias com os chunks do MediaRecorder;
+    - servidor responde {"type": "partial", "text": ...} conforme transcreve;
+    - cliente envia o texto "stop"; servidor responde {"type": "final", ...};
+    - em seguida o resumo chega em pedaços {"type": "summary_delta", "text": ...}
+      e por fim {"type": "summary", "text": resumo completo};
+    - por último {"type": "next_question", "question": ..., "next_question_audio": ...}
+      com a pergunta seguinte da sessão (X-Session-Id ou ?session_id=).
+    Em caso de falha (limite de UPLOAD_MAX_BYTES, áudio inválido, erro na
+    transcrição) o servidor envia {"type": "error", "detail": ...} e fecha.
+    """
+    await websocket.accept()
+    pending = set()
+
+    async def send_partial(task):
+        try:
+            text = await task
+            await websocket.send_json({"type": "partial", "text": text})
+        except Exception as e:
+            logger.warning(f"Falha ao enviar transcrição parcial: {e}")
+
+    try:
+        async with streaming_service.open_session() as session:
+            while True:
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    logger.info("Cliente desconectou do streaming")
+                    return
+                if message.get("bytes"):
+                    task = await session.feed(message["bytes"])
+                    if task is not None:
+                        sender = asyncio.create_task(send_partial(task))
+                        pending.add(sender)
+                        sender.add_done_callback(pending.discard)
+                elif message.get("text") == "stop":
+                    text = await session.finish()
+                    await asyncio.gather(*pending, return_exceptions=True)
+                    await websocket.send_json({"type": "final", "text": text})
+                    # O TTS da próxima pergunta roda enquanto o resumo é enviado
+                    next_question = asyncio.create_task(_next_question_message(session_id))
+                    try:
+                        await _send_summary_stream(websocket, text)
+                        await websocket.send_json(await next_question)
+                    finally:
+                        next_question.cancel()
+                    await websocket.close()
+                    return
+
+    except streaming_service.StreamLimitError as e:
+        logger.warning(f"Streaming recusado: {e}")
+        await websocket.close(code=1013)
+    except WebSocketDisconnect:
+        logger.info("Cliente desconectou do streaming")
+    except streaming_service.StreamTooLargeError as e:
+        logger.warning(f"Streaming encerrado: {e}")
+        await _close_stream_with_error(websocket, str(e), code=1009)
+    except AudioDecodeError as e:
+        logger.warning(f"Áudio inválido no streaming: {e}")
+        await _close_stream_with_error(websocket, "Não foi possível decodificar o áudio", code=1007)
+    except Exception as e:
+        logger.error(f"Erro no streaming: {e}")
+        await _close_stream_with_error(websocket, "Erro interno ao transcrever", code=1011)
 
 # ------------------------
 # Endpoint para servir áudio da próxima pergunta
 # ------------------------
 @app.get("/play_audio/{filename}")
-async def play_audio(filename: str):
-    file_path = Path("tmp") / "audio" / filename
-    if file_path.exists():
-        return FileResponse(file_path, media_type="audio/wav")
-    return JSONResponse(status_code=404, content={"detail": "Arquivo de áudio não encontrado"})
+async def play_audio(filename: str, request: Request):
+    file_path = audio_delivery.resolve(Path(config.TTS_CACHE_DIR), filename)
+    if file_path is None:
+        return JSONResponse(status_code=404, content={"detail": "Arquivo de áudio não encontrado"})
+    artifact_store.store.touch(str(file_path))
+    return await audio_delivery.build_response(request, file_path)
+
+# ------------------------
+# Rotas da entrevista por sessão (/health, /next_question)
+# ------------------------
+app.include_router(router)
 
 # ------------------------
 # Servir frontend estático
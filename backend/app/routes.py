@@ -1,23 +1,40 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, status
-from fastapi.responses import FileResponse
-from pathlib import Path
+from typing import Optional
+from fastapi import APIRouter, Depends, Header
+from app.services import session_service
 from app.services.bot_service import InterviewBot
 from app.utils.logger import logger
-from pydub import AudioSegment  # <- para conversão webm → wav
-import tempfile
-
-# Inicializa o bot (perguntas padrão)
-bot = InterviewBot()
 
 # Criação do roteador do FastAPI
+# (/answer e /play_audio ficam em main.py e usam get_session_id/peek_interview/advance_interview)
 router = APIRouter()
 
-# Diretório temporário para salvar arquivos de áudio
-TMP_DIR = Path("tmp")
-TMP_DIR.mkdir(parents=True, exist_ok=True)
 
-# Define tamanho máximo de arquivo de áudio (5MB)
-MAX_FILE_SIZE = 5 * 1024 * 1024
+def get_session_id(
+    x_session_id: Optional[str] = Header(default=None),
+    session_id: Optional[str] = None,
+) -> str:
+    """
+    Identifica a entrevista pelo header X-Session-Id ou ?session_id=.
+    Sem nenhum dos dois, uma nova sessão é criada.
+    """
+    return x_session_id or session_id or session_service.new_session_id()
+
+
+def peek_interview(session_id: str) -> str:
+    """Próxima pergunta da sessão, sem avançar (a resposta ainda pode falhar)."""
+    return InterviewBot(state=session_service.get(session_id)).peek_next_question()
+
+
+def advance_interview(session_id: str):
+    """Avança a pergunta da sessão atomicamente; retorna (pergunta, bot)."""
+    bot_holder = {}
+
+    def next_question(state):
+        bot_holder["bot"] = InterviewBot(state=state)
+        return bot_holder["bot"].get_next_question()
+
+    question, _ = session_service.advance(session_id, next_question)
+    return question, bot_holder["bot"]
 
 
 @router.get("/health", tags=["Health"], summary="Verifica se a API está rodando")
@@ -27,84 +44,12 @@ async def health_check():
 
 
 @router.get("/next_question", tags=["Interview"], summary="Retorna a próxima pergunta do bot")
-def get_next_question():
-    question = bot.get_next_question()
-    logger.info(f"Próxima pergunta: {question}")
+def get_next_question(session_id: str = Depends(get_session_id)):
+    question, bot = advance_interview(session_id)
+    logger.info(f"[{session_id}] Próxima pergunta: {question}")
     return {
+        "session_id": session_id,
         "question": question,
-        "question_index": bot.current_index,
+        "question_index": bot.current_question_index,
         "finished": bot.is_finished()
     }
-
-
-@router.post("/answer", tags=["Interview"], summary="Envia a resposta do usuário")
-async def answer_question(audio: UploadFile = File(...)):
-    logger.info(f"Recebido arquivo de áudio: {audio.filename} ({audio.content_type})")
-
-    # Valida tipo de arquivo
-    if audio.content_type not in ["audio/wav", "audio/mpeg", "audio/mp3", "audio/webm"]:
-        logger.warning(f"Tipo de arquivo inválido: {audio.content_type}")
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Tipo de arquivo não suportado: {audio.content_type}"
-        )
-
-    # Valida tamanho do arquivo
-    if audio.spool_max_size > MAX_FILE_SIZE:
-        logger.warning(f"Arquivo muito grande: {audio.filename}")
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Arquivo muito grande (máx. 5MB)"
-        )
-
-    try:
-        # Se for WEBM → converter para WAV antes de processar
-        if audio.content_type == "audio/webm":
-            logger.info("Convertendo arquivo WEBM para WAV...")
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".webm") as tmp_webm:
-                tmp_webm.write(await audio.read())
-                tmp_webm.flush()
-                wav_path = tmp_webm.name.replace(".webm", ".wav")
-
-                AudioSegment.from_file(tmp_webm.name, format="webm").export(wav_path, format="wav")
-
-            with open(wav_path, "rb") as f:
-                result = bot.process_response(f)
-
-        else:
-            # Para arquivos já em WAV/MP3
-            result = bot.process_response(audio.file)
-
-        logger.info("Áudio processado com sucesso")
-
-    except Exception as e:
-        logger.error(f"Erro ao processar áudio: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Erro ao processar áudio: {str(e)}"
-        )
-
-    return {
-        "transcription": result.get("transcription"),
-        "summary": result.get("summary"),
-        "next_question_audio": result.get("next_question_audio")
-    }
-
-
-@router.get("/play_audio/{audio_filename}", tags=["Interview"], summary="Baixa ou reproduz um áudio gerado")
-def play_audio(audio_filename: str):
-    audio_path = TMP_DIR / audio_filename
-
-    if not audio_path.exists():
-        logger.warning(f"Arquivo não encontrado: {audio_filename}")
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Arquivo não encontrado"
-        )
-
-    logger.info(f"Reproduzindo arquivo de áudio: {audio_filename}")
-    return FileResponse(
-        path=audio_path,
-        filename=audio_filename,
-        media_type="audio/mpeg"
-    )
@@ -0,0 +1,166 @@
+"""
+serve.py - Vários workers da API com um único carregamento do modelo STT
+------------------------------------------------------------------------
+`uvicorn --workers N` cria os workers com spawn: cada um importa a API e
+carrega sua própria cópia do Whisper (centenas de MB por worker). Aqui:
+1. O processo pai importa a API e carrega os modelos (model_manager.warmup,
+   inclusive os tamanhos de STT_ROUTE_MODELS).
+2. gc.freeze() move os objetos já criados para a geração permanente: o
+   coletor dos filhos não escreve nos cabeçalhos deles e as páginas
+   continuam compartilhadas.
+3. O pai abre o socket e faz fork de N workers uvicorn, que herdam o modelo
+   por copy-on-write (os pesos só são lidos na inferência) e aceitam
+   conexões no mesmo socket.
+4. O pai supervisiona: recria workers que morrerem e repassa SIGTERM/SIGINT.
+
+Cada worker roda o STT em threads (CPU_EXECUTOR=thread, CPU_WORKERS
+threads por worker): um pool de processos com spawn recarregaria o modelo.
+Motores que não sobrevivem ao fork (faster-whisper) são carregados em cada
+worker; para eles, STT_MMAP_WEIGHTS não se aplica e a memória não é dividida.
+
+Uso (a partir de backend/):
+    python -m app.serve --workers 4 --port 8000
+    python -m app.serve --workers 4 --no-preload   # comparação: uma cópia por worker
+"""
+
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+
+# Reinício de workers que morrem logo após o fork (evita loop de fork)
+_RESTART_BACKOFF_SECONDS = 1.0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Workers da API com o modelo STT compartilhado")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument(
+        "--no-preload", dest="preload", action="store_false",
+        help="cada worker carrega o próprio modelo (para comparar a memória)",
+    )
+    parser.add_argument("--log-level", default="info")
+    return parser.parse_args(argv)
+
+
+def _configure(preload: bool):
+    """Ajusta o ambiente antes do import da API (a configuração é lida no import)."""
+    os.environ.setdefault("CPU_EXECUTOR", "thread")
+    if preload:
+        os.environ["STT_PRELOAD"] = "true"
+    else:
+        # Sem preload, cada worker carrega o modelo antes de aceitar conexões
+        os.environ.setdefault("STT_WARMUP_ON_STARTUP", "false")
+
+
+def _preload(logger) -> bool:
+    from app.services import model_manager
+    from app.services.stt_engines import ENGINES
+    from app.utils import config
+
+    if not ENGINES[config.STT_ENGINE].fork_safe:
+        logger.warning(f"Motor STT '{config.STT_ENGINE}' não sobrevive ao fork: cada worker carrega o seu")
+        return False
+    if config.CPU_EXECUTOR == "process" and config.CPU_START_METHOD != "fork":
+        logger.warning("CPU_EXECUTOR=process com spawn: o pool de cada worker carregará o modelo de novo")
+    status = model_manager.warmup()
+    logger.info(f"Modelo STT carregado no processo pai: {status}")
+    return status.get("state") == "ready"
+
+
+def _bind(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _run_worker(app, sock: socket.socket, args, preloaded: bool):
+    """Corpo do processo filho: serve a API no socket herdado."""
+    import uvicorn
+    from app.services import model_manager
+
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    if preloaded:
+        model_manager.after_fork()
+    else:
+        model_manager.warmup()
+    server = uvicorn.Server(uvicorn.Config(app, log_level=args.log_level))
+    server.run(sockets=[sock])
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    _configure(args.preload)
+
+    from app.main import app
+    from app.utils.logger import logger
+
+    preloaded = args.preload and _preload(logger)
+    gc.collect()
+    gc.freeze()
+
+    sock = _bind(args.host, args.port)
+    logger.info(
+        f"Servindo em {args.host}:{args.port} com {args.workers} workers "
+        f"({'modelo compartilhado' if preloaded else 'um modelo por worker'}, pai {os.getpid()})"
+    )
+
+    children = {}  # pid -> (índice, instante do fork)
+    stopping = False
+
+    def spawn(index: int):
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                _run_worker(app, sock, args, preloaded)
+            except BaseException:
+                logger.exception(f"Worker {index} falhou")
+                code = 1
+            finally:
+                os._exit(code)
+        children[pid] = (index, time.monotonic())
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    for index in range(args.workers):
+        spawn(index)
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        index, started = children.pop(pid, (None, 0.0))
+        if index is None or stopping:
+            continue
+        logger.warning(f"Worker {index} (pid {pid}) saiu com status {status}, recriando")
+        if time.monotonic() - started < _RESTART_BACKOFF_SECONDS:
+            time.sleep(_RESTART_BACKOFF_SECONDS)
+        spawn(index)
+
+    sock.close()
+    logger.info("Workers encerrados")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
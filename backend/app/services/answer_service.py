@@ -0,0 +1,149 @@
+"""
+Answer Service - Pipeline de processamento de respostas
+-------------------------------------------------------
+Orquestra as etapas usadas por /answer e pelos jobs assíncronos como um
+grafo de dependências (app.utils.task_graph):
+
+    decode → vad → stt → summary
+    tts (próxima pergunta, sem dependências: começa junto com o request)
+
+1. decode: recebe/decodifica o áudio para PCM 16 kHz em memória.
+2. vad: remove silêncios (início, fim e pausas longas).
+3. stt: transcreve só a fala (Whisper, pool de processos); respostas
+   longas em pedaços paralelos (app.services.stt_chunker) e, com
+   STT_ROUTE_MODELS, o tamanho do modelo escolhido por app.services.stt_router.
+4. summary: resume a transcrição (GPT).
+5. tts: gera o áudio da próxima pergunta (não depende da transcrição).
+6. archive (com ANSWER_ARCHIVE): guarda a resposta em Opus/OGG
+   (ANSWER_ARCHIVE_CODEC), ~10x menor que WAV, em paralelo com vad/stt.
+
+A latência total é a do ramo mais longo; o tempo de cada etapa volta
+em `timings` (ms). Cada etapa roda fora do event loop via app.utils.executor.
+"""
+
+import inspect
+import logging
+import os
+import uuid
+from pathlib import Path
+
+import numpy as np
+
+from app.services import stt_router, tts_service, summary_service, vad_service
+from app.utils import audio_encoder, config, executor, metrics
+from app.utils.artifact_store import store as artifact_store
+from app.utils.audio_decoder import SAMPLE_RATE, decode_bytes
+from app.utils.task_graph import TaskGraph
+
+logger = logging.getLogger(__name__)
+
+STAGES = ("decode", "vad", "stt", "summary", "tts")
+
+NEXT_QUESTION_TEXT = "Qual sua experiência anterior?"
+
+
+def archive_answer(audio: np.ndarray) -> str:
+    """
+    Guarda o PCM da resposta em TTS_CACHE_DIR (servido pelo /play_audio)
+    com ANSWER_ARCHIVE_CODEC. Retorna o nome do arquivo ("" se falhar).
+    """
+    codec = config.ANSWER_ARCHIVE_CODEC
+    filename = f"answer_{uuid.uuid4().hex}.{audio_encoder.extension(codec)}"
+    path = os.path.join(config.TTS_CACHE_DIR, filename)
+    try:
+        audio_encoder.encode_pcm(audio, path, codec)
+    except audio_encoder.AudioEncodeError as e:
+        logger.error(f"Erro ao arquivar resposta: {e}")
+        metrics.ERRORS.inc(component="archive")
+        return ""
+    artifact_store.register(path)
+    logger.info(f"Resposta arquivada: {filename} ({os.path.getsize(path)} bytes)")
+    return filename
+
+
+async def process_answer(data, on_stage=None, next_question: str = NEXT_QUESTION_TEXT) -> dict:
+    """
+    Executa o pipeline completo sobre o áudio enviado.
+
+    Parâmetros:
+    ----------
+    data : bytes | np.ndarray | awaitable
+        Conteúdo do arquivo de áudio enviado pelo cliente (qualquer
+        container suportado pelo ffmpeg via pipe), o PCM já decodificado,
+        ou uma coroutine que o produz (ex.: upload_ingest.read_audio) —
+        nesse caso o upload é recebido enquanto o TTS já está rodando.
+    on_stage : coroutine function, opcional
+        Callback `await on_stage(stage, status)` chamado com status
+        "running", "done" ou "error" a cada etapa (usado pelos jobs).
+    next_question : str, opcional
+        Texto da próxima pergunta a sintetizar.
+
+    Retorna:
+    -------
+    dict
+        transcription, summary, next_question_audio, vad (segundos de
+        fala/silêncio removido, ou None se o VAD estiver desligado) e
+        timings (ms por etapa), stt_model (modelo que transcreveu) e
+        answer_audio (resposta arquivada, ou None sem ANSWER_ARCHIVE).
+    """
+    async def decode():
+        if inspect.isawaitable(data):
+            audio = await data
+        else:
+            audio = data
+        if not isinstance(audio, np.ndarray):
+            audio = await executor.run_io(decode_bytes, audio)
+        logger.info(f"Áudio decodificado: {len(audio) / SAMPLE_RATE:.1f}s")
+        return audio
+
+    async def vad(decode):
+        # Só a fala segue para o STT
+        if not config.VAD_ENABLED:
+            return {"audio": decode, "stats": None}
+        result = await executor.run_io(vad_service.trim_silence, decode)
+        return {"audio": result["audio"], "stats": vad_service.stats(result)}
+
+    async def stt(vad):
+        # Micro-batch no pool de processos (ou pedaços paralelos, se longo)
+        if not len(vad["audio"]):
+            logger.info("Nenhuma fala detectada, STT ignorado")
+            return {"text": "", "model": None}
+        return await stt_router.transcribe(vad["audio"], len(vad["audio"]) / SAMPLE_RATE)
+
+    async def summary(stt):
+        return await summary_service.summarize_async(stt["text"])
+
+    async def archive(decode):
+        return await executor.run_io(archive_answer, decode) if len(decode) else ""
+
+    async def tts():
+        path = await executor.run_io(tts_service.generate_audio, next_question)
+        return Path(path).name if path else ""
+
+    graph = TaskGraph(on_stage)
+    graph.add("tts", tts)
+    graph.add("decode", decode)
+    graph.add("vad", vad, deps=("decode",))
+    graph.add("stt", stt, deps=("vad",))
+    graph.add("summary", summary, deps=("stt",))
+    if config.ANSWER_ARCHIVE:
+        graph.add("archive", archive, deps=("decode",))
+    try:
+        results = await graph.run()
+    finally:
+        if inspect.iscoroutine(data):
+            # Garante que a coroutine do upload não fique sem ser aguardada
+            data.close()
+        for stage, ms in graph.timings.items():
+            metrics.STAGE_SECONDS.observe(ms / 1000, pipeline="answer", stage=stage)
+
+    logger.info(f"Pipeline concluído em {graph.timings} ms")
+    return {
+        "transcription": results["stt"]["text"],
+        "summary": results["summary"],
+        "next_question_audio": results["tts"],
+        "vad": results["vad"]["stats"],
+        "timings": graph.timings,
+        "stt_model": results["stt"]["model"],
+        "answer_audio": results.get("archive") or None,
+    }
@@ -4,50 +4,92 @@ Bot Service - Orquestração da Entrevista
 Responsável por conduzir o fluxo da entrevista de forma automatizada:
 1. Faz a pergunta ao usuário.
 2. Recebe o áudio de resposta.
-3. Converte para WAV (compatibilidade STT).
-4. Transcreve o áudio (STT).
+3. Decodifica para PCM 16 kHz em memória (sem WAV intermediário).
+4. Remove silêncios (VAD) e transcreve só a fala (STT).
 5. Resume a resposta (GPT).
-6. Gera a próxima pergunta em áudio (TTS).
-7. Retorna o áudio e o resumo.
+6. Gera a próxima pergunta em áudio (TTS) — em paralelo com 3-5, já que
+   não depende da transcrição.
+7. Retorna o áudio, o resumo e o tempo de cada etapa.
+
+Com ANSWER_ARCHIVE, a resposta também é guardada comprimida (Opus/OGG,
+answer_service.archive_answer) em vez de PCM WAV.
+
+O pipeline assíncrono equivalente (usado pelas rotas) fica em answer_service.
 """
 
 import logging
+import time
 from pathlib import Path
-from datetime import datetime
-from uuid import uuid4
-import warnings
 
-# Ignora warnings específicos do PyDub sobre ffmpeg
-warnings.filterwarnings("ignore", message="Couldn't find ffmpeg or avconv.*")
+import numpy as np
 
-from app.services import stt_service, tts_service, summary_service
-from app.utils.config_ffmpeg import AudioSegment
+from app.services import answer_service, stt_service, tts_service, summary_service, vad_service
+from app.services.session_service import InterviewState
+from app.utils import config, executor, metrics
+from app.utils.audio_decoder import SAMPLE_RATE, decode_bytes
 
 logger = logging.getLogger(__name__)
 
-TMP_DIR = Path("tmp")
-TMP_DIR.mkdir(parents=True, exist_ok=True)
+DEFAULT_QUESTIONS = [
+    "Olá! Pode se apresentar brevemente?",
+    "Quais são seus pontos fortes?",
+    "Quais são seus pontos de melhoria?",
+    "Fale sobre um projeto recente que você desenvolveu.",
+    "Por que você quer trabalhar conosco?"
+]
+
+FINAL_MESSAGE = "Obrigado pela participação!"
+
+
+def _timed(timings: dict, stage: str, func, *args):
+    start = time.perf_counter()
+    try:
+        return func(*args)
+    finally:
+        elapsed = time.perf_counter() - start
+        timings[stage] = round(elapsed * 1000, 1)
+        metrics.STAGE_SECONDS.observe(elapsed, pipeline="bot", stage=stage)
+
+
+def _generate_question_audio(timings: dict, question: str) -> str:
+    try:
+        # Perguntas fixas → servidas do cache TTS com nome estável
+        path = _timed(timings, "tts", tts_service.generate_audio, question)
+        return Path(path).name if path else ""
+    except Exception as e:
+        logger.error(f"Erro ao gerar áudio TTS: {e}")
+        metrics.ERRORS.inc(component="tts")
+        return ""
 
 class InterviewBot:
     """
     Classe que representa o bot de entrevista.
-    Mantém estado simples da conversa e orquestra serviços.
+    Orquestra serviços; o estado da conversa fica em um InterviewState
+    (por sessão, ver session_service), não no bot.
     """
-    def __init__(self, questions=None):
+    def __init__(self, questions=None, state=None):
         if questions is None:
-            self.questions = [
-                "Olá! Pode se apresentar brevemente?",
-                "Quais são seus pontos fortes?",
-                "Quais são seus pontos de melhoria?",
-                "Fale sobre um projeto recente que você desenvolveu.",
-                "Por que você quer trabalhar conosco?"
-            ]
+            self.questions = list(DEFAULT_QUESTIONS)
         else:
             self.questions = questions
 
-        self.current_question_index = 0
+        self.state = state if state is not None else InterviewState(session_id="local")
         logger.info("InterviewBot inicializado com perguntas padrão")
 
+    @property
+    def current_question_index(self) -> int:
+        return self.state.question_index
+
+    @current_question_index.setter
+    def current_question_index(self, value: int):
+        self.state.question_index = value
+
+    def peek_next_question(self) -> str:
+        """Próxima pergunta, sem avançar o estado."""
+        if self.current_question_index < len(self.questions):
+            return self.questions[self.current_question_index]
+        return FINAL_MESSAGE
+
     def get_next_question(self) -> str:
         if self.current_question_index < len(self.questions):
             question = self.questions[self.current_question_index]
@@ -56,37 +98,67 @@ class InterviewBot:
             return question
         else:
             logger.info("Todas as perguntas foram feitas")
-            return "Obrigado pela participação!"
+            return FINAL_MESSAGE
+
+    def is_finished(self) -> bool:
+        return self.current_question_index >= len(self.questions)
+
+    def process_response(self, audio_file, next_question: str = None) -> dict:
+        """
+        `audio_file` pode ser um caminho, um objeto file-like (ex.: UploadFile.file)
+        ou o PCM já decodificado (np.ndarray, ver app.utils.upload_ingest).
 
-    def process_response(self, audio_file: str) -> dict:
+        `next_question` permite que o chamador já tenha avançado a sessão
+        (de forma atômica no store); se omitido, o bot avança o próprio estado.
+        """
         logger.info("Processando resposta do usuário")
 
-        wav_filename = f"response_{datetime.now().strftime('%Y%m%d%H%M%S')}_{uuid4().hex}.wav"
-        wav_path = TMP_DIR / wav_filename
+        advance = next_question is None
+        if advance:
+            next_question = self.peek_next_question()
+        timings = {}
+        # O TTS não depende da resposta: começa antes da decodificação (pool de I/O)
+        tts_future = executor.submit_io(_generate_question_audio, timings, next_question)
 
         try:
-            audio = AudioSegment.from_file(audio_file)
-            audio.export(wav_path, format="wav", codec="pcm_s16le")
-            logger.info(f"Áudio convertido para WAV em: {wav_path}")
-        except Exception as e:
-            logger.error(f"Erro ao converter áudio: {e}")
-            raise
+            if isinstance(audio_file, np.ndarray):
+                audio = audio_file
+            else:
+                if hasattr(audio_file, "read"):
+                    data = audio_file.read()
+                else:
+                    data = Path(audio_file).read_bytes()
 
-        transcription = stt_service.transcribe(str(wav_path))
-        logger.info(f"Transcrição obtida: {transcription[:50]}...")
+                try:
+                    audio = _timed(timings, "decode", decode_bytes, data)
+                    logger.info(f"Áudio decodificado: {len(audio) / SAMPLE_RATE:.1f}s")
+                except Exception as e:
+                    logger.error(f"Erro ao decodificar áudio: {e}")
+                    metrics.ERRORS.inc(component="decode")
+                    raise
 
-        summary = summary_service.summarize(transcription)
-        logger.info(f"Resumo gerado: {summary[:50]}...")
+            answer_audio = None
+            if config.ANSWER_ARCHIVE and len(audio):
+                answer_audio = _timed(timings, "archive", answer_service.archive_answer, audio) or None
 
-        next_question = self.get_next_question()
-        try:
-            audio_path = tts_service.generate_audio(next_question)
-        except Exception as e:
-            logger.error(f"Erro ao gerar áudio TTS: {e}")
-            audio_path = ""
+            if config.VAD_ENABLED:
+                audio = _timed(timings, "vad", vad_service.trim_silence, audio)["audio"]
+
+            transcription = _timed(timings, "stt", stt_service.transcribe, audio) if len(audio) else ""
+            logger.info(f"Transcrição obtida: {transcription[:50]}...")
+
+            summary = _timed(timings, "summary", summary_service.summarize, transcription)
+            logger.info(f"Resumo gerado: {summary[:50]}...")
+        finally:
+            audio_path = tts_future.result()
+
+        if advance:
+            self.get_next_question()
 
         return {
             "transcription": transcription,
             "summary": summary,
-            "next_question_audio": audio_path
+            "next_question_audio": audio_path,
+            "timings": timings,
+            "answer_audio": answer_audio,
         }
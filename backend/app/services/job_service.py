@@ -0,0 +1,123 @@
+"""
+Job Service - Processamento assíncrono de respostas
+---------------------------------------------------
+Permite enviar um áudio e consultar o resultado depois, sem manter a
+conexão HTTP aberta durante todo o pipeline:
+1. submit() registra o job e dispara o pipeline em background.
+2. O status de cada etapa (decode, vad, stt, summary, tts) é gravado no store.
+3. O cliente consulta GET /jobs/{id} até o status "done" ou "error".
+
+Os jobs ficam em um store plugável com expiração por TTL
+(app.utils.ttl_store, JOB_STORE=memory|sqlite). As gravações no store
+rodam no pool de I/O: com SQLite elas bloqueariam o event loop.
+"""
+
+import asyncio
+import logging
+import time
+from uuid import uuid4
+
+from app.services import answer_service
+from app.utils import config, executor, metrics, ttl_store
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueueFullError(Exception):
+    """Muitos jobs aguardando; o cliente deve tentar novamente."""
+
+
+store = ttl_store.create_store(
+    config.JOB_STORE, config.JOB_TTL_SECONDS, config.JOB_DB_PATH, table="jobs"
+)
+
+# ------------------------
+# Execução dos jobs
+# ------------------------
+_semaphore = None
+_tasks = set()
+
+ACTIVE_JOBS = metrics.Gauge(
+    "sidekick_jobs_active",
+    "Jobs enfileirados ou em execução (JOB_MAX_QUEUED é o limite)",
+    fn=lambda: len(_tasks),
+)
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(config.JOB_CONCURRENCY)
+    return _semaphore
+
+
+def _new_job() -> dict:
+    now = time.time()
+    return {
+        "id": uuid4().hex,
+        "status": "queued",
+        "stages": {stage: "pending" for stage in answer_service.STAGES},
+        "result": None,
+        "error": None,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+async def _run(job: dict, data):
+    # Etapas paralelas gravam em sequência: uma cópia antiga nunca sobrescreve a mais nova
+    save_lock = asyncio.Lock()
+
+    async def save():
+        async with save_lock:
+            snapshot = {**job, "stages": dict(job["stages"])}
+            await executor.run_io(store.set, job["id"], snapshot)
+
+    async def on_stage(stage: str, status: str):
+        job["stages"][stage] = status
+        job["updated_at"] = time.time()
+        await save()
+
+    async with _get_semaphore():
+        job["status"] = "running"
+        await save()
+        try:
+            job["result"] = await answer_service.process_answer(data, on_stage)
+            job["status"] = "done"
+            logger.info(f"Job {job['id']} concluído")
+        except Exception as e:
+            job["status"] = "error"
+            job["error"] = str(e)
+            logger.error(f"Job {job['id']} falhou: {e}")
+            metrics.ERRORS.inc(component="job")
+        job["updated_at"] = time.time()
+        await save()
+
+
+def check_capacity():
+    """Levanta JobQueueFullError se não houver vaga (antes de receber o upload)."""
+    if len(_tasks) >= config.JOB_MAX_QUEUED:
+        raise JobQueueFullError(f"{len(_tasks)} jobs em andamento")
+
+
+async def submit(data) -> str:
+    """
+    Registra um job para o áudio recebido (bytes ou PCM já decodificado)
+    e inicia o pipeline em background. Retorna o id do job.
+    """
+    check_capacity()
+
+    await executor.run_io(store.purge_expired)
+    job = _new_job()
+    await executor.run_io(store.set, job["id"], job)
+
+    task = asyncio.create_task(_run(job, data))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+    logger.info(f"Job {job['id']} enfileirado")
+    return job["id"]
+
+
+def get(job_id: str):
+    """Retorna o job (ou None se não existir/expirou)."""
+    return store.get(job_id)
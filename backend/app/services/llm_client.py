@@ -0,0 +1,427 @@
+"""
+LLM Client - Cliente HTTP para a API de chat da OpenAI
+------------------------------------------------------
+Substitui a chamada bloqueante `openai.Completion.create` (sem timeout):
+- Conexões HTTP reaproveitadas (httpx com pool, LLM_MAX_CONNECTIONS).
+- Timeout por tentativa (LLM_TIMEOUT_SECONDS) e prazo total da chamada
+  (LLM_DEADLINE_SECONDS), então o /answer nunca fica preso no upstream.
+- Retries limitados (LLM_MAX_RETRIES) só para erros transitórios
+  (rede, 429, 5xx), com backoff exponencial e jitter (respeita Retry-After).
+- Limite de chamadas simultâneas (LLM_MAX_CONCURRENCY).
+- Circuit breaker: após LLM_BREAKER_THRESHOLD falhas seguidas as chamadas
+  falham na hora por LLM_BREAKER_RESET_SECONDS; depois uma chamada de
+  teste decide se o circuito fecha.
+
+chat_stream() repassa os tokens conforme chegam (stream SSE da API).
+LLM_BASE_URL permite apontar para um servidor local (stub) em testes.
+"""
+
+import asyncio
+import json
+import logging
+import random
+import threading
+import time
+
+import httpx
+
+from app.utils import config, metrics
+
+logger = logging.getLogger(__name__)
+
+_RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+REQUEST_SECONDS = metrics.Histogram(
+    "sidekick_llm_request_seconds",
+    "Duração de cada requisição HTTP ao LLM (por tentativa)",
+    ("mode",),
+)
+FIRST_TOKEN_SECONDS = metrics.Histogram(
+    "sidekick_llm_first_token_seconds",
+    "Tempo até o primeiro pedaço do stream do LLM",
+)
+
+
+class LLMError(Exception):
+    """A chamada ao LLM falhou (após os retries ou por erro não transitório)."""
+
+
+class CircuitOpenError(LLMError):
+    """Circuito aberto: o upstream está falhando, a chamada nem é feita."""
+
+
+class CircuitBreaker:
+    """Circuit breaker simples (closed → open → half_open → closed), thread-safe."""
+
+    def __init__(self, threshold: int, reset_seconds: float):
+        self.threshold = threshold
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_seconds:
+                self.state = "half_open"
+                self._probing = False
+            if self.state == "half_open" and not self._probing:
+                # Uma única chamada de teste por vez
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self.state != "closed":
+                logger.info("Circuit breaker do LLM fechado")
+            self.state = "closed"
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == "half_open" or self.failures >= self.threshold:
+                if self.state != "open":
+                    logger.warning(f"Circuit breaker do LLM aberto após {self.failures} falha(s)")
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+    def release(self):
+        """Chamada abortada sem resultado (ex.: cancelada): libera o teste."""
+        with self._lock:
+            self._probing = False
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"state": self.state, "consecutive_failures": self.failures}
+
+
+class _RetryableError(Exception):
+    def __init__(self, message: str, retry_after: float = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class LLMClient:
+    """
+    Cliente de chat completions com pool de conexões.
+    `chat` é a versão assíncrona (pipeline); `chat_sync` atende código
+    que roda em threads (ex.: InterviewBot).
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str,
+        timeout: float,
+        deadline: float,
+        max_retries: int,
+        backoff: float,
+        max_concurrency: int,
+        max_connections: int,
+        breaker: CircuitBreaker,
+        transport=None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.timeout = timeout
+        self.deadline = deadline
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_concurrency = max_concurrency
+        self.limits = httpx.Limits(
+            max_connections=max_connections, max_keepalive_connections=max_connections
+        )
+        self.breaker = breaker
+        self.transport = transport
+        self.calls = 0
+        self.retries = 0
+        self.failures = 0
+        self.rejected = 0
+        self._async_client = None
+        self._async_loop = None
+        self._semaphore = None
+        self._sync_client = None
+        self._sync_semaphore = threading.BoundedSemaphore(max_concurrency)
+        self._lock = threading.Lock()
+
+    # ------------------------
+    # Helpers comuns
+    # ------------------------
+    def _headers(self) -> dict:
+        return {"Authorization": f"Bearer {self.api_key}"}
+
+    @staticmethod
+    def _payload(messages: list, model: str, max_tokens: int, temperature: float) -> dict:
+        return {
+            "model": model,
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+        }
+
+    @staticmethod
+    def _parse(response: httpx.Response) -> str:
+        if response.status_code in _RETRYABLE_STATUS:
+            retry_after = response.headers.get("retry-after")
+            raise _RetryableError(
+                f"HTTP {response.status_code}",
+                float(retry_after) if retry_after and retry_after.isdigit() else None,
+            )
+        if response.status_code >= 400:
+            raise LLMError(f"HTTP {response.status_code}: {response.text[:200]}")
+        try:
+            return response.json()["choices"][0]["message"]["content"].strip()
+        except (ValueError, KeyError, IndexError, TypeError) as e:
+            raise LLMError(f"Resposta inesperada do LLM: {e}")
+
+    def _delay(self, attempt: int, error: _RetryableError, remaining: float) -> float:
+        """Backoff exponencial com jitter ("full jitter"), limitado ao prazo restante."""
+        delay = random.uniform(0, self.backoff * (2 ** attempt))
+        if error.retry_after is not None:
+            delay = max(delay, error.retry_after)
+        return min(delay, max(remaining, 0))
+
+    def _before_call(self):
+        if not self.breaker.allow():
+            with self._lock:
+                self.rejected += 1
+            raise CircuitOpenError("Circuito aberto: upstream do LLM indisponível")
+        with self._lock:
+            self.calls += 1
+
+    def _on_failure(self, error: Exception):
+        with self._lock:
+            self.failures += 1
+        self.breaker.record_failure()
+        logger.error(f"Chamada ao LLM falhou: {error}")
+
+    # ------------------------
+    # Versão assíncrona
+    # ------------------------
+    def _get_async_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_loop is not loop:
+            self._async_client = httpx.AsyncClient(
+                base_url=self.base_url, headers=self._headers(),
+                limits=self.limits, timeout=self.timeout, transport=self.transport,
+            )
+            self._async_loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._async_client
+
+    async def chat(self, messages: list, model: str, max_tokens: int, temperature: float) -> str:
+        """Envia a conversa e retorna o texto gerado. Levanta LLMError."""
+        self._before_call()
+        start = time.monotonic()
+        try:
+            client = self._get_async_client()
+            payload = self._payload(messages, model, max_tokens, temperature)
+            async with asyncio.timeout(self.deadline):
+                for attempt in range(self.max_retries + 1):
+                    try:
+                        async with self._semaphore:
+                            with REQUEST_SECONDS.time(mode="async"):
+                                response = await client.post("/chat/completions", json=payload)
+                        text = self._parse(response)
+                        self.breaker.record_success()
+                        return text
+                    except (_RetryableError, httpx.TransportError) as e:
+                        error = e if isinstance(e, _RetryableError) else _RetryableError(repr(e))
+                        if attempt == self.max_retries:
+                            raise LLMError(f"Falha após {attempt + 1} tentativa(s): {error}")
+                        with self._lock:
+                            self.retries += 1
+                        remaining = self.deadline - (time.monotonic() - start)
+                        await asyncio.sleep(self._delay(attempt, error, remaining))
+        except TimeoutError:
+            error = LLMError(f"Prazo de {self.deadline}s esgotado")
+            self._on_failure(error)
+            raise error
+        except LLMError as e:
+            self._on_failure(e)
+            raise
+        except asyncio.CancelledError:
+            self.breaker.release()
+            raise
+        except Exception as e:
+            # Qualquer outra falha também conta (e libera o teste do half_open)
+            error = LLMError(f"Falha inesperada: {e!r}")
+            self._on_failure(error)
+            raise error from e
+
+    @staticmethod
+    def _parse_stream_line(line: str):
+        """Extrai o pedaço de texto de uma linha SSE; None indica o fim ([DONE])."""
+        if not line.startswith("data:"):
+            return ""
+        data = line[5:].strip()
+        if data == "[DONE]":
+            return None
+        try:
+            choice = json.loads(data)["choices"][0]
+        except (ValueError, KeyError, IndexError, TypeError) as e:
+            raise LLMError(f"Evento de stream inesperado: {e}")
+        return (choice.get("delta") or {}).get("content") or ""
+
+    async def chat_stream(self, messages: list, model: str, max_tokens: int, temperature: float):
+        """
+        Gera o texto em pedaços conforme a API responde (stream SSE).
+        Retries só acontecem antes do primeiro pedaço; o prazo total vale
+        para o stream inteiro. Levanta LLMError.
+
+        A resposta é lida por uma task própria, que entrega os pedaços por
+        uma fila: a vaga de concorrência e o prazo não ficam presos a um
+        consumidor lento, e o estouro do prazo chega como LLMError (não
+        como CancelledError no código de quem consome).
+        """
+        self._before_call()
+        client = self._get_async_client()
+        payload = {**self._payload(messages, model, max_tokens, temperature), "stream": True}
+        queue = asyncio.Queue()
+        reader = asyncio.create_task(self._read_stream(client, payload, queue))
+        try:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            # Cliente parou de consumir o stream: encerra a leitura
+            reader.cancel()
+
+    async def _read_stream(self, client: httpx.AsyncClient, payload: dict, queue: asyncio.Queue):
+        """Lê o stream da API para `queue`: pedaços, depois None ou a exceção."""
+        start = time.monotonic()
+        streamed = False
+        try:
+            async with asyncio.timeout(self.deadline):
+                for attempt in range(self.max_retries + 1):
+                    try:
+                        async with self._semaphore:
+                            async with client.stream(
+                                "POST", "/chat/completions", json=payload
+                            ) as response:
+                                if response.status_code >= 400:
+                                    await response.aread()
+                                    self._parse(response)
+                                async for line in response.aiter_lines():
+                                    delta = self._parse_stream_line(line)
+                                    if delta is None:
+                                        break
+                                    if delta:
+                                        if not streamed:
+                                            FIRST_TOKEN_SECONDS.observe(time.monotonic() - start)
+                                        streamed = True
+                                        queue.put_nowait(delta)
+                        self.breaker.record_success()
+                        queue.put_nowait(None)
+                        return
+                    except (_RetryableError, httpx.TransportError) as e:
+                        error = e if isinstance(e, _RetryableError) else _RetryableError(repr(e))
+                        if streamed or attempt == self.max_retries:
+                            raise LLMError(f"Stream interrompido: {error}")
+                        with self._lock:
+                            self.retries += 1
+                        remaining = self.deadline - (time.monotonic() - start)
+                        await asyncio.sleep(self._delay(attempt, error, remaining))
+        except TimeoutError:
+            error = LLMError(f"Prazo de {self.deadline}s esgotado")
+            self._on_failure(error)
+            queue.put_nowait(error)
+        except LLMError as e:
+            self._on_failure(e)
+            queue.put_nowait(e)
+        except asyncio.CancelledError:
+            self.breaker.release()
+            raise
+        except Exception as e:
+            self._on_failure(e)
+            queue.put_nowait(LLMError(f"Stream interrompido: {e!r}"))
+
+    async def aclose(self):
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+
+    # ------------------------
+    # Versão síncrona (threads)
+    # ------------------------
+    def _get_sync_client(self) -> httpx.Client:
+        with self._lock:
+            if self._sync_client is None:
+                self._sync_client = httpx.Client(
+                    base_url=self.base_url, headers=self._headers(),
+                    limits=self.limits, timeout=self.timeout, transport=self.transport,
+                )
+            return self._sync_client
+
+    def chat_sync(self, messages: list, model: str, max_tokens: int, temperature: float) -> str:
+        """Mesmo contrato de `chat`, bloqueante."""
+        self._before_call()
+        deadline = time.monotonic() + self.deadline
+        try:
+            client = self._get_sync_client()
+            payload = self._payload(messages, model, max_tokens, temperature)
+            for attempt in range(self.max_retries + 1):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise LLMError(f"Prazo de {self.deadline}s esgotado")
+                try:
+                    with self._sync_semaphore, REQUEST_SECONDS.time(mode="sync"):
+                        response = client.post(
+                            "/chat/completions", json=payload,
+                            timeout=min(self.timeout, remaining),
+                        )
+                    text = self._parse(response)
+                    self.breaker.record_success()
+                    return text
+                except (_RetryableError, httpx.TransportError) as e:
+                    error = e if isinstance(e, _RetryableError) else _RetryableError(repr(e))
+                    if attempt == self.max_retries:
+                        raise LLMError(f"Falha após {attempt + 1} tentativa(s): {error}")
+                    with self._lock:
+                        self.retries += 1
+                    time.sleep(self._delay(attempt, error, deadline - time.monotonic()))
+        except LLMError as e:
+            self._on_failure(e)
+            raise
+        except Exception as e:
+            error = LLMError(f"Falha inesperada: {e!r}")
+            self._on_failure(error)
+            raise error from e
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = {
+                "calls": self.calls,
+                "retries": self.retries,
+                "failures": self.failures,
+                "rejected": self.rejected,
+            }
+        return {**counters, "breaker": self.breaker.stats()}
+
+
+def create_client(api_key: str, transport=None) -> LLMClient:
+    """Cria o cliente com os parâmetros LLM_* do config."""
+    return LLMClient(
+        base_url=config.LLM_BASE_URL,
+        api_key=api_key,
+        timeout=config.LLM_TIMEOUT_SECONDS,
+        deadline=config.LLM_DEADLINE_SECONDS,
+        max_retries=config.LLM_MAX_RETRIES,
+        backoff=config.LLM_BACKOFF_SECONDS,
+        max_concurrency=config.LLM_MAX_CONCURRENCY,
+        max_connections=config.LLM_MAX_CONNECTIONS,
+        breaker=CircuitBreaker(config.LLM_BREAKER_THRESHOLD, config.LLM_BREAKER_RESET_SECONDS),
+        transport=transport,
+    )
@@ -0,0 +1,146 @@
+"""
+Model Manager - Instância única do modelo STT por processo
+----------------------------------------------------------
+- O modelo é carregado no primeiro uso (get) ou por warmup explícito,
+  nunca no import: `import app.main` e a coleta de testes ficam rápidos.
+- Um lock garante uma única carga mesmo com várias threads chamando get().
+- Uma carga que falhou é tentada de novo após STT_LOAD_RETRY_SECONDS
+  (ex.: download do modelo interrompido), em vez de ficar "failed" para sempre.
+- Expõe estado e duração da carga para o /api/health.
+- Um gerenciador por tamanho de modelo (get_manager): com roteamento
+  adaptativo (STT_ROUTE_MODELS) vários tamanhos ficam carregados.
+
+Com CPU_EXECUTOR=process o modelo vive nos workers do pool; cada
+transcrição devolve o status do worker que a atendeu e o processo
+principal guarda o último de cada pid (record_worker_status).
+Com app.serve o modelo é carregado uma vez no processo pai e herdado pelos
+workers da API (fork, copy-on-write); after_fork() roda em cada filho.
+"""
+
+import logging
+import os
+import threading
+import time
+from functools import partial
+
+from app.services.stt_engines import create_engine
+from app.utils import config
+
+logger = logging.getLogger(__name__)
+
+
+class ModelManager:
+    """Carrega sob demanda e compartilha um único motor STT."""
+
+    def __init__(self, factory=create_engine):
+        self._factory = factory
+        self._engine = None
+        self._lock = threading.Lock()
+        self.state = "not_loaded"  # not_loaded, loading, ready, failed
+        self.load_seconds = None
+        # Processo que carregou o modelo (o pai, quando herdado via app.serve)
+        self.load_pid = None
+        self.error = None
+        self.failed_at = None
+        # pid -> último status reportado por aquele worker do pool de processos
+        self.worker_statuses = {}
+
+    def get(self):
+        """Retorna o motor carregado (ou None se a carga falhou há menos de STT_LOAD_RETRY_SECONDS)."""
+        if self.state == "ready":
+            return self._engine
+        with self._lock:
+            if self.state == "ready":
+                return self._engine
+            if self.state == "failed" and time.monotonic() - self.failed_at < config.STT_LOAD_RETRY_SECONDS:
+                return None
+            self.state = "loading"
+            started = time.perf_counter()
+            try:
+                engine = self._factory()
+                engine.load()
+                self._engine = engine
+                self.load_pid = os.getpid()
+                self.state = "ready"
+                self.error = None
+                logger.info(f"Motor STT carregado: {engine.describe()}")
+            except Exception as e:
+                self.state = "failed"
+                self.error = str(e)
+                self.failed_at = time.monotonic()
+                logger.error(f"Falha ao carregar motor STT: {e}")
+            self.load_seconds = round(time.perf_counter() - started, 3)
+        return self._engine
+
+    def status(self) -> dict:
+        status = {
+            "state": self.state,
+            "load_seconds": self.load_seconds,
+            "pid": os.getpid(),
+            "load_pid": self.load_pid,
+        }
+        if self._engine is not None:
+            status.update(self._engine.describe())
+        if self.error:
+            status["error"] = self.error
+        return status
+
+    def record_worker_status(self, status: dict):
+        """Guarda o status reportado por um worker do pool de processos."""
+        pid = status.get("pid")
+        self.worker_statuses.pop(pid, None)
+        self.worker_statuses[pid] = status
+        # Workers recriados (pool quebrado) deixam pids antigos: mantém os mais recentes
+        while len(self.worker_statuses) > config.CPU_WORKERS:
+            del self.worker_statuses[next(iter(self.worker_statuses))]
+
+    def worker_summary(self, loading: bool = False) -> dict:
+        """Estado do modelo nos workers do pool (ready se algum já carregou) e o status de cada um."""
+        states = {status.get("state") for status in self.worker_statuses.values()}
+        if "ready" in states:
+            state = "ready"
+        elif loading:
+            state = "loading"
+        elif "failed" in states:
+            state = "failed"
+        else:
+            state = "not_loaded"
+        return {"state": state, "workers": {str(pid): status for pid, status in self.worker_statuses.items()}}
+
+
+manager = ModelManager()
+
+# Tamanho -> gerenciador dos demais tamanhos (o padrão é o `manager` acima)
+managers = {}
+_managers_lock = threading.Lock()
+
+
+def get_manager(model_size: str = None) -> ModelManager:
+    """Gerenciador do tamanho pedido (padrão: STT_MODEL_SIZE), criado sob demanda."""
+    if not model_size or model_size == config.STT_MODEL_SIZE:
+        return manager
+    with _managers_lock:
+        if model_size not in managers:
+            managers[model_size] = ModelManager(partial(create_engine, model_size=model_size))
+        return managers[model_size]
+
+
+def warmup() -> dict:
+    """
+    Hook de warmup: força a carga do modelo padrão e dos tamanhos roteados
+    e retorna o status (picklable, roda em workers).
+    """
+    for model_size in config.STT_ROUTE_MODELS:
+        get_manager(model_size).get()
+    manager.get()
+    status = manager.status()
+    if config.STT_ROUTE_MODELS:
+        status["models"] = {size: get_manager(size).state for size in config.STT_ROUTE_MODELS}
+    return status
+
+
+def after_fork():
+    """Prepara, no processo filho, os motores herdados do pai (app.serve)."""
+    for loaded in (manager, *managers.values()):
+        if loaded.state == "ready":
+            loaded.get().after_fork()
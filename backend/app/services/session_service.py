@@ -0,0 +1,98 @@
+"""
+Session Service - Estado da entrevista por sessão
+-------------------------------------------------
+Cada entrevista tem seu próprio estado (índice da pergunta atual),
+identificado por um session id, em vez de um InterviewBot global
+compartilhado por todos os clientes:
+- InterviewState usa __slots__: registros compactos e sem __dict__.
+- O estado fica em um store plugável com TTL (SESSION_STORE=memory|sqlite);
+  com SQLite, vários workers uvicorn atendem a mesma entrevista sem
+  sticky sessions.
+- advance() avança a pergunta de forma atômica, sem corrida entre
+  requisições simultâneas da mesma sessão.
+- Cada nova sessão dispara a limpeza das expiradas (no máximo uma a cada
+  SESSION_PURGE_INTERVAL_SECONDS): clientes sem session id criam uma
+  sessão por requisição e o store não pode crescer sem limite.
+"""
+
+import logging
+import threading
+import time
+from uuid import uuid4
+
+from app.utils import config, ttl_store
+
+logger = logging.getLogger(__name__)
+
+
+class InterviewState:
+    """Estado serializável de uma entrevista."""
+
+    __slots__ = ("session_id", "question_index", "created_at", "updated_at")
+
+    def __init__(self, session_id: str, question_index: int = 0,
+                 created_at: float = None, updated_at: float = None):
+        now = time.time()
+        self.session_id = session_id
+        self.question_index = question_index
+        self.created_at = created_at or now
+        self.updated_at = updated_at or now
+
+    def to_dict(self) -> dict:
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "InterviewState":
+        return cls(**data)
+
+
+store = ttl_store.create_store(
+    config.SESSION_STORE, config.SESSION_TTL_SECONDS, config.SESSION_DB_PATH, table="sessions"
+)
+
+
+_purge_lock = threading.Lock()
+_last_purge = float("-inf")
+
+
+def purge_expired(force: bool = False) -> int:
+    """Remove as sessões expiradas; sem `force`, respeita o intervalo mínimo."""
+    global _last_purge
+    now = time.monotonic()
+    with _purge_lock:
+        if not force and now - _last_purge < config.SESSION_PURGE_INTERVAL_SECONDS:
+            return 0
+        _last_purge = now
+    removed = store.purge_expired()
+    if removed:
+        logger.info(f"{removed} sessões expiradas removidas")
+    return removed
+
+
+def new_session_id() -> str:
+    purge_expired()
+    return uuid4().hex
+
+
+def get(session_id: str) -> InterviewState:
+    """Retorna o estado da sessão (novo, se não existir ou tiver expirado)."""
+    data = store.get(session_id)
+    return InterviewState.from_dict(data) if data else InterviewState(session_id)
+
+
+def advance(session_id: str, fn):
+    """
+    Carrega o estado, aplica `fn(state)` (que pode alterá-lo) e grava
+    o resultado atomicamente. Retorna (retorno de fn, estado atualizado).
+    """
+    result = {}
+
+    def apply(data):
+        state = InterviewState.from_dict(data) if data else InterviewState(session_id)
+        result["value"] = fn(state)
+        state.updated_at = time.time()
+        result["state"] = state
+        return state.to_dict()
+
+    store.update(session_id, apply)
+    return result["value"], result["state"]
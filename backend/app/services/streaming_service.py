@@ -0,0 +1,180 @@
+"""
+Streaming Service - Transcrição incremental
+-------------------------------------------
+Recebe pedaços do MediaRecorder enquanto o candidato fala e devolve
+transcrições parciais, sem esperar o fim da resposta:
+1. Os chunks são decodificados incrementalmente (StreamDecoder).
+2. A cada STREAM_STEP_SECONDS de áudio novo, a janela atual é transcrita.
+3. Quando a janela passa de STREAM_WINDOW_SECONDS, o texto é consolidado
+   e a próxima janela recomeça com STREAM_OVERLAP_SECONDS de sobreposição.
+4. Palavras repetidas na emenda entre janelas são removidas (merge_overlap).
+5. O total recebido respeita UPLOAD_MAX_BYTES, como no POST /answer.
+"""
+
+import asyncio
+import logging
+import re
+from contextlib import asynccontextmanager
+
+import numpy as np
+
+from app.services import stt_batcher
+from app.utils import config, metrics
+from app.utils.audio_decoder import SAMPLE_RATE, AudioDecodeError, StreamDecoder
+
+logger = logging.getLogger(__name__)
+
+_WORD_RE = re.compile(r"[^\w]+", re.UNICODE)
+
+_active_sessions = 0
+
+ACTIVE_SESSIONS = metrics.Gauge(
+    "sidekick_stream_active_sessions",
+    "Sessões de transcrição em streaming abertas (WebSocket)",
+    fn=lambda: _active_sessions,
+)
+REJECTED = metrics.Counter(
+    "sidekick_stream_rejected_total",
+    "Sessões de streaming recusadas por STREAM_MAX_SESSIONS",
+)
+
+
+class StreamLimitError(Exception):
+    """Limite de sessões de streaming simultâneas atingido."""
+
+
+class StreamTooLargeError(Exception):
+    """A sessão recebeu mais bytes que UPLOAD_MAX_BYTES."""
+
+
+def _normalize(word: str) -> str:
+    return _WORD_RE.sub("", word).lower()
+
+
+def merge_overlap(left: str, right: str, max_words: int = 12) -> str:
+    """
+    Junta dois trechos transcritos com áudio sobreposto, removendo do início
+    de `right` as palavras que já aparecem no fim de `left`.
+    """
+    left_words = left.split()
+    right_words = right.split()
+    if not left_words:
+        return right.strip()
+    if not right_words:
+        return left.strip()
+
+    left_norm = [_normalize(w) for w in left_words[-max_words:]]
+    right_norm = [_normalize(w) for w in right_words[:max_words]]
+    for size in range(min(len(left_norm), len(right_norm)), 0, -1):
+        if left_norm[-size:] == right_norm[:size]:
+            right_words = right_words[size:]
+            break
+    return " ".join(left_words + right_words)
+
+
+class StreamingTranscriber:
+    """Estado de uma sessão de transcrição incremental (uma por WebSocket)."""
+
+    def __init__(self):
+        self.window = int(config.STREAM_WINDOW_SECONDS * SAMPLE_RATE)
+        self.step = int(config.STREAM_STEP_SECONDS * SAMPLE_RATE)
+        self.overlap = int(config.STREAM_OVERLAP_SECONDS * SAMPLE_RATE)
+
+        self.decoder = StreamDecoder()
+        self.received = 0
+        self.committed_text = ""
+        self.partial_text = ""
+        # Áudio ainda não consolidado (inclui a sobreposição com a janela anterior)
+        self._audio = np.zeros(0, dtype=np.float32)
+        self._last_inference_len = 0
+        self._inference = None
+
+    async def start(self):
+        await self.decoder.start()
+
+    def _pull_audio(self):
+        new = self.decoder.read()
+        if new.size:
+            self._audio = np.concatenate([self._audio, new])
+
+    async def _transcribe_window(self, commit: bool) -> str:
+        window_audio = self._audio.copy()
+        self._last_inference_len = len(window_audio)
+        text = await stt_batcher.transcribe(window_audio)
+
+        if commit:
+            self.committed_text = merge_overlap(self.committed_text, text)
+            self.partial_text = ""
+            # Mantém só a sobreposição para emendar com a próxima janela
+            keep_from = max(len(window_audio) - self.overlap, 0)
+            self._audio = self._audio[keep_from:]
+            self._last_inference_len = len(window_audio) - keep_from
+        else:
+            self.partial_text = text
+        return self.text
+
+    @property
+    def text(self) -> str:
+        return merge_overlap(self.committed_text, self.partial_text)
+
+    def busy(self) -> bool:
+        return self._inference is not None and not self._inference.done()
+
+    async def feed(self, chunk: bytes):
+        """
+        Recebe um chunk e, se houver áudio novo suficiente e nenhuma inferência
+        em andamento, retorna uma task que resolve para o texto parcial.
+        """
+        self.received += len(chunk)
+        if self.received > config.UPLOAD_MAX_BYTES:
+            raise StreamTooLargeError(
+                f"Streaming passou do limite de {config.UPLOAD_MAX_BYTES} bytes"
+            )
+        await self.decoder.feed(chunk)
+        self._pull_audio()
+        if self.busy() or len(self._audio) - self._last_inference_len < self.step:
+            return None
+        commit = len(self._audio) >= self.window
+        self._inference = asyncio.create_task(self._transcribe_window(commit))
+        return self._inference
+
+    async def finish(self) -> str:
+        """Fecha o decoder e transcreve o que restou, retornando o texto final."""
+        if self.busy():
+            await self._inference
+        remaining = await self.decoder.close()
+        if self.decoder.returncode != 0:
+            raise AudioDecodeError("ffmpeg não decodificou o áudio do streaming")
+        if remaining.size:
+            self._audio = np.concatenate([self._audio, remaining])
+        if len(self._audio) > self._last_inference_len:
+            await self._transcribe_window(commit=True)
+        else:
+            self.committed_text = self.text
+            self.partial_text = ""
+        return self.committed_text
+
+    def abort(self):
+        self.decoder.kill()
+        if self.busy():
+            self._inference.cancel()
+
+
+@asynccontextmanager
+async def open_session():
+    """
+    Abre uma sessão de streaming respeitando STREAM_MAX_SESSIONS.
+    O decoder é encerrado ao sair do bloco, mesmo se o cliente desconectar.
+    """
+    global _active_sessions
+    if _active_sessions >= config.STREAM_MAX_SESSIONS:
+        REJECTED.inc()
+        raise StreamLimitError(f"{_active_sessions} sessões ativas")
+    _active_sessions += 1
+    session = StreamingTranscriber()
+    try:
+        await session.start()
+        yield session
+    finally:
+        session.abort()
+        _active_sessions -= 1
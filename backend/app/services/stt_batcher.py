@@ -0,0 +1,132 @@
+"""
+STT Batcher - Micro-batching de transcrições concorrentes
+---------------------------------------------------------
+Quando vários candidatos respondem ao mesmo tempo, cada requisição
+chamaria o modelo separadamente, disputando núcleos. O BatchScheduler:
+1. Acumula os áudios pendentes por até STT_BATCH_MAX_WAIT_MS
+   (ou até STT_BATCH_MAX_SIZE itens).
+2. Envia o lote inteiro ao pool de CPU em uma única chamada
+   (stt_service.transcribe_batch → engine.transcribe_batch, que no
+   Whisper roda o encoder/decoder sobre um tensor mel com padding).
+3. Devolve cada texto ao future de quem pediu.
+
+Cada tamanho de modelo (ver stt_router) tem sua própria fila de lotes.
+"""
+
+import asyncio
+import logging
+from functools import partial
+
+import numpy as np
+
+from app.services import model_manager, stt_service
+from app.utils import config, executor, metrics
+from app.utils.audio_decoder import SAMPLE_RATE
+
+logger = logging.getLogger(__name__)
+
+
+BATCH_SIZE = metrics.Histogram(
+    "sidekick_stt_batch_size",
+    "Áudios por lote enviado ao modelo de STT",
+    buckets=(1, 2, 4, 8, 16, 32),
+)
+BATCH_SECONDS = metrics.Histogram(
+    "sidekick_stt_batch_seconds",
+    "Duração de cada chamada ao modelo de STT (inclui a espera no pool de CPU)",
+)
+
+
+# Chamados com (model_size, segundos de áudio, segundos no worker) após cada
+# lote que encontrou o modelo já carregado (ver stt_router)
+timing_listeners = []
+
+
+async def run_on_cpu_pool(audios: list, model_size: str = None) -> list:
+    """Transcreve o lote no pool de CPU e registra o status do worker que o atendeu."""
+    result = await executor.run_cpu(stt_service.transcribe_reporting, audios, model_size)
+    model_manager.get_manager(model_size).record_worker_status(result["status"])
+    audio_seconds = sum(len(a) for a in audios if isinstance(a, np.ndarray)) / SAMPLE_RATE
+    # Uma carga do modelo no meio da chamada não é velocidade de transcrição
+    if result.get("warm") and audio_seconds > 0:
+        for listener in timing_listeners:
+            listener(model_size, audio_seconds, result["seconds"])
+    return result["texts"]
+
+
+class BatchScheduler:
+    """Agrupa chamadas de transcrição de um event loop em lotes."""
+
+    def __init__(self, max_batch_size: int, max_wait_ms: float, runner=run_on_cpu_pool):
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.runner = runner
+        self.loop = asyncio.get_running_loop()
+        self._pending = []
+        self._timer = None
+        self._tasks = set()
+
+    async def submit(self, audio) -> str:
+        future = self.loop.create_future()
+        self._pending.append((audio, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = self.loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._pending:
+            batch = self._pending[:self.max_batch_size]
+            self._pending = self._pending[self.max_batch_size:]
+            task = self.loop.create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: list):
+        audios = [audio for audio, _ in batch]
+        logger.info(f"Lote STT com {len(audios)} áudio(s)")
+        BATCH_SIZE.observe(len(audios))
+        try:
+            with BATCH_SECONDS.time():
+                texts = await self.runner(audios)
+        except Exception as e:
+            metrics.ERRORS.inc(component="stt")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), text in zip(batch, texts):
+            if not future.done():
+                future.set_result(text)
+
+
+# Tamanho do modelo -> scheduler
+_schedulers = {}
+
+
+def _get_scheduler(model_size: str = None) -> BatchScheduler:
+    loop = asyncio.get_running_loop()
+    scheduler = _schedulers.get(model_size)
+    if scheduler is None or scheduler.loop is not loop:
+        scheduler = _schedulers[model_size] = BatchScheduler(
+            config.STT_BATCH_MAX_SIZE,
+            config.STT_BATCH_MAX_WAIT_MS,
+            runner=partial(run_on_cpu_pool, model_size=model_size),
+        )
+    return scheduler
+
+
+async def transcribe(audio, model_size: str = None) -> str:
+    """
+    Ponto de entrada assíncrono do STT usado pelo pipeline.
+    Com STT_BATCHING desligado, cada áudio vai direto para o pool de CPU.
+    """
+    if not config.STT_BATCHING:
+        with BATCH_SECONDS.time():
+            texts = await run_on_cpu_pool([audio], model_size)
+        return texts[0]
+    return await _get_scheduler(model_size).submit(audio)
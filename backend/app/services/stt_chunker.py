@@ -0,0 +1,116 @@
+"""
+STT Chunker - Transcrição paralela de respostas longas
+------------------------------------------------------
+Uma resposta de 3 minutos em uma única chamada ao modelo usa um worker
+enquanto os outros ficam parados. Acima de STT_CHUNK_MIN_SECONDS:
+1. O áudio é cortado em pedaços de ~STT_CHUNK_TARGET_SECONDS (no máximo
+   STT_CHUNK_MAX_SECONDS), sempre no quadro de menor energia da janela
+   de corte: em uma pausa, quando existe (o VAD deixa 0,1 s de silêncio
+   entre os trechos de fala).
+2. Sem pausa na janela (fala contínua), o corte repete os últimos
+   STT_CHUNK_OVERLAP_SECONDS no início do pedaço seguinte, e as palavras
+   duplicadas na emenda são removidas (streaming_service.merge_overlap).
+3. Cada pedaço vai para o pool de CPU separadamente (sem micro-batch), então
+   o tempo de STT cai com o número de workers (CPU_WORKERS).
+4. Os textos são juntados na ordem original.
+
+Áudios curtos seguem pelo stt_batcher normalmente.
+"""
+
+import asyncio
+import logging
+
+import numpy as np
+
+from app.services import stt_batcher, vad_service
+from app.services.streaming_service import merge_overlap
+from app.utils import config, metrics
+from app.utils.audio_decoder import SAMPLE_RATE
+
+logger = logging.getLogger(__name__)
+
+CHUNKS = metrics.Histogram(
+    "sidekick_stt_chunks",
+    "Pedaços por resposta longa transcrita em paralelo",
+    buckets=(2, 4, 8, 16, 32),
+)
+
+
+def plan_chunks(audio: np.ndarray, sample_rate: int = SAMPLE_RATE) -> list:
+    """
+    Divide o áudio em pedaços para transcrição.
+
+    Retorna:
+    -------
+    list
+        Tuplas (início, fim, sobreposto) em amostras, em ordem; `sobreposto`
+        indica que o pedaço repete o fim do anterior (corte sem pausa).
+    """
+    target = int(config.STT_CHUNK_TARGET_SECONDS * sample_rate)
+    limit = max(int(config.STT_CHUNK_MAX_SECONDS * sample_rate), target)
+    overlap = int(config.STT_CHUNK_OVERLAP_SECONDS * sample_rate)
+    frame = int(sample_rate * config.VAD_FRAME_MS / 1000)
+    energy = vad_service.frame_energy_db(audio, frame)
+
+    chunks = []
+    start, overlapped = 0, False
+    while len(audio) - start > limit:
+        # Janela de corte: da metade do alvo até o máximo
+        first = (start + target // 2) // frame
+        last = (start + limit) // frame
+        window = energy[first:last]
+        quiet = np.flatnonzero(window < config.VAD_MIN_DB)
+        if quiet.size:
+            # Pausa mais próxima do tamanho alvo
+            target_frame = (start + target) // frame - first
+            cut_frame = first + quiet[np.argmin(np.abs(quiet - target_frame))]
+        else:
+            cut_frame = first + int(np.argmin(window))
+        cut = cut_frame * frame
+        chunks.append((start, cut, overlapped))
+        if quiet.size:
+            start, overlapped = cut, False
+        else:
+            start, overlapped = max(cut - overlap, start + 1), True
+    chunks.append((start, len(audio), overlapped))
+    return chunks
+
+
+def stitch(texts: list, overlapped: list) -> str:
+    """Junta os textos na ordem, deduplicando as emendas sobrepostas."""
+    result = ""
+    for text, is_overlapped in zip(texts, overlapped):
+        text = text.strip()
+        if not text:
+            continue
+        if is_overlapped:
+            result = merge_overlap(result, text)
+        else:
+            result = f"{result} {text}" if result else text
+    return result
+
+
+def parallelism(seconds: float) -> int:
+    """Quantos pedaços de um áudio de `seconds` rodam ao mesmo tempo."""
+    if not config.STT_CHUNKING or seconds < config.STT_CHUNK_MIN_SECONDS:
+        return 1
+    chunks = max(int(seconds // config.STT_CHUNK_TARGET_SECONDS), 1)
+    return max(min(chunks, config.CPU_WORKERS), 1)
+
+
+async def transcribe(audio: np.ndarray, model_size: str = None) -> str:
+    """Ponto de entrada do pipeline: pedaços em paralelo para respostas longas."""
+    if not config.STT_CHUNKING or len(audio) < config.STT_CHUNK_MIN_SECONDS * SAMPLE_RATE:
+        return await stt_batcher.transcribe(audio, model_size)
+
+    chunks = plan_chunks(audio)
+    CHUNKS.observe(len(chunks))
+    logger.info(
+        f"STT em {len(chunks)} pedaços ({len(audio) / SAMPLE_RATE:.1f}s, "
+        f"{sum(o for _, _, o in chunks)} com sobreposição)"
+    )
+    results = await asyncio.gather(*(
+        stt_batcher.run_on_cpu_pool([audio[start:end]], model_size)
+        for start, end, _ in chunks
+    ))
+    return stitch([texts[0] for texts in results], [o for _, _, o in chunks])
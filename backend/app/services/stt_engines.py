@@ -0,0 +1,242 @@
+"""
+STT Engines - Backends de Speech to Text
+----------------------------------------
+Registro de motores de transcrição selecionáveis por configuração
+(STT_ENGINE), sem mudança de código:
+- "whisper": openai-whisper (PyTorch, fp32 na CPU).
+- "faster-whisper": CTranslate2 com quantização int8; várias vezes mais
+  rápido e com bem menos memória em máquinas só com CPU.
+- "fake": determinístico e instantâneo, para testes e benchmarks.
+
+Cada motor declara tamanho do modelo, compute type e número de threads.
+As bibliotecas de cada backend só são importadas no load(), então um
+backend não selecionado não precisa estar instalado.
+
+Motores com `fork_safe` podem ser carregados antes do fork dos workers
+(app.serve); after_fork() reaplica nos filhos o que não sobrevive ao fork.
+"""
+
+import logging
+import os
+
+import numpy as np
+
+from app.utils import config
+from app.utils.audio_decoder import SAMPLE_RATE
+
+logger = logging.getLogger(__name__)
+
+ENGINES = {}
+
+# Limites do whisper.transcribe(): acima deles a decodificação gulosa é
+# refeita com temperatura (ou o trecho é tratado como silêncio)
+_COMPRESSION_RATIO_THRESHOLD = 2.4
+_LOGPROB_THRESHOLD = -1.0
+_NO_SPEECH_THRESHOLD = 0.6
+
+
+def register_engine(name: str):
+    """Decorator que registra uma classe de motor sob `name`."""
+    def decorator(cls):
+        cls.name = name
+        ENGINES[name] = cls
+        return cls
+    return decorator
+
+
+class STTEngine:
+    """Interface comum dos motores de STT."""
+
+    name = ""
+    default_compute_type = "float32"
+    # O modelo carregado continua utilizável em um processo filho (fork)
+    fork_safe = True
+
+    def __init__(self, model_size: str = "base", compute_type: str = "", threads: int = 0):
+        self.model_size = model_size
+        self.compute_type = compute_type or self.default_compute_type
+        self.threads = threads or os.cpu_count() or 1
+        self.model = None
+
+    def load(self):
+        """Carrega o modelo em memória (pode ser lento)."""
+        raise NotImplementedError
+
+    def after_fork(self):
+        """Chamado no processo filho quando o modelo foi herdado do pai."""
+
+    def transcribe(self, audio) -> str:
+        """Transcreve um caminho de arquivo ou array float32 16 kHz mono."""
+        raise NotImplementedError
+
+    def transcribe_batch(self, audios: list) -> list:
+        """Transcreve vários áudios; por padrão, um de cada vez."""
+        return [self.transcribe(audio) for audio in audios]
+
+    def describe(self) -> dict:
+        return {
+            "engine": self.name,
+            "model_size": self.model_size,
+            "compute_type": self.compute_type,
+            "threads": self.threads,
+        }
+
+
+@register_engine("whisper")
+class WhisperEngine(STTEngine):
+    default_compute_type = "float32"
+
+    def load(self):
+        import torch
+        import whisper
+
+        # O pool OpenMP do pai não sobrevive ao fork (os filhos travariam na
+        # primeira operação paralela): no preload, o pai carrega com uma thread
+        # e after_fork() aplica self.threads em cada worker
+        torch.set_num_threads(1 if config.STT_PRELOAD else self.threads)
+        if config.STT_MMAP_WEIGHTS:
+            self.model = self._load_mmap()
+        else:
+            self.model = whisper.load_model(self.model_size, device="cpu")
+
+    def _load_mmap(self):
+        """
+        Carrega os pesos de um checkpoint float32 mapeado em memória (MAP_PRIVATE):
+        as páginas vêm do page cache e são compartilhadas por todos os processos
+        que abrem o mesmo arquivo, inclusive workers criados com spawn.
+        O checkpoint oficial é float16 (seria convertido, e copiado, a cada carga),
+        então a versão float32 é gerada uma vez em STT_WEIGHTS_DIR.
+        """
+        import torch
+        import whisper
+        from whisper.model import ModelDimensions, Whisper
+
+        path = os.path.join(config.STT_WEIGHTS_DIR, f"{self.model_size}.fp32.pt")
+        if not os.path.exists(path):
+            os.makedirs(config.STT_WEIGHTS_DIR, exist_ok=True)
+            model = whisper.load_model(self.model_size, device="cpu")
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            torch.save({"dims": vars(model.dims), "model_state_dict": model.state_dict()}, tmp_path)
+            os.replace(tmp_path, path)
+            del model
+            logger.info(f"Pesos float32 do Whisper gravados em {path}")
+
+        checkpoint = torch.load(path, map_location="cpu", mmap=True, weights_only=True)
+        model = Whisper(ModelDimensions(**checkpoint["dims"]))
+        # assign=True: os parâmetros passam a apontar para o arquivo mapeado
+        model.load_state_dict(checkpoint["model_state_dict"], assign=True)
+        alignment_heads = whisper._ALIGNMENT_HEADS.get(self.model_size)
+        if alignment_heads is not None:
+            model.set_alignment_heads(alignment_heads)
+        return model
+
+    def after_fork(self):
+        import torch
+
+        torch.set_num_threads(self.threads)
+
+    def transcribe(self, audio) -> str:
+        result = self.model.transcribe(audio, fp16=self.compute_type == "float16")
+        return result.get("text", "").strip()
+
+    def transcribe_batch(self, audios: list) -> list:
+        """
+        Áudios em memória de até 30s (uma janela do encoder) são decodificados
+        juntos em um tensor mel [N, n_mels, 3000] com padding, com as mesmas
+        opções da primeira tentativa do transcribe() (temperatura 0). Itens
+        que o transcribe() refaria com temperatura (compressão ou logprob fora
+        dos limites) e os demais áudios seguem pelo transcribe() normal.
+        """
+        import torch
+        import whisper
+
+        texts = [None] * len(audios)
+        short = [
+            i for i, audio in enumerate(audios)
+            if isinstance(audio, np.ndarray) and len(audio) <= whisper.audio.N_SAMPLES
+        ]
+        if len(short) > 1:
+            mel = torch.stack([
+                whisper.log_mel_spectrogram(
+                    whisper.pad_or_trim(torch.from_numpy(audios[i])),
+                    n_mels=self.model.dims.n_mels,
+                )
+                for i in short
+            ]).to(self.model.device)
+            options = whisper.DecodingOptions(
+                task="transcribe", temperature=0.0, fp16=self.compute_type == "float16"
+            )
+            for i, result in zip(short, whisper.decode(self.model, mel, options)):
+                texts[i] = batch_result_text(result)
+
+        for i, audio in enumerate(audios):
+            if texts[i] is None:
+                texts[i] = self.transcribe(audio)
+        return texts
+
+
+def batch_result_text(result):
+    """
+    Texto de um DecodingResult do lote, com as regras do whisper.transcribe():
+    "" se for silêncio, None se o transcribe() refaria a decodificação.
+    """
+    if result.no_speech_prob > _NO_SPEECH_THRESHOLD and result.avg_logprob < _LOGPROB_THRESHOLD:
+        return ""
+    if result.compression_ratio > _COMPRESSION_RATIO_THRESHOLD or result.avg_logprob < _LOGPROB_THRESHOLD:
+        return None
+    return result.text.strip()
+
+
+@register_engine("faster-whisper")
+class FasterWhisperEngine(STTEngine):
+    default_compute_type = "int8"
+    # O pool de threads do CTranslate2 é criado no load e não existe no filho
+    fork_safe = False
+
+    def load(self):
+        from faster_whisper import WhisperModel
+
+        self.model = WhisperModel(
+            self.model_size,
+            device="cpu",
+            compute_type=self.compute_type,
+            cpu_threads=self.threads,
+        )
+
+    def transcribe(self, audio) -> str:
+        segments, _ = self.model.transcribe(audio, beam_size=config.STT_BEAM_SIZE)
+        return "".join(segment.text for segment in segments).strip()
+
+
+@register_engine("fake")
+class FakeEngine(STTEngine):
+    """Retorna um texto derivado da duração do áudio; não carrega modelo."""
+
+    default_compute_type = "none"
+
+    def load(self):
+        self.model = self
+
+    def transcribe(self, audio) -> str:
+        if isinstance(audio, np.ndarray):
+            return f"resposta simulada de {len(audio) / SAMPLE_RATE:.1f} segundos"
+        return "resposta simulada"
+
+
+def create_engine(name: str = "", **overrides) -> STTEngine:
+    """
+    Instancia (sem carregar) o motor configurado.
+
+    Parâmetros não informados vêm de STT_ENGINE, STT_MODEL_SIZE,
+    STT_COMPUTE_TYPE e STT_THREADS.
+    """
+    name = name or config.STT_ENGINE
+    if name not in ENGINES:
+        raise ValueError(f"Motor STT desconhecido: {name} (disponíveis: {sorted(ENGINES)})")
+    params = {
+        "model_size": config.STT_MODEL_SIZE,
+        "compute_type": config.STT_COMPUTE_TYPE,
+        "threads": config.STT_THREADS,
+    }
+    params.update(overrides)
+    return ENGINES[name](**params)
@@ -0,0 +1,150 @@
+"""
+STT Router - Escolha adaptativa do modelo de transcrição
+--------------------------------------------------------
+Com STT_ROUTE_MODELS (do menor para o maior, ex.: "tiny,base,small"), cada
+resposta é transcrita pelo maior modelo cuja latência prevista cabe no
+STT_LATENCY_SLO_SECONDS:
+
+    prevista = fila / workers + rtf[modelo] × duração / paralelismo
+
+- rtf: segundos de processamento por segundo de áudio de cada modelo.
+  Começa em valores típicos do Whisper em CPU e é ajustado (média móvel)
+  pelo tempo medido dentro do worker (sem fila do pool nem espera do
+  lote), ignorando chamadas que incluíram a carga do modelo.
+- fila: trabalho ainda em andamento (rtf × duração das transcrições em
+  curso), dividido entre os CPU_WORKERS.
+- paralelismo: pedaços simultâneos de respostas longas (stt_chunker).
+
+Sob carga a fila cresce e o roteador desce para modelos menores; com a
+API ociosa volta ao maior. Se nenhum modelo cabe no SLO, usa o menor.
+Sem STT_ROUTE_MODELS, tudo vai para STT_MODEL_SIZE (sem roteamento).
+"""
+
+import logging
+import threading
+from contextlib import contextmanager
+
+from app.services import stt_batcher, stt_chunker
+from app.utils import config, metrics
+
+logger = logging.getLogger(__name__)
+
+# rtf inicial por tamanho (Whisper em CPU, int8/float32; ajustado em uso)
+DEFAULT_RTF = {
+    "tiny": 0.04,
+    "base": 0.08,
+    "small": 0.25,
+    "medium": 0.7,
+    "large": 1.5,
+}
+# Peso da nova medida na média móvel do rtf
+_RTF_ALPHA = 0.2
+
+
+def _default_rtf(size: str) -> float:
+    # "large-v3" e "small.en" usam o valor da família
+    family = size.split("-")[0].split(".")[0]
+    return DEFAULT_RTF.get(family, 0.5)
+
+
+ROUTED = metrics.Counter(
+    "sidekick_stt_routed_total",
+    "Transcrições por modelo escolhido pelo roteador",
+    ("model",),
+)
+
+
+class ModelRouter:
+    """Escolhe o tamanho do modelo por duração do áudio, fila e SLO."""
+
+    def __init__(self, sizes: list, slo_seconds: float, workers: int):
+        self.sizes = list(sizes)
+        self.slo_seconds = slo_seconds
+        self.workers = max(workers, 1)
+        self.rtf = {size: _default_rtf(size) for size in self.sizes}
+        self.backlog = 0.0  # segundos de processamento em andamento
+        self.inflight = 0
+        self._lock = threading.Lock()
+
+    def predict(self, size: str, seconds: float) -> float:
+        """Latência prevista (s) do STT de `seconds` de áudio com `size`."""
+        work = self.rtf[size] * seconds / stt_chunker.parallelism(seconds)
+        return self.backlog / self.workers + work
+
+    def choose(self, seconds: float) -> str:
+        """Maior modelo que cabe no SLO; o menor se nenhum couber."""
+        with self._lock:
+            for size in reversed(self.sizes):
+                if self.predict(size, seconds) <= self.slo_seconds:
+                    return size
+            return self.sizes[0]
+
+    @contextmanager
+    def serving(self, size: str, seconds: float):
+        """Conta a transcrição na fila durante o bloco."""
+        work = self.rtf[size] * seconds
+        with self._lock:
+            self.backlog += work
+            self.inflight += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.backlog = max(self.backlog - work, 0.0)
+                self.inflight -= 1
+
+    def observe(self, size: str, audio_seconds: float, elapsed: float):
+        """Ajusta o rtf de `size` com uma transcrição medida no worker."""
+        if size not in self.rtf or audio_seconds <= 0:
+            return
+        with self._lock:
+            self.rtf[size] += _RTF_ALPHA * (elapsed / audio_seconds - self.rtf[size])
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "models": self.sizes,
+                "slo_seconds": self.slo_seconds,
+                "inflight": self.inflight,
+                "backlog_seconds": round(self.backlog, 2),
+                "rtf": {size: round(rtf, 3) for size, rtf in self.rtf.items()},
+            }
+
+
+router = (
+    ModelRouter(config.STT_ROUTE_MODELS, config.STT_LATENCY_SLO_SECONDS, config.CPU_WORKERS)
+    if config.STT_ROUTE_MODELS else None
+)
+
+
+def _observe(model_size: str, audio_seconds: float, elapsed: float):
+    if router is not None:
+        router.observe(model_size or config.STT_MODEL_SIZE, audio_seconds, elapsed)
+
+
+stt_batcher.timing_listeners.append(_observe)
+
+
+async def transcribe(audio, seconds: float) -> dict:
+    """
+    Transcreve `audio` (PCM de `seconds` segundos) com o modelo escolhido.
+    Retorna {"text", "model"}.
+    """
+    if router is None:
+        return {"text": await stt_chunker.transcribe(audio), "model": config.STT_MODEL_SIZE}
+
+    size = router.choose(seconds)
+    ROUTED.inc(model=size)
+    logger.info(
+        f"STT roteado para '{size}' ({seconds:.1f}s de áudio, "
+        f"{router.inflight} em andamento, previsto {router.predict(size, seconds):.2f}s)"
+    )
+    with router.serving(size, seconds):
+        text = await stt_chunker.transcribe(audio, size)
+    return {"text": text, "model": size}
+
+
+def stats() -> dict:
+    if router is None:
+        return {"models": [config.STT_MODEL_SIZE], "routing": False}
+    return {"routing": True, **router.stats()}
@@ -1,31 +1,73 @@
 """
 STT Service - Speech to Text
 -----------------------------
-Usa Whisper para transcrever áudio em texto.
+Transcreve áudio em texto usando o motor configurado em STT_ENGINE
+(ver app.services.stt_engines: whisper, faster-whisper ou fake).
+
+O modelo é carregado sob demanda pelo model_manager (uma instância
+por processo), não no import deste módulo. No pool de CPU roda
+transcribe_reporting(), que devolve também o status do modelo no worker.
 """
-import whisper
 import logging
+import time
+
+from app.services import model_manager
+from app.utils import metrics
 
 logger = logging.getLogger(__name__)
 
-# Carrega modelo Whisper uma vez
-try:
-    model = whisper.load_model("base")
-    logger.info("Modelo Whisper carregado com sucesso")
-except Exception as e:
-    logger.error(f"Falha ao carregar modelo Whisper: {e}")
-    model = None
+def transcribe(audio_file, model_size: str = None) -> str:
+    """
+    Converte áudio em texto.
 
-def transcribe(audio_file) -> str:
-    """Converte áudio em texto."""
-    if model is None:
+    `audio_file` pode ser o caminho de um arquivo ou um array NumPy float32
+    com PCM 16 kHz mono (usado pela transcrição em streaming).
+    `model_size` escolhe o modelo (padrão: STT_MODEL_SIZE; ver stt_router).
+    """
+    engine = model_manager.get_manager(model_size).get()
+    if engine is None:
         logger.warning("Modelo não carregado, retornando string vazia")
         return ""
     try:
-        result = model.transcribe(audio_file)
-        text = result.get("text", "").strip()
+        text = engine.transcribe(audio_file)
         logger.info(f"Transcrição concluída: {text[:50]}...")
         return text
     except Exception as e:
         logger.error(f"Erro ao transcrever áudio: {e}")
+        metrics.ERRORS.inc(component="stt")
         return ""
+
+def transcribe_batch(audios: list, model_size: str = None) -> list:
+    """
+    Transcreve um lote de áudios em uma única chamada ao motor
+    (usado pelo stt_batcher). Retorna os textos na mesma ordem.
+    """
+    engine = model_manager.get_manager(model_size).get()
+    if engine is None:
+        logger.warning("Modelo não carregado, retornando strings vazias")
+        return [""] * len(audios)
+    try:
+        texts = engine.transcribe_batch(audios)
+        logger.info(f"Lote de {len(audios)} transcrições concluído")
+        return texts
+    except Exception as e:
+        logger.error(f"Erro no lote de transcrição, processando individualmente: {e}")
+        return [transcribe(audio, model_size) for audio in audios]
+
+def transcribe_reporting(audios: list, model_size: str = None) -> dict:
+    """
+    Versão de transcribe_batch() para o pool de CPU: devolve os textos, o
+    status do modelo no worker que atendeu (o processo principal não vê o
+    modelo carregado nos workers), o tempo de transcrição medido no worker
+    (sem a fila do pool) e se o modelo já estava carregado (warm).
+    """
+    manager = model_manager.get_manager(model_size)
+    warm = manager.state == "ready"
+    start = time.perf_counter()
+    texts = transcribe_batch(audios, model_size)
+    return {
+        "texts": texts,
+        "status": manager.status(),
+        "seconds": time.perf_counter() - start,
+        "warm": warm,
+    }
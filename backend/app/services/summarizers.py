@@ -0,0 +1,213 @@
+"""
+Summarizers - Backends de resumo
+--------------------------------
+Registro de motores de resumo selecionáveis por configuração
+(SUMMARY_ENGINE / SUMMARY_FALLBACK):
+- "llm": API de chat da OpenAI via LLMClient (timeout, retries, breaker).
+- "extractive": local, sem rede e determinístico. Escolhe as frases mais
+  centrais da resposta (TF-IDF + TextRank com NumPy); respostas curtas
+  saem em poucos milissegundos. Serve de fallback quando o LLM falha ou
+  estoura o prazo, e de motor fixo em testes de carga.
+"""
+
+import logging
+import re
+
+import numpy as np
+
+from app.services import llm_client
+from app.utils import config
+
+logger = logging.getLogger(__name__)
+
+SUMMARIZERS = {}
+
+
+def register_summarizer(name: str):
+    """Decorator que registra uma classe de resumo sob `name`."""
+    def decorator(cls):
+        cls.name = name
+        SUMMARIZERS[name] = cls
+        return cls
+    return decorator
+
+
+class SummarizerError(Exception):
+    """O motor não conseguiu resumir (o chamador decide o fallback)."""
+
+
+class Summarizer:
+    """Interface comum dos motores de resumo."""
+
+    name = ""
+
+    def __init__(self, **options):
+        self.options = options
+
+    def available(self) -> bool:
+        """False quando falta configuração (ex.: chave da API)."""
+        return True
+
+    def cache_tag(self) -> str:
+        """Identifica motor/modelo na chave do cache de resumos."""
+        return self.name
+
+    def summarize(self, text: str, max_tokens: int) -> str:
+        raise NotImplementedError
+
+    async def summarize_async(self, text: str, max_tokens: int) -> str:
+        """Motores locais rodam direto no event loop (são rápidos)."""
+        return self.summarize(text, max_tokens)
+
+    async def stream(self, text: str, max_tokens: int):
+        """Gera o resumo em pedaços; por padrão, de uma vez só."""
+        yield await self.summarize_async(text, max_tokens)
+
+
+@register_summarizer("llm")
+class LLMSummarizer(Summarizer):
+
+    def __init__(self, client: llm_client.LLMClient = None, **options):
+        super().__init__(**options)
+        self.client = client or llm_client.create_client(config.OPENAI_API_KEY)
+
+    def available(self) -> bool:
+        return bool(self.client.api_key)
+
+    def cache_tag(self) -> str:
+        return f"llm:{config.SUMMARY_MODEL}:{config.SUMMARY_TEMPERATURE}"
+
+    @staticmethod
+    def _messages(text: str) -> list:
+        return [{"role": "user", "content": f"Resuma o seguinte texto:\n{text}"}]
+
+    def summarize(self, text: str, max_tokens: int) -> str:
+        try:
+            return self.client.chat_sync(
+                self._messages(text), config.SUMMARY_MODEL, max_tokens, config.SUMMARY_TEMPERATURE
+            )
+        except llm_client.LLMError as e:
+            raise SummarizerError(str(e)) from e
+
+    async def summarize_async(self, text: str, max_tokens: int) -> str:
+        try:
+            return await self.client.chat(
+                self._messages(text), config.SUMMARY_MODEL, max_tokens, config.SUMMARY_TEMPERATURE
+            )
+        except llm_client.LLMError as e:
+            raise SummarizerError(str(e)) from e
+
+    async def stream(self, text: str, max_tokens: int):
+        try:
+            async for delta in self.client.chat_stream(
+                self._messages(text), config.SUMMARY_MODEL, max_tokens, config.SUMMARY_TEMPERATURE
+            ):
+                yield delta
+        except llm_client.LLMError as e:
+            raise SummarizerError(str(e)) from e
+
+
+# ------------------------
+# Resumo extrativo (TF-IDF + TextRank)
+# ------------------------
+_SENTENCE_END = re.compile(r"(?<=[.!?…])\s+")
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+_STOPWORDS = frozenset("""
+a à ao aos as até com como da das de dela dele do dos e é ela ele eles em
+entre era essa esse esta está estava eu foi isso isto já lhe mais mas me
+meu minha muito na nas não no nos nós o os ou para pela pelo por porque
+quando que se sem ser seu sua são também te tem tenho um uma umas uns você
+""".split())
+
+# Transcrições sem pontuação são quebradas em blocos deste tamanho (palavras)
+_CHUNK_WORDS = 20
+
+
+def split_sentences(text: str) -> list:
+    sentences = [s.strip() for s in _SENTENCE_END.split(text.strip()) if s.strip()]
+    if len(sentences) == 1:
+        words = sentences[0].split()
+        if len(words) > 2 * _CHUNK_WORDS:
+            sentences = [
+                " ".join(words[i:i + _CHUNK_WORDS]) for i in range(0, len(words), _CHUNK_WORDS)
+            ]
+    return sentences
+
+
+def _tfidf(sentences: list) -> np.ndarray:
+    """Matriz frases × termos com TF-IDF e linhas normalizadas (L2)."""
+    tokens = [
+        [w for w in _WORD.findall(s.lower()) if w not in _STOPWORDS and len(w) > 1]
+        for s in sentences
+    ]
+    vocab = {word: i for i, word in enumerate(sorted({w for ts in tokens for w in ts}))}
+    matrix = np.zeros((len(sentences), max(len(vocab), 1)), dtype=np.float32)
+    for row, words in enumerate(tokens):
+        for word in words:
+            matrix[row, vocab[word]] += 1
+    df = np.count_nonzero(matrix, axis=0)
+    idf = np.log((1 + len(sentences)) / (1 + df)) + 1
+    matrix *= idf
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+
+def textrank(matrix: np.ndarray, damping: float = 0.85, iterations: int = 50) -> np.ndarray:
+    """PageRank sobre o grafo de similaridade (cosseno) entre frases."""
+    n = matrix.shape[0]
+    similarity = matrix @ matrix.T
+    np.fill_diagonal(similarity, 0)
+    totals = similarity.sum(axis=1, keepdims=True)
+    # Frases sem ligação distribuem o peso igualmente
+    transition = np.where(totals > 0, similarity / np.where(totals == 0, 1, totals), 1 / n)
+    scores = np.full(n, 1 / n, dtype=np.float64)
+    for _ in range(iterations):
+        updated = (1 - damping) / n + damping * transition.T @ scores
+        if np.abs(updated - scores).sum() < 1e-6:
+            return updated
+        scores = updated
+    return scores
+
+
+@register_summarizer("extractive")
+class ExtractiveSummarizer(Summarizer):
+
+    def __init__(self, max_sentences: int = 0, **options):
+        super().__init__(**options)
+        self.max_sentences = max_sentences or config.SUMMARY_MAX_SENTENCES
+
+    def summarize(self, text: str, max_tokens: int) -> str:
+        sentences = split_sentences(text)
+        if len(sentences) <= self.max_sentences:
+            return " ".join(sentences)
+
+        scores = textrank(_tfidf(sentences))
+        # Mais centrais primeiro; empate → frase mais antiga (determinístico)
+        ranked = sorted(range(len(sentences)), key=lambda i: (-scores[i], i))
+        # ~0,75 palavra por token
+        budget = max(int(max_tokens * 0.75), 1)
+        chosen, words = [], 0
+        for i in ranked[:self.max_sentences]:
+            length = len(sentences[i].split())
+            if chosen and words + length > budget:
+                break
+            chosen.append(i)
+            words += length
+        return " ".join(sentences[i] for i in sorted(chosen))
+
+    async def stream(self, text: str, max_tokens: int):
+        """Uma frase por pedaço (o resumo inteiro sai em milissegundos)."""
+        sentences = split_sentences(self.summarize(text, max_tokens))
+        for i, sentence in enumerate(sentences):
+            yield sentence if i == len(sentences) - 1 else sentence + " "
+
+
+def create_summarizer(name: str = "", **options) -> Summarizer:
+    """Instancia o motor indicado (padrão: SUMMARY_ENGINE)."""
+    name = name or config.SUMMARY_ENGINE
+    if name not in SUMMARIZERS:
+        raise ValueError(
+            f"Motor de resumo desconhecido: {name} (disponíveis: {sorted(SUMMARIZERS)})"
+        )
+    return SUMMARIZERS[name](**options)
@@ -3,13 +3,41 @@ Summary Service - Resumo de Texto
 ---------------------------------
 Responsável por resumir textos de forma automática utilizando a API da OpenAI (GPT).
 Este módulo é isolado para facilitar manutenção, testes e evolução do código.
+
+O motor vem de SUMMARY_ENGINE (app.services.summarizers): "llm" usa o
+LLMClient (pool de conexões, timeout, retries e circuit breaker);
+"extractive" resume localmente, sem rede. Se o motor falhar, estourar o
+prazo ou não tiver chave, o SUMMARY_FALLBACK (padrão "extractive") é
+usado; sem fallback, o texto original é devolvido.
+
+Cache de resumos:
+- A chave é hash(transcrição normalizada + modelo + parâmetros), então
+  reenvios do mesmo áudio e respostas idênticas não chamam a API de novo.
+- Camada em memória (LRU, SUMMARY_CACHE_MAX_ENTRIES) e, com
+  SUMMARY_CACHE_STORE=sqlite, uma camada em disco compartilhada entre
+  workers e preservada entre restarts (app.utils.ttl_store).
+- Single-flight: pedidos simultâneos do mesmo texto esperam uma única
+  chamada à API (lock por chave em threads; future compartilhado em
+  summarize_async).
+- Falhas da API e resumos de fallback não são cacheados.
+
+stream_summary() entrega o resumo em pedaços (SSE em POST /summary/stream
+e mensagens "summary_delta" no WebSocket /ws/transcribe).
 """
 
+import asyncio
+import hashlib
 import os
 import logging
-import openai
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
 from dotenv import load_dotenv
 
+from app.services import llm_client, summarizers
+from app.utils import config, executor, metrics, ttl_store
+
 # Configuração do logger para este módulo
 logger = logging.getLogger(__name__)
 
@@ -22,12 +50,220 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 if not OPENAI_API_KEY:
     logger.warning("Chave OPENAI_API_KEY não encontrada no .env")
 else:
-    openai.api_key = OPENAI_API_KEY
     logger.info("OpenAI API Key carregada com sucesso")
 
+# Cliente HTTP compartilhado (conexões reaproveitadas entre requisições)
+client = llm_client.create_client(OPENAI_API_KEY or "")
+
+engine = summarizers.create_summarizer(config.SUMMARY_ENGINE, client=client)
+fallback = (
+    summarizers.create_summarizer(config.SUMMARY_FALLBACK, client=client)
+    if config.SUMMARY_FALLBACK and config.SUMMARY_FALLBACK != config.SUMMARY_ENGINE
+    else None
+)
+_fallback_count = 0
+
+
+class SummaryCache:
+    """LRU em memória com camada opcional em disco (TTLStore)."""
+
+    def __init__(self, max_entries: int, disk: ttl_store.TTLStore = None):
+        self.max_entries = max_entries
+        self.disk = disk
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._items = OrderedDict()  # key -> resumo
+        self._lock = threading.Lock()
+        self._key_locks = {}  # key -> [lock, interessados]
+
+    @staticmethod
+    def key(text: str, engine_tag: str, max_tokens: int) -> str:
+        normalized = " ".join(text.split()).casefold()
+        raw = f"{engine_tag}\0{max_tokens}\0{normalized}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    @contextmanager
+    def key_lock(self, key: str):
+        """
+        Lock por chave (single-flight); sai do dicionário quando o último
+        interessado termina, com ou sem resumo em cache.
+        """
+        with self._lock:
+            entry = self._key_locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._key_locks[key]
+
+    def _remember(self, key: str, summary: str):
+        self._items[key] = summary
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_entries:
+            self._items.popitem(last=False)
+
+    def get(self, key: str, disk: bool = True):
+        """Busca na memória e, se `disk`, na camada em disco (bloqueante)."""
+        with self._lock:
+            summary = self._items.get(key)
+            if summary is not None:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return summary
+        if not disk:
+            return None
+        if self.disk is not None:
+            entry = self.disk.get(key)
+            if entry is not None:
+                with self._lock:
+                    self._remember(key, entry["summary"])
+                    self.disk_hits += 1
+                return entry["summary"]
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, summary: str):
+        with self._lock:
+            self._remember(key, summary)
+        if self.disk is not None:
+            self.disk.set(key, {"summary": summary})
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._items),
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+            }
+
+
+cache = SummaryCache(
+    config.SUMMARY_CACHE_MAX_ENTRIES,
+    ttl_store.SQLiteTTLStore(
+        config.SUMMARY_CACHE_TTL_SECONDS, config.SUMMARY_CACHE_DB_PATH, table="summaries"
+    ) if config.SUMMARY_CACHE_STORE == "sqlite" else None,
+)
+
+# Chamadas em andamento por chave (single-flight no event loop)
+_inflight = {}
+
+# ------------------------
+# Métricas
+# ------------------------
+ENGINE_SECONDS = metrics.Histogram(
+    "sidekick_summary_engine_seconds",
+    "Duração das chamadas ao motor de resumo (só falhas de cache)",
+    ("engine",),
+)
+CACHE_REQUESTS = metrics.Counter(
+    "sidekick_summary_cache_requests_total",
+    "Consultas ao cache de resumos por resultado",
+    ("result",),
+    fn=lambda: {
+        ("hit",): cache.hits, ("disk_hit",): cache.disk_hits, ("miss",): cache.misses,
+    },
+)
+FALLBACKS = metrics.Counter(
+    "sidekick_summary_fallbacks_total",
+    "Resumos gerados pelo SUMMARY_FALLBACK",
+    fn=lambda: _fallback_count,
+)
+LLM_EVENTS = metrics.Counter(
+    "sidekick_llm_events_total",
+    "Chamadas ao LLM por evento (calls, retries, failures, rejected)",
+    ("event",),
+    fn=lambda: {(name,): value for name, value in client.stats().items() if name != "breaker"},
+)
+LLM_BREAKER_OPEN = metrics.Gauge(
+    "sidekick_llm_breaker_open",
+    "1 quando o circuit breaker do LLM está aberto (chamadas recusadas)",
+    fn=lambda: float(client.breaker.state == "open"),
+)
+
+
+def _start_fallback(reason) -> bool:
+    """Registra a troca para o motor de fallback; False se não houver um."""
+    global _fallback_count
+    if fallback is None:
+        logger.error(f"Erro ao gerar resumo: {reason}. Retornando texto original.")
+        metrics.ERRORS.inc(component="summary")
+        return False
+    _fallback_count += 1
+    logger.warning(f"Resumo via '{fallback.name}' ({engine.name} falhou: {reason})")
+    return True
+
+
+def _use_fallback(text: str, max_tokens: int, reason) -> str:
+    if not _start_fallback(reason):
+        return text
+    try:
+        with ENGINE_SECONDS.time(engine=fallback.name):
+            return fallback.summarize(text, max_tokens)
+    except summarizers.SummarizerError as e:
+        logger.error(f"Fallback de resumo também falhou: {e}")
+        metrics.ERRORS.inc(component="summary")
+        return text
+
+
+async def _use_fallback_async(text: str, max_tokens: int, reason) -> str:
+    if not _start_fallback(reason):
+        return text
+    try:
+        with ENGINE_SECONDS.time(engine=fallback.name):
+            return await fallback.summarize_async(text, max_tokens)
+    except summarizers.SummarizerError as e:
+        logger.error(f"Fallback de resumo também falhou: {e}")
+        metrics.ERRORS.inc(component="summary")
+        return text
+
+
+def _summarize_uncached(key: str, text: str, max_tokens: int) -> str:
+    with cache.key_lock(key):
+        # Outra thread pode ter resumido o mesmo texto enquanto esperávamos
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+        try:
+            with ENGINE_SECONDS.time(engine=engine.name):
+                summary = engine.summarize(text, max_tokens)
+        except summarizers.SummarizerError as e:
+            return _use_fallback(text, max_tokens, e)
+        cache.put(key, summary)
+        logger.info(f"Resumo gerado com sucesso: {summary[:50]}...")  # Log das primeiras palavras
+        return summary
+
+
+async def _summarize_remote(key: str, text: str, max_tokens: int) -> str:
+    # A camada em disco (SQLite) é bloqueante: consultada no pool de I/O
+    if cache.disk is not None:
+        cached = await executor.run_io(cache.get, key)
+    else:
+        cached = cache.get(key)
+    if cached is not None:
+        return cached
+    try:
+        with ENGINE_SECONDS.time(engine=engine.name):
+            summary = await engine.summarize_async(text, max_tokens)
+    except summarizers.SummarizerError as e:
+        return await _use_fallback_async(text, max_tokens, e)
+    if cache.disk is not None:
+        await executor.run_io(cache.put, key, summary)
+    else:
+        cache.put(key, summary)
+    logger.info(f"Resumo gerado com sucesso: {summary[:50]}...")
+    return summary
+
+
 def summarize(text: str, max_tokens: int = 100) -> str:
     """
-    Recebe um texto e retorna um resumo conciso usando GPT.
+    Recebe um texto e retorna um resumo conciso (motor SUMMARY_ENGINE).
 
     Parâmetros:
     ----------
@@ -39,23 +275,113 @@ def summarize(text: str, max_tokens: int = 100) -> str:
     Retorna:
     -------
     str
-        Texto resumido gerado pelo GPT.
+        Texto resumido.
     """
-    if not OPENAI_API_KEY:
-        logger.error("OpenAI API Key não configurada. Retornando texto original.")
+    if not text.strip():
         return text
+    if not engine.available():
+        return _use_fallback(text, max_tokens, "motor não configurado (OPENAI_API_KEY?)")
 
-    try:
-        # Chamada à API da OpenAI para gerar resumo
-        response = openai.Completion.create(
-            engine="text-davinci-003",        # Modelo GPT
-            prompt=f"Resuma o seguinte texto:\n{text}",
-            max_tokens=max_tokens,
-            temperature=0.7,
+    key = cache.key(text, engine.cache_tag(), max_tokens)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+    return _summarize_uncached(key, text, max_tokens)
+
+
+async def summarize_async(text: str, max_tokens: int = 100) -> str:
+    """
+    Versão assíncrona usada pelo pipeline: a chamada ao LLM não ocupa
+    threads e pedidos simultâneos do mesmo texto compartilham um future.
+    """
+    if not text.strip():
+        return text
+    if not engine.available():
+        return await _use_fallback_async(
+            text, max_tokens, "motor não configurado (OPENAI_API_KEY?)"
         )
-        summary = response.choices[0].text.strip()
-        logger.info(f"Resumo gerado com sucesso: {summary[:50]}...")  # Log das primeiras palavras
+
+    key = cache.key(text, engine.cache_tag(), max_tokens)
+    cached = cache.get(key, disk=False)
+    if cached is not None:
+        return cached
+
+    future = _inflight.get(key)
+    if future is not None:
+        return await asyncio.shield(future)
+
+    future = asyncio.get_running_loop().create_future()
+    _inflight[key] = future
+    try:
+        summary = await _summarize_remote(key, text, max_tokens)
+        future.set_result(summary)
         return summary
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
     except Exception as e:
-        logger.error(f"Erro ao gerar resumo: {e}")
-        return text
+        future.set_exception(e)
+        # Evita "exception was never retrieved" quando ninguém mais esperava
+        future.exception()
+        raise
+    finally:
+        _inflight.pop(key, None)
+
+
+async def stream_summary(text: str, max_tokens: int = 100):
+    """
+    Gera o resumo em pedaços conforme o motor produz (tokens do stream do
+    LLM ou frases do motor extrativo). Acerto de cache sai de uma vez.
+    Se o motor falhar antes do primeiro pedaço, o fallback assume; se
+    falhar no meio, o stream termina com o que já foi enviado.
+    """
+    if not text.strip():
+        return
+
+    reason = "motor não configurado (OPENAI_API_KEY?)"
+    if engine.available():
+        key = cache.key(text, engine.cache_tag(), max_tokens)
+        if cache.disk is not None:
+            cached = await executor.run_io(cache.get, key)
+        else:
+            cached = cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+
+        parts = []
+        try:
+            async for delta in engine.stream(text, max_tokens):
+                parts.append(delta)
+                yield delta
+        except summarizers.SummarizerError as e:
+            if parts:
+                logger.error(f"Stream de resumo interrompido: {e}")
+                return
+            reason = e
+        else:
+            summary = "".join(parts).strip()
+            if cache.disk is not None:
+                await executor.run_io(cache.put, key, summary)
+            else:
+                cache.put(key, summary)
+            return
+
+    if not _start_fallback(reason):
+        yield text
+        return
+    try:
+        async for delta in fallback.stream(text, max_tokens):
+            yield delta
+    except summarizers.SummarizerError as e:
+        logger.error(f"Fallback de resumo também falhou: {e}")
+        metrics.ERRORS.inc(component="summary")
+
+
+def stats() -> dict:
+    return {
+        "engine": engine.name,
+        "fallback": fallback.name if fallback else None,
+        "fallbacks": _fallback_count,
+        "cache": cache.stats(),
+    }
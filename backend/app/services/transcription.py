@@ -1,16 +1,13 @@
 """
 Serviço responsável por transcrever áudio em texto.
-Pode usar Whisper (OpenAI) ou Vosk (open-source).
+Mantido por compatibilidade: delega para app.services.stt_service, que
+compartilha o mesmo modelo (model_manager) em vez de carregar outra cópia.
 """
 
-import whisper
-
-# Carrega o modelo uma única vez (boa prática)
-model = whisper.load_model("base")
+from app.services import stt_service
 
 def transcribe(audio_file) -> str:
     """
     Recebe um arquivo de áudio e retorna o texto transcrito.
     """
-    result = model.transcribe(audio_file)
-    return result["text"]
+    return stt_service.transcribe(audio_file)
@@ -0,0 +1,213 @@
+"""
+TTS Engines - Backends de Text to Speech
+----------------------------------------
+Registro de motores de síntese selecionáveis por configuração
+(TTS_ENGINE / TTS_FALLBACK), sem mudança de código:
+- "gtts": Google Text-to-Speech (MP3, exige rede; latência variável).
+- "espeak-ng": local e offline (subprocesso, WAV); frases curtas saem
+  em dezenas de milissegundos. Serve de fallback quando o gTTS falha.
+- "piper": local e offline, voz neural (subprocesso, WAV; exige
+  TTS_PIPER_MODEL com o arquivo .onnx da voz).
+- "fake": MP3 mudo determinístico, sem rede; para testes e benchmarks.
+
+Cada motor tem um limite próprio de sínteses simultâneas (TTS_CONCURRENCY,
+ou o padrão do motor): o gTTS não abre dezenas de conexões ao Google e
+os motores locais não disputam mais núcleos do que a máquina tem.
+As bibliotecas/binários de cada backend só são exigidos no uso.
+Toda síntese tem prazo (TTS_TIMEOUT_SECONDS), inclusive a do gTTS.
+"""
+
+import io
+import logging
+import os
+import shutil
+import subprocess
+import threading
+
+from app.utils import config
+
+logger = logging.getLogger(__name__)
+
+ENGINES = {}
+
+
+def register_engine(name: str):
+    """Decorator que registra uma classe de motor sob `name`."""
+    def decorator(cls):
+        cls.name = name
+        ENGINES[name] = cls
+        return cls
+    return decorator
+
+
+class TTSError(Exception):
+    """O motor não conseguiu sintetizar o texto (o chamador decide o fallback)."""
+
+
+class TTSEngine:
+    """Interface comum dos motores de TTS."""
+
+    name = ""
+    extension = "mp3"
+    default_concurrency = 4
+
+    def __init__(self, concurrency: int = 0):
+        self.concurrency = concurrency or self.default_concurrency
+        # generate_audio roda em threads do pool de I/O
+        self.slots = threading.BoundedSemaphore(self.concurrency)
+
+    def available(self) -> bool:
+        """False quando falta o binário/biblioteca do motor."""
+        return True
+
+    def cache_tag(self) -> str:
+        """Identifica motor/voz na chave do cache de áudio."""
+        return self.name
+
+    def synthesize(self, text: str, lang: str, path: str):
+        """Grava em `path` a fala de `text`. Levanta TTSError."""
+        raise NotImplementedError
+
+    def describe(self) -> dict:
+        return {"engine": self.name, "format": self.extension, "concurrency": self.concurrency}
+
+
+@register_engine("gtts")
+class GTTSEngine(TTSEngine):
+    default_concurrency = 4
+
+    def __init__(self, concurrency: int = 0):
+        super().__init__(concurrency)
+        # Conexões vivas com a API: a vaga só volta quando a thread termina,
+        # inclusive as abandonadas pelo timeout (`slots` é liberado antes)
+        self.connections = threading.BoundedSemaphore(self.concurrency)
+
+    def synthesize(self, text: str, lang: str, path: str):
+        result = {}
+
+        def request():
+            try:
+                from gtts import gTTS
+
+                buffer = io.BytesIO()
+                gTTS(text=text, lang=lang).write_to_fp(buffer)
+                result["audio"] = buffer.getvalue()
+            except Exception as e:
+                result["error"] = e
+            finally:
+                self.connections.release()
+
+        if not self.connections.acquire(timeout=config.TTS_TIMEOUT_SECONDS):
+            raise TTSError("gTTS falhou: conexões ocupadas por requisições sem resposta")
+        # O gTTS chama a API sem timeout: a requisição roda em uma thread própria
+        # e o chamador espera no máximo TTS_TIMEOUT_SECONDS. O áudio só é gravado
+        # aqui, então uma requisição abandonada nunca escreve em `path`.
+        worker = threading.Thread(target=request, name="gtts", daemon=True)
+        try:
+            worker.start()
+        except Exception:
+            self.connections.release()
+            raise
+        worker.join(config.TTS_TIMEOUT_SECONDS)
+        if worker.is_alive():
+            raise TTSError(f"gTTS falhou: sem resposta em {config.TTS_TIMEOUT_SECONDS}s")
+        if "error" in result:
+            raise TTSError(f"gTTS falhou: {result['error']}") from result["error"]
+        with open(path, "wb") as f:
+            f.write(result["audio"])
+
+
+class _SubprocessEngine(TTSEngine):
+    """Motor local executado como subprocesso (texto no stdin)."""
+
+    extension = "wav"
+    default_concurrency = os.cpu_count() or 1
+    binary = ""
+
+    def available(self) -> bool:
+        return shutil.which(self.binary) is not None
+
+    def command(self, lang: str, path: str) -> list:
+        raise NotImplementedError
+
+    def synthesize(self, text: str, lang: str, path: str):
+        try:
+            proc = subprocess.run(
+                self.command(lang, path),
+                input=text.encode("utf-8"),
+                capture_output=True,
+                timeout=config.TTS_TIMEOUT_SECONDS,
+            )
+        except (OSError, subprocess.TimeoutExpired) as e:
+            raise TTSError(f"{self.name} falhou: {e}") from e
+        if proc.returncode != 0 or not os.path.exists(path):
+            message = proc.stderr.decode(errors="ignore").strip().splitlines()
+            raise TTSError(f"{self.name} falhou: {message[-1] if message else proc.returncode}")
+
+
+# Vozes do espeak-ng por idioma (o padrão "pt" seria o português europeu)
+_ESPEAK_VOICES = {"pt": "pt-br", "en": "en-us"}
+
+
+@register_engine("espeak-ng")
+class EspeakEngine(_SubprocessEngine):
+
+    def __init__(self, concurrency: int = 0):
+        super().__init__(concurrency)
+        self.binary = config.TTS_ESPEAK_BIN
+
+    def voice(self, lang: str) -> str:
+        return config.TTS_ESPEAK_VOICE or _ESPEAK_VOICES.get(lang, lang)
+
+    def cache_tag(self) -> str:
+        return f"{self.name}:{config.TTS_ESPEAK_VOICE}:{config.TTS_ESPEAK_SPEED}"
+
+    def command(self, lang: str, path: str) -> list:
+        return [
+            self.binary, "--stdin", "-v", self.voice(lang),
+            "-s", str(config.TTS_ESPEAK_SPEED), "-w", path,
+        ]
+
+
+@register_engine("piper")
+class PiperEngine(_SubprocessEngine):
+
+    def __init__(self, concurrency: int = 0):
+        super().__init__(concurrency)
+        self.binary = config.TTS_PIPER_BIN
+
+    def available(self) -> bool:
+        return super().available() and os.path.isfile(config.TTS_PIPER_MODEL)
+
+    def cache_tag(self) -> str:
+        # A voz é fixa (definida pelo modelo), independente de `lang`
+        return f"{self.name}:{os.path.basename(config.TTS_PIPER_MODEL)}"
+
+    def command(self, lang: str, path: str) -> list:
+        return [self.binary, "--model", config.TTS_PIPER_MODEL, "--output_file", path]
+
+
+# Frame MPEG-1 Layer III mudo (32 kbps, 44,1 kHz, mono, ~26 ms)
+_SILENT_MP3_FRAME = b"\xff\xfb\x10\xc0" + bytes(100)
+# ~0,3 s de áudio por palavra
+_FAKE_FRAMES_PER_WORD = 12
+
+
+@register_engine("fake")
+class FakeEngine(TTSEngine):
+    default_concurrency = 64
+
+    def synthesize(self, text: str, lang: str, path: str):
+        frames = max(len(text.split()), 1) * _FAKE_FRAMES_PER_WORD
+        with open(path, "wb") as f:
+            f.write(_SILENT_MP3_FRAME * frames)
+
+
+def create_engine(name: str = "", **options) -> TTSEngine:
+    """Instancia o motor indicado (padrão: TTS_ENGINE, limite TTS_CONCURRENCY)."""
+    name = name or config.TTS_ENGINE
+    if name not in ENGINES:
+        raise ValueError(f"Motor TTS desconhecido: {name} (disponíveis: {sorted(ENGINES)})")
+    if name == config.TTS_ENGINE:
+        options.setdefault("concurrency", config.TTS_CONCURRENCY)
+    return ENGINES[name](**options)
@@ -2,27 +2,242 @@
 TTS Service - Text to Speech
 -----------------------------
 Responsável por converter texto em áudio (fala) para o usuário.
-Usa a biblioteca gTTS (Google Text-to-Speech) para gerar arquivos MP3.
-Este módulo é isolado para facilitar manutenção e testes.
+O motor vem de TTS_ENGINE (app.services.tts_engines): gTTS (rede),
+espeak-ng/piper (locais, offline) ou fake. Se o motor falhar, o
+TTS_FALLBACK (padrão espeak-ng, quando instalado) gera o áudio; o erro
+só vira caminho vazio quando nenhum dos dois consegue.
+
+Cache de áudio:
+- O nome do arquivo é derivado de hash(texto + idioma + motor) (`tts_<hash>.ogg`
+  com TTS_OUTPUT_CODEC=opus; vazio mantém o formato do motor, .mp3 ou .wav),
+  então a mesma pergunta gera sempre o mesmo arquivo (estável e cacheável via HTTP).
+- O áudio do motor é convertido para TTS_OUTPUT_CODEC (app.utils.audio_encoder)
+  antes de entrar no cache; se a conversão falhar, o formato do motor é mantido.
+- Um índice em memória (LRU) evita nova síntese em perguntas repetidas
+  e remove os arquivos menos usados quando passa de TTS_CACHE_MAX_BYTES
+  ou TTS_CACHE_MAX_ENTRIES.
+- warmup() pré-gera as perguntas conhecidas na inicialização.
 """
 
-from gtts import gTTS
-import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+import hashlib
 import os
+import threading
 import logging
 
+from app.services import tts_engines
+from app.utils import audio_encoder, config, metrics
+from app.utils.artifact_store import store as artifact_store
+
 # Configuração do logger para este módulo
 logger = logging.getLogger(__name__)
 
-# Diretório temporário para salvar arquivos de áudio gerados
-TMP_AUDIO_DIR = "tmp"
+# Diretório onde os áudios gerados (e cacheados) ficam salvos
+TMP_AUDIO_DIR = config.TTS_CACHE_DIR
 if not os.path.exists(TMP_AUDIO_DIR):
     os.makedirs(TMP_AUDIO_DIR)
     logger.info(f"Pasta temporária criada em: {TMP_AUDIO_DIR}")
 
+
+class TTSCache:
+    """
+    Índice LRU de áudios já sintetizados, endereçados por conteúdo.
+    Thread-safe: generate_audio roda no pool de threads do pipeline.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, max_entries: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._index = OrderedDict()  # key -> (path, size)
+        self._lock = threading.Lock()
+        self._key_locks = {}  # key -> [lock, interessados]
+
+    @staticmethod
+    def key(text: str, lang: str, engine_tag: str = "gtts") -> str:
+        # O motor só entra na chave fora do padrão (nomes gTTS continuam estáveis)
+        raw = f"{lang}\0{text}" if engine_tag == "gtts" else f"{engine_tag}\0{lang}\0{text}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+    def path_for(self, key: str, extension: str = "mp3") -> str:
+        return os.path.join(self.directory, f"tts_{key}.{extension}")
+
+    @contextmanager
+    def key_lock(self, key: str):
+        """
+        Lock por chave: requisições simultâneas da mesma frase geram um único
+        áudio. Sai do dicionário quando o último interessado termina.
+        """
+        with self._lock:
+            entry = self._key_locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._key_locks[key]
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            path, size = entry
+            if not os.path.exists(path):
+                del self._index[key]
+                self.total_bytes -= size
+                self.misses += 1
+                return None
+            self._index.move_to_end(key)
+            self.hits += 1
+        artifact_store.touch(path)
+        return path
+
+    def put(self, key: str, path: str):
+        size = os.path.getsize(path)
+        with self._lock:
+            old = self._index.pop(key, None)
+            if old is not None:
+                self.total_bytes -= old[1]
+            self._index[key] = (path, size)
+            self.total_bytes += size
+            self._evict()
+
+    def _evict(self):
+        while self._index and (
+            self.total_bytes > self.max_bytes or len(self._index) > self.max_entries
+        ):
+            key, (path, size) = self._index.popitem(last=False)
+            self.total_bytes -= size
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            logger.info(f"Cache TTS: removido {path}")
+
+    def load_existing(self):
+        """
+        Reindexa arquivos tts_* já presentes no disco (mais antigos primeiro).
+        Se uma frase tem mais de um formato (variantes do /play_audio), fica
+        indexado o de TTS_OUTPUT_CODEC.
+        """
+        extensions = {f".{cls.extension}" for cls in tts_engines.ENGINES.values()}
+        extensions |= {f".{codec['extension']}" for codec in audio_encoder.CODECS.values()}
+        preferred = f".{audio_encoder.extension(config.TTS_OUTPUT_CODEC)}" if config.TTS_OUTPUT_CODEC else ""
+        entries = []
+        for name in os.listdir(self.directory):
+            stem, extension = os.path.splitext(name)
+            if stem.startswith("tts_") and extension in extensions:
+                path = os.path.join(self.directory, name)
+                entries.append((extension == preferred, os.path.getmtime(path), stem[4:], path))
+        for _, _, key, path in sorted(entries):
+            self.put(key, path)
+        if entries:
+            logger.info(f"Cache TTS: {len(entries)} áudios reindexados")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._index),
+                "bytes": self.total_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+engine = tts_engines.create_engine(config.TTS_ENGINE)
+fallback = (
+    tts_engines.create_engine(config.TTS_FALLBACK)
+    if config.TTS_FALLBACK and config.TTS_FALLBACK != config.TTS_ENGINE
+    else None
+)
+
+cache = TTSCache(TMP_AUDIO_DIR, config.TTS_CACHE_MAX_BYTES, config.TTS_CACHE_MAX_ENTRIES)
+cache.load_existing()
+
+SYNTHESIS_SECONDS = metrics.Histogram(
+    "sidekick_tts_synthesis_seconds",
+    "Duração da síntese de fala (só falhas de cache)",
+    ("engine",),
+)
+CACHE_REQUESTS = metrics.Counter(
+    "sidekick_tts_cache_requests_total",
+    "Consultas ao cache TTS por resultado",
+    ("result",),
+    fn=lambda: {("hit",): cache.hits, ("miss",): cache.misses},
+)
+CACHE_BYTES = metrics.Gauge(
+    "sidekick_tts_cache_bytes",
+    "Bytes de áudio no cache TTS",
+    fn=lambda: cache.total_bytes,
+)
+
+
+def _generate(tts: tts_engines.TTSEngine, text: str, lang: str) -> str:
+    """Áudio de `text` pelo motor `tts` (do cache, se já existir). Levanta TTSError."""
+    key = cache.key(text, lang, tts.cache_tag())
+    cached = cache.get(key)
+    if cached:
+        return cached
+
+    with cache.key_lock(key):
+        # Outra thread pode ter gerado o mesmo áudio enquanto esperávamos
+        cached = cache.get(key)
+        if cached:
+            return cached
+
+        filepath = cache.path_for(key, tts.extension)
+        partial = f"{filepath}.part"
+        try:
+            # Sintetiza e salva o arquivo (rename atômico no final)
+            with tts.slots, SYNTHESIS_SECONDS.time(engine=tts.name):
+                tts.synthesize(text, lang, partial)
+            converted = _encode_output(partial, key, tts.extension)
+            if converted:
+                filepath = converted
+            else:
+                os.replace(partial, filepath)
+        except OSError as e:
+            raise tts_engines.TTSError(str(e)) from e
+        finally:
+            if os.path.exists(partial):
+                os.remove(partial)
+        cache.put(key, filepath)
+        artifact_store.register(filepath)
+
+        logger.info(f"Áudio TTS gerado com sucesso ({tts.name}): {filepath}")
+        return filepath
+
+
+def _encode_output(partial: str, key: str, native_extension: str):
+    """
+    Converte o áudio sintetizado para TTS_OUTPUT_CODEC. Retorna o caminho
+    convertido, ou None para manter o formato do motor.
+    """
+    codec = config.TTS_OUTPUT_CODEC
+    if not codec or audio_encoder.extension(codec) == native_extension:
+        return None
+    path = cache.path_for(key, audio_encoder.extension(codec))
+    try:
+        audio_encoder.transcode(partial, path, codec)
+    except audio_encoder.AudioEncodeError as e:
+        logger.warning(f"Conversão do TTS para {codec} falhou ({e}); mantendo {native_extension}")
+        return None
+    os.remove(partial)
+    return path
+
+
 def generate_audio(text: str, lang: str = "pt") -> str:
     """
-    Recebe um texto e gera um arquivo de áudio (MP3) com a fala correspondente.
+    Recebe um texto e gera um arquivo de áudio com a fala correspondente.
 
     Parâmetros:
     ----------
@@ -34,20 +249,40 @@ def generate_audio(text: str, lang: str = "pt") -> str:
     Retorna:
     -------
     str
-        Caminho do arquivo de áudio gerado.
+        Caminho do arquivo de áudio gerado (ou "" se nem o motor nem o
+        fallback conseguirem).
     """
     try:
-        # Gera um nome único para o arquivo de áudio
-        filename = f"speech_{uuid.uuid4()}.mp3"
-        filepath = os.path.join(TMP_AUDIO_DIR, filename)
+        return _generate(engine, text, lang)
+    except tts_engines.TTSError as e:
+        error = e
+    metrics.ERRORS.inc(component="tts")
 
-        # Cria o objeto gTTS e salva o arquivo
-        tts = gTTS(text=text, lang=lang)
-        tts.save(filepath)
+    if fallback is None or not fallback.available():
+        logger.error(f"Erro ao gerar áudio TTS: {error}")
+        return ""
+    logger.warning(f"TTS via '{fallback.name}' ({engine.name} falhou: {error})")
+    try:
+        return _generate(fallback, text, lang)
+    except tts_engines.TTSError as e:
+        logger.error(f"Fallback de TTS também falhou: {e}")
+        return ""
 
-        logger.info(f"Áudio TTS gerado com sucesso: {filepath}")
-        return filepath
 
-    except Exception as e:
-        logger.error(f"Erro ao gerar áudio TTS: {e}")
-        return ""
+def stats() -> dict:
+    """Motor em uso e fallback disponível (o cache tem seu próprio stats())."""
+    return {
+        "engine": engine.describe(),
+        "output_codec": config.TTS_OUTPUT_CODEC or None,
+        "fallback": fallback.name if fallback and fallback.available() else None,
+    }
+
+
+def warmup(texts, lang: str = "pt") -> int:
+    """
+    Pré-gera o áudio de textos conhecidos (ex.: perguntas do InterviewBot).
+    Retorna quantos áudios ficaram disponíveis no cache.
+    """
+    ready = sum(1 for text in texts if generate_audio(text, lang))
+    logger.info(f"Cache TTS pré-aquecido: {ready}/{len(texts)} áudios")
+    return ready
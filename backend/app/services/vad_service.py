@@ -0,0 +1,131 @@
+"""
+VAD Service - Detecção de voz e remoção de silêncio
+---------------------------------------------------
+Remove silêncios do início, do fim e pausas longas antes do STT, para
+o Whisper não gastar processamento (nem alucinar texto) em trechos mudos:
+1. Divide o áudio em quadros de VAD_FRAME_MS e calcula a energia (dBFS)
+   de todos os quadros de uma vez com NumPy.
+2. Considera voz o que fica VAD_MARGIN_DB acima do piso de ruído
+   (percentil 10), sem passar de VAD_MARGIN_DB abaixo do pico (percentil
+   99.9: mesmo uma fala curta em muito ruído define o pico), e acima
+   de VAD_MIN_DB.
+3. Expande os quadros de voz em VAD_PAD_MS (preserva início/fim de
+   palavras e fecha pausas curtas) e descarta rajadas menores que
+   VAD_MIN_SPEECH_MS.
+4. Retorna os segmentos de fala concatenados e quantos segundos foram cortados.
+
+Não usa modelo de rede: é rápido e determinístico.
+"""
+
+import logging
+
+import numpy as np
+
+from app.utils import config, metrics
+from app.utils.audio_decoder import SAMPLE_RATE
+
+logger = logging.getLogger(__name__)
+
+TRIMMED_SECONDS = metrics.Counter(
+    "sidekick_vad_trimmed_seconds_total",
+    "Segundos de silêncio removidos antes do STT",
+)
+
+# Silêncio curto inserido entre segmentos para não colar palavras
+_GAP_SECONDS = 0.1
+
+
+def frame_energy_db(audio: np.ndarray, frame: int) -> np.ndarray:
+    n_frames = len(audio) // frame
+    frames = audio[: n_frames * frame].reshape(n_frames, frame)
+    return 10 * np.log10(np.mean(frames ** 2, axis=1) + 1e-10)
+
+
+def _runs(mask: np.ndarray) -> np.ndarray:
+    """Retorna pares [início, fim) das sequências True de uma máscara booleana."""
+    padded = np.concatenate([[False], mask, [False]]).astype(np.int8)
+    edges = np.flatnonzero(np.diff(padded))
+    return edges.reshape(-1, 2)
+
+
+def detect_speech(audio: np.ndarray, sample_rate: int = SAMPLE_RATE) -> list:
+    """
+    Detecta trechos de fala.
+
+    Retorna:
+    -------
+    list
+        Pares (início, fim) em amostras, em ordem.
+    """
+    frame = int(sample_rate * config.VAD_FRAME_MS / 1000)
+    if len(audio) < frame:
+        return []
+
+    energy = frame_energy_db(audio, frame)
+    noise_floor, peak = np.percentile(energy, [10, 99.9])
+    # Sem pausas (fala contínua) o piso de ruído é a própria fala: limita pelo pico
+    threshold = max(
+        min(noise_floor + config.VAD_MARGIN_DB, peak - config.VAD_MARGIN_DB),
+        config.VAD_MIN_DB,
+    )
+    speech = energy > threshold
+
+    # Expande a fala para os lados (hangover) e fecha pausas curtas
+    pad = int(config.VAD_PAD_MS / config.VAD_FRAME_MS)
+    if pad > 0:
+        speech = np.convolve(speech, np.ones(2 * pad + 1), mode="same") > 0
+
+    min_frames = max(int(config.VAD_MIN_SPEECH_MS / config.VAD_FRAME_MS), 1)
+    segments = []
+    for start, end in _runs(speech):
+        if end - start >= min_frames:
+            segments.append((int(start * frame), int(min(end * frame, len(audio)))))
+    return segments
+
+
+def trim_silence(audio: np.ndarray, sample_rate: int = SAMPLE_RATE) -> dict:
+    """
+    Remove os silêncios do áudio.
+
+    Retorna:
+    -------
+    dict
+        audio: fala concatenada (float32), segments: lista de (início, fim)
+        em segundos, speech_seconds e trimmed_seconds.
+    """
+    total_seconds = len(audio) / sample_rate
+    segments = detect_speech(audio, sample_rate)
+
+    if segments:
+        gap = np.zeros(int(_GAP_SECONDS * sample_rate), dtype=np.float32)
+        pieces = []
+        for start, end in segments:
+            if pieces:
+                pieces.append(gap)
+            pieces.append(audio[start:end])
+        speech = np.concatenate(pieces).astype(np.float32, copy=False)
+    else:
+        speech = np.zeros(0, dtype=np.float32)
+
+    speech_seconds = sum(end - start for start, end in segments) / sample_rate
+    result = {
+        "audio": speech,
+        "segments": [(start / sample_rate, end / sample_rate) for start, end in segments],
+        "speech_seconds": round(speech_seconds, 3),
+        "trimmed_seconds": round(total_seconds - speech_seconds, 3),
+    }
+    TRIMMED_SECONDS.inc(result["trimmed_seconds"])
+    logger.info(
+        f"VAD: {len(segments)} segmento(s), {result['speech_seconds']}s de fala, "
+        f"{result['trimmed_seconds']}s de silêncio removidos"
+    )
+    return result
+
+
+def stats(result: dict) -> dict:
+    """Resumo serializável do resultado do VAD (sem o áudio)."""
+    return {
+        "segments": len(result["segments"]),
+        "speech_seconds": result["speech_seconds"],
+        "trimmed_seconds": result["trimmed_seconds"],
+    }
@@ -0,0 +1,23 @@
+"""
+Funções auxiliares compartilhadas pelos testes
+Gera áudio sintético sem depender de arquivos externos
+"""
+
+import io
+import wave
+
+import numpy as np
+
+def wav_bytes(seconds: float, sample_rate: int = 16000, frequency: float = 440.0) -> bytes:
+    """
+    Retorna um WAV PCM 16-bit mono com um tom senoidal
+    """
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    pcm = (0.3 * np.sin(2 * np.pi * frequency * t) * 32767).astype(np.int16)
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm.tobytes())
+    return buffer.getvalue()
@@ -5,6 +5,7 @@ Verifica envio de arquivo de áudio, transcrição e resumo
 
 from fastapi.testclient import TestClient
 from app.main import app
+from app.tests.helpers import wav_bytes
 from io import BytesIO
 
 client = TestClient(app)
@@ -13,7 +14,7 @@ def test_answer_with_valid_audio():
     """
     Testa envio de arquivo WAV válido e verifica resposta do bot
     """
-    audio_content = BytesIO(b"fake audio data")  # Simula arquivo de áudio
+    audio_content = BytesIO(wav_bytes(1.0))
     files = {"audio": ("test.wav", audio_content, "audio/wav")}
     response = client.post("/answer", files=files)
     
@@ -22,15 +23,42 @@ def test_answer_with_valid_audio():
     assert "transcription" in data
     assert "summary" in data
     assert "next_question_audio" in data
+    assert "stt" in data["timings"]
 
 def test_answer_with_invalid_file_type():
     """
-    Testa envio de arquivo inválido e espera erro
+    Testa envio de arquivo inválido e espera 415 (não é áudio)
     """
     fake_file = BytesIO(b"not audio")
     files = {"audio": ("test.txt", fake_file, "text/plain")}
     response = client.post("/answer", files=files)
     
-    assert response.status_code == 200
+    assert response.status_code == 415
     data = response.json()
-    assert "error" in data
+    assert "detail" in data
+
+def test_answer_advances_the_session_interview():
+    """
+    O /answer segue a entrevista da sessão (X-Session-Id) iniciada pelo /next_question
+    """
+    headers = {"X-Session-Id": "sessao-answer"}
+    first = client.get("/next_question", headers=headers).json()
+    files = {"audio": ("test.wav", BytesIO(wav_bytes(1.0)), "audio/wav")}
+    response = client.post("/answer", files=files, headers=headers)
+
+    assert response.status_code == 200
+    assert response.json()["session_id"] == "sessao-answer"
+    second = client.get("/next_question", headers=headers).json()
+    assert second["question_index"] == first["question_index"] + 2
+
+def test_rejected_answer_does_not_consume_the_question():
+    """
+    Um upload recusado (415) não avança a entrevista da sessão
+    """
+    headers = {"X-Session-Id": "sessao-recusada"}
+    first = client.get("/next_question", headers=headers).json()
+    files = {"audio": ("test.txt", BytesIO(b"not audio"), "text/plain")}
+    assert client.post("/answer", files=files, headers=headers).status_code == 415
+
+    second = client.get("/next_question", headers=headers).json()
+    assert second["question_index"] == first["question_index"] + 1
@@ -0,0 +1,70 @@
+"""
+Testes do ciclo de vida dos arquivos temporários
+Verifica expiração por TTL e remoção LRU ao passar da quota
+"""
+
+import os
+import time
+
+from app.utils.artifact_store import ArtifactStore
+
+def _write(path, size):
+    with open(path, "wb") as f:
+        f.write(b"x" * size)
+    return str(path)
+
+def test_sweep_removes_expired_files(tmp_path):
+    """
+    Arquivos com TTL vencido são apagados; os demais permanecem
+    """
+    store = ArtifactStore(str(tmp_path), default_ttl=3600, max_bytes=10_000, max_files=100)
+    old = _write(tmp_path / "old.mp3", 10)
+    new = _write(tmp_path / "new.mp3", 10)
+    store.register(old, ttl_seconds=0)
+    store.register(new)
+
+    stats = store.sweep()
+
+    assert not os.path.exists(old)
+    assert os.path.exists(new)
+    assert stats["expired"] == 1
+    assert stats["files"] == 1
+
+def test_sweep_evicts_least_recently_used_over_quota(tmp_path):
+    """
+    Acima da quota, o arquivo acessado há mais tempo é removido primeiro
+    """
+    store = ArtifactStore(str(tmp_path), default_ttl=3600, max_bytes=25, max_files=100)
+    paths = [_write(tmp_path / f"{name}.mp3", 10) for name in ("a", "b", "c")]
+    for path in paths:
+        store.register(path)
+        time.sleep(0.01)
+    store.touch(paths[0])
+
+    stats = store.sweep()
+
+    assert os.path.exists(paths[0])
+    assert not os.path.exists(paths[1])
+    assert os.path.exists(paths[2])
+    assert stats["evictions"] == 1
+    assert stats["bytes"] == 20
+
+def test_sweep_adopts_unregistered_files_and_ignores_databases(tmp_path):
+    """
+    Artefatos antigos não registrados expiram pelo mtime; bancos SQLite e
+    arquivos que o backend não gera (ex.: áudios de exemplo versionados) ficam
+    """
+    store = ArtifactStore(str(tmp_path), default_ttl=60, max_bytes=10_000, max_files=100)
+    leftover = _write(tmp_path / "tts_123.mp3", 10)
+    fixture = _write(tmp_path / "input_123.webm", 10)
+    database = _write(tmp_path / "jobs.sqlite3", 10)
+    past = time.time() - 120
+    for path in (leftover, fixture):
+        os.utime(path, (past, past))
+
+    stats = store.sweep()
+
+    assert not os.path.exists(leftover)
+    assert os.path.exists(fixture)
+    assert os.path.exists(database)
+    assert stats["files"] == 0
@@ -0,0 +1,28 @@
+"""
+Testes da decodificação em memória (audio_decoder.decode_bytes)
+Verifica a conversão para PCM 16 kHz mono sem arquivos intermediários
+"""
+
+import numpy as np
+import pytest
+
+from app.utils.audio_decoder import AudioDecodeError, SAMPLE_RATE, decode_bytes
+from app.tests.helpers import wav_bytes
+
+def test_decode_resamples_to_16k_mono_float32():
+    """
+    Um WAV de 1s a 44.1 kHz deve virar 16000 amostras float32
+    """
+    audio = decode_bytes(wav_bytes(1.0, sample_rate=44100))
+    assert audio.dtype == np.float32
+    assert abs(len(audio) - SAMPLE_RATE) < 200
+    assert np.abs(audio).max() <= 1.0
+
+def test_decode_invalid_data_raises():
+    """
+    Bytes que não são áudio devem gerar AudioDecodeError
+    """
+    with pytest.raises(AudioDecodeError):
+        decode_bytes(b"not audio")
+    with pytest.raises(AudioDecodeError):
+        decode_bytes(b"")
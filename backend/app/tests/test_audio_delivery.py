@@ -0,0 +1,157 @@
+"""
+Testes da entrega de áudio do /play_audio
+Verifica Range/206, ETag/304, cabeçalhos de cache e negociação pelo Accept
+"""
+
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.utils import audio_delivery, config
+from benchmarks import audio
+
+client = TestClient(app)
+
+AUDIO_DIR = Path(config.TTS_CACHE_DIR)
+AUDIO_DIR.mkdir(parents=True, exist_ok=True)
+CONTENT = bytes(range(256)) * 4
+
+def _write(name):
+    path = AUDIO_DIR / name
+    path.write_bytes(CONTENT)
+    return path
+
+def test_range_request_returns_partial_content():
+    """
+    Um Range de bytes devolve 206 apenas com o trecho pedido
+    """
+    path = _write("delivery_range.mp3")
+    try:
+        response = client.get(f"/play_audio/{path.name}", headers={"Range": "bytes=100-199"})
+        assert response.status_code == 206
+        assert response.content == CONTENT[100:200]
+        assert response.headers["content-range"] == f"bytes 100-199/{len(CONTENT)}"
+        assert response.headers["content-type"] == "audio/mpeg"
+
+        suffix = client.get(f"/play_audio/{path.name}", headers={"Range": "bytes=-24"})
+        assert suffix.content == CONTENT[-24:]
+
+        invalid = client.get(f"/play_audio/{path.name}", headers={"Range": "bytes=5000-"})
+        assert invalid.status_code == 416
+    finally:
+        path.unlink()
+
+def test_etag_allows_conditional_replay():
+    """
+    Reenviar o ETag recebido em If-None-Match devolve 304 sem corpo
+    """
+    path = _write("delivery_etag.wav")
+    try:
+        first = client.get(f"/play_audio/{path.name}")
+        assert first.status_code == 200
+        assert first.content == CONTENT
+        assert first.headers["cache-control"] == "no-cache"
+
+        again = client.get(
+            f"/play_audio/{path.name}", headers={"If-None-Match": first.headers["etag"]}
+        )
+        assert again.status_code == 304
+        assert again.content == b""
+    finally:
+        path.unlink()
+
+def test_content_addressed_audio_is_immutable():
+    """
+    Áudios tts_<hash> usam o hash (e o formato) como ETag e são marcados como imutáveis
+    """
+    key = "0123456789abcdef0123456789abcdef"
+    path = _write(f"tts_{key}.mp3")
+    try:
+        response = client.get(f"/play_audio/{path.name}")
+        assert response.headers["etag"] == f'"{key}.mp3"'
+        assert "immutable" in response.headers["cache-control"]
+    finally:
+        path.unlink()
+
+def test_etag_cache_is_bounded(monkeypatch):
+    """
+    As ETags calculadas ficam em um LRU limitado (AUDIO_ETAG_CACHE_MAX_ENTRIES)
+    """
+    monkeypatch.setattr(config, "AUDIO_ETAG_CACHE_MAX_ENTRIES", 2)
+    monkeypatch.setattr(audio_delivery, "_etags", audio_delivery.OrderedDict())
+    paths = [_write(f"answer_etag_{i}.mp3") for i in range(3)]
+    try:
+        etags = [client.get(f"/play_audio/{path.name}").headers["etag"] for path in paths]
+        assert len(set(etags)) == 1  # mesmo conteúdo, mesma ETag
+        assert [key[0] for key in audio_delivery._etags] == [str(p) for p in paths[1:]]
+    finally:
+        for path in paths:
+            path.unlink()
+
+def test_path_traversal_is_rejected():
+    """
+    Nomes que saem do diretório de áudio não são servidos
+    """
+    response = client.get("/play_audio/..%2Fjobs.sqlite3")
+    assert response.status_code == 404
+
+def test_accept_negotiates_a_converted_variant():
+    """
+    Quem não aceita Opus/OGG recebe MP3 convertido uma vez; quem aceita recebe o original
+    """
+    key = "fedcba9876543210fedcba9876543210"
+    path = AUDIO_DIR / f"tts_{key}.ogg"
+    path.write_bytes(audio.encode(audio.speech_like(2.0), "ogg"))
+    variant = path.with_suffix(".mp3")
+    try:
+        original = client.get(f"/play_audio/{path.name}", headers={"Accept": "audio/ogg, audio/*;q=0.5"})
+        assert original.headers["content-type"] == "audio/ogg"
+        assert original.content == path.read_bytes()
+        assert original.headers["vary"] == "Accept"
+
+        converted = client.get(f"/play_audio/{path.name}", headers={"Accept": "audio/mpeg"})
+        assert converted.status_code == 200
+        assert converted.headers["content-type"] == "audio/mpeg"
+        assert converted.headers["etag"] == f'"{key}.mp3"'
+        assert converted.content == variant.read_bytes()
+    finally:
+        path.unlink()
+        variant.unlink(missing_ok=True)
+
+def test_opus_goes_only_to_clients_that_ask_for_it():
+    """
+    Sem audio/ogg ou audio/opus explícito no Accept (ex.: Safari), o Opus vira MP3
+    """
+    path = AUDIO_DIR / "tts_0123456789abcdef0123456789abcdef.ogg"
+    path.write_bytes(audio.encode(audio.speech_like(1.0), "ogg"))
+    try:
+        for headers in ({"Accept": ""}, {"Accept": "*/*"}, {"Accept": "audio/*"}):
+            response = client.get(f"/play_audio/{path.name}", headers=headers)
+            assert response.headers["content-type"] == "audio/mpeg"
+        response = client.get(f"/play_audio/{path.name}", headers={"Accept": "audio/opus, */*;q=0.1"})
+        assert response.headers["content-type"] == "audio/ogg"
+    finally:
+        path.unlink()
+        path.with_suffix(".mp3").unlink(missing_ok=True)
+
+def test_failed_conversion_does_not_leak_variant_locks():
+    """
+    Conversão que falha devolve o original e não deixa lock para trás
+    """
+    path = _write("tts_00112233445566778899aabbccddeeff.ogg")
+    try:
+        response = client.get(f"/play_audio/{path.name}", headers={"Accept": "audio/mpeg"})
+        assert response.status_code == 200
+        assert response.content == CONTENT
+        assert audio_delivery._variant_locks == {}
+    finally:
+        path.unlink()
+        path.with_suffix(".mp3").unlink(missing_ok=True)
+
+def test_accept_header_parsing_orders_by_quality():
+    """
+    As faixas do Accept saem por q decrescente; q inválido conta como 0
+    """
+    ranges = audio_delivery.parse_accept("audio/*;q=0.5, audio/webm, audio/mpeg;q=x")
+    assert ranges == [("audio/webm", 1.0), ("audio/*", 0.5), ("audio/mpeg", 0.0)]
@@ -0,0 +1,66 @@
+"""
+Testes da camada de codecs de saída
+Verifica a compressão Opus, a conversão do TTS e o arquivo das respostas
+"""
+
+import asyncio
+import os
+
+from app.services import answer_service, tts_engines, tts_service
+from app.services.tts_service import TTSCache
+from app.utils import audio_encoder, config
+from app.utils.audio_decoder import SAMPLE_RATE, decode_bytes
+from benchmarks import audio
+
+class WavEngine(tts_engines.TTSEngine):
+    """Motor local simulado: grava WAV PCM como espeak-ng/piper"""
+    name = "wav-test"
+    extension = "wav"
+
+    def synthesize(self, text, lang, path):
+        with open(path, "wb") as f:
+            f.write(audio.to_wav(audio.speech_like(3.0, seed=len(text))))
+
+def test_opus_is_about_ten_times_smaller_than_wav(tmp_path):
+    """
+    Voz em Opus/OGG ocupa ~10x menos que WAV 16 kHz e decodifica na mesma duração
+    """
+    pcm = audio.speech_like(10.0)
+    wav, ogg = tmp_path / "a.wav", tmp_path / "a.ogg"
+    audio_encoder.encode_pcm(pcm, str(wav), "wav")
+    audio_encoder.encode_pcm(pcm, str(ogg), "opus")
+
+    assert wav.stat().st_size / ogg.stat().st_size > 8
+    assert abs(len(decode_bytes(ogg.read_bytes())) / SAMPLE_RATE - 10.0) < 0.1
+    assert not list(tmp_path.glob("*.part"))
+
+def test_tts_output_is_converted_to_the_configured_codec(monkeypatch, tmp_path):
+    """
+    O WAV do motor vira Opus/OGG no cache (TTS_OUTPUT_CODEC); vazio mantém o formato do motor
+    """
+    monkeypatch.setattr(tts_service, "cache", TTSCache(str(tmp_path), 1024 * 1024, 10))
+    monkeypatch.setattr(tts_service, "engine", WavEngine())
+
+    path = tts_service.generate_audio("Fale sobre você.")
+    assert path.endswith(".ogg")
+    assert sorted(os.listdir(tmp_path)) == [os.path.basename(path)]
+
+    monkeypatch.setattr(config, "TTS_OUTPUT_CODEC", "")
+    assert tts_service.generate_audio("Outra pergunta.").endswith(".wav")
+
+def test_answer_archive_stores_compressed_audio(monkeypatch):
+    """
+    Com ANSWER_ARCHIVE, a resposta é guardada em Opus/OGG e informada em answer_audio
+    """
+    monkeypatch.setattr(config, "ANSWER_ARCHIVE", True)
+    pcm = audio.speech_like(4.0)
+
+    result = asyncio.run(answer_service.process_answer(pcm))
+
+    path = os.path.join(config.TTS_CACHE_DIR, result["answer_audio"])
+    try:
+        assert result["answer_audio"].startswith("answer_") and path.endswith(".ogg")
+        assert "archive" in result["timings"]
+        assert abs(len(decode_bytes(open(path, "rb").read())) / SAMPLE_RATE - 4.0) < 0.1
+    finally:
+        os.remove(path)
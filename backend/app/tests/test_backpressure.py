@@ -0,0 +1,33 @@
+"""
+Testes do controle de admissão do pipeline
+Verifica o 503 + Retry-After quando a fila está cheia
+e que o health continua respondendo
+"""
+
+from fastapi.testclient import TestClient
+from app.main import app
+from app.utils import config
+from io import BytesIO
+
+client = TestClient(app)
+
+def test_answer_returns_503_when_queue_is_full(monkeypatch):
+    """
+    Com MAX_PENDING_JOBS=0 toda requisição deve ser recusada com Retry-After
+    """
+    monkeypatch.setattr(config, "MAX_PENDING_JOBS", 0)
+    files = {"audio": ("test.wav", BytesIO(b"fake audio data"), "audio/wav")}
+    response = client.post("/answer", files=files)
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == str(config.RETRY_AFTER_SECONDS)
+
+def test_health_reports_pipeline_stats():
+    """
+    Testa se /api/health expõe a ocupação do pipeline
+    """
+    response = client.get("/api/health")
+    assert response.status_code == 200
+    pipeline = response.json()["pipeline"]
+    assert pipeline["pending_jobs"] == 0
+    assert "max_pending_jobs" in pipeline
@@ -0,0 +1,51 @@
+"""
+Testes do harness de benchmark
+Verifica o áudio sintético, o cálculo dos percentis e as medidas de memória
+"""
+
+import os
+
+from benchmarks import audio, run
+from benchmarks.memory import read_memory, summarize
+from app.services import vad_service
+from app.utils.audio_decoder import SAMPLE_RATE, decode_bytes
+
+def test_synthetic_answer_decodes_with_requested_length():
+    """
+    O áudio sintético deve decodificar na duração pedida e ter voz para o VAD
+    """
+    for codec in ("wav", "webm"):
+        pcm = decode_bytes(audio.make_answer(2.0, codec))
+        assert abs(len(pcm) / SAMPLE_RATE - 2.0) < 0.1
+        assert vad_service.trim_silence(pcm)["speech_seconds"] > 1.0
+
+def test_synthetic_audio_is_deterministic():
+    """
+    A mesma semente deve gerar o mesmo áudio (resultados comparáveis entre execuções)
+    """
+    assert (audio.speech_like(1.0, seed=3) == audio.speech_like(1.0, seed=3)).all()
+    assert not (audio.speech_like(1.0, seed=3) == audio.speech_like(1.0, seed=4)).all()
+
+def test_latency_summary_reports_percentiles():
+    """
+    O resumo de latências deve trazer p50/p95/p99, média e máximo
+    """
+    summary = run.summarize_latencies(list(range(1, 101)))
+    assert summary["p50"] == 50.5
+    assert summary["p99"] == 99.0
+    assert summary["max"] == 100
+    assert run.summarize_latencies([]) == {}
+
+def test_memory_report_reads_proc_and_summarizes_workers():
+    """
+    O benchmark de memória lê rss/pss/private do /proc e calcula o custo médio por worker
+    """
+    memory = read_memory(os.getpid())
+    assert memory["rss"] > 0 and memory["pss"] > 0
+    assert memory["private"] <= memory["rss"]
+
+    parent = {"rss": 300, "pss": 200, "private": 50}
+    workers = [{"rss": 310, "pss": 110, "private": 10}, {"rss": 310, "pss": 110, "private": 20}]
+    summary = summarize(parent, workers)
+    assert summary["total_pss_mb"] == 420
+    assert summary["worker_private_mb"] == 15
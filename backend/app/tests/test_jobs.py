@@ -0,0 +1,62 @@
+"""
+Testes dos jobs assíncronos (/jobs/answer e /jobs/{id})
+Verifica o ciclo de vida do job e a expiração nos stores
+"""
+
+import time
+from io import BytesIO
+
+from fastapi.testclient import TestClient
+from app.main import app
+from app.services import stt_router
+from app.tests.helpers import wav_bytes
+from app.utils.ttl_store import MemoryTTLStore, SQLiteTTLStore
+
+def test_submit_and_poll_job(monkeypatch):
+    """
+    Envia um áudio e consulta o job até terminar com o resultado do pipeline
+    """
+    async def fake_transcribe(audio, model_size=None):
+        return "trabalhei cinco anos com python"
+
+    monkeypatch.setattr(stt_router.stt_chunker, "transcribe", fake_transcribe)
+    with TestClient(app) as client:
+        files = {"audio": ("test.wav", BytesIO(wav_bytes(1.0)), "audio/wav")}
+        response = client.post("/jobs/answer", files=files)
+        assert response.status_code == 202
+        job_id = response.json()["job_id"]
+
+        for _ in range(100):
+            job = client.get(f"/jobs/{job_id}").json()
+            if job["status"] in ("done", "error"):
+                break
+            time.sleep(0.05)
+
+        assert job["id"] == job_id
+        assert job["status"] == "done"
+        assert job["stages"] == {stage: "done" for stage in ("decode", "vad", "stt", "summary", "tts")}
+        assert job["result"]["transcription"] == "trabalhei cinco anos com python"
+
+def test_unknown_job_returns_404():
+    """
+    Testa consulta de job inexistente
+    """
+    with TestClient(app) as client:
+        response = client.get("/jobs/inexistente")
+    assert response.status_code == 404
+
+def test_stores_evict_expired_jobs(tmp_path):
+    """
+    Jobs com TTL vencido não devem ser retornados pelos stores
+    """
+    db_path = str(tmp_path / "jobs.db")
+    for store in (MemoryTTLStore(ttl_seconds=-1), SQLiteTTLStore(-1, db_path, "jobs")):
+        store.set("abc", {"id": "abc", "status": "queued"})
+        store.set("def", {"id": "def", "status": "queued"})
+        assert store.purge_expired() == 2
+        assert store.get("abc") is None
+        assert store.purge_expired() == 0
+
+    store = SQLiteTTLStore(60, db_path, "jobs")
+    store.set("abc", {"id": "abc", "status": "done"})
+    assert store.get("abc")["status"] == "done"
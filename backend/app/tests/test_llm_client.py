@@ -0,0 +1,123 @@
+"""
+Testes do cliente LLM
+Usa um upstream simulado (httpx.MockTransport) para verificar retries,
+prazo total e circuit breaker
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.services.llm_client import CircuitBreaker, CircuitOpenError, LLMClient, LLMError
+
+MESSAGES = [{"role": "user", "content": "Resuma: teste"}]
+
+def _client(handler, deadline=5.0, max_retries=2, threshold=3):
+    return LLMClient(
+        base_url="http://stub.local/v1",
+        api_key="test",
+        timeout=1.0,
+        deadline=deadline,
+        max_retries=max_retries,
+        backoff=0.01,
+        max_concurrency=4,
+        max_connections=4,
+        breaker=CircuitBreaker(threshold, reset_seconds=60),
+        transport=httpx.MockTransport(handler),
+    )
+
+def _ok(text):
+    return httpx.Response(200, json={"choices": [{"message": {"content": f" {text} "}}]})
+
+def test_transient_errors_are_retried():
+    """
+    Um 503 seguido de sucesso é resolvido com retry
+    """
+    responses = [httpx.Response(503), _ok("resumo")]
+    client = _client(lambda request: responses.pop(0))
+
+    result = asyncio.run(client.chat(MESSAGES, "modelo", 50, 0.0))
+
+    assert result == "resumo"
+    assert client.stats()["retries"] == 1
+    assert client.stats()["breaker"]["state"] == "closed"
+
+def test_client_errors_are_not_retried():
+    """
+    Erros 4xx (ex.: chave inválida) falham sem retry
+    """
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(401, json={"error": "invalid key"})
+
+    with pytest.raises(LLMError):
+        _client(handler).chat_sync(MESSAGES, "modelo", 50, 0.0)
+    assert len(calls) == 1
+
+def test_deadline_bounds_slow_upstream():
+    """
+    Um upstream lento não passa do prazo total da chamada
+    """
+    async def slow(request):
+        await asyncio.sleep(2)
+        return _ok("tarde demais")
+
+    client = _client(slow, deadline=0.2)
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        with pytest.raises(LLMError):
+            await client.chat(MESSAGES, "modelo", 50, 0.0)
+        return loop.time() - start
+
+    assert asyncio.run(run()) < 1.0
+
+def test_breaker_opens_and_fails_fast():
+    """
+    Após falhas seguidas o circuito abre e nem chama o upstream
+    """
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(500)
+
+    client = _client(handler, max_retries=0, threshold=2)
+    for _ in range(2):
+        with pytest.raises(LLMError):
+            client.chat_sync(MESSAGES, "modelo", 50, 0.0)
+
+    with pytest.raises(CircuitOpenError):
+        client.chat_sync(MESSAGES, "modelo", 50, 0.0)
+    assert len(calls) == 2
+    assert client.stats()["breaker"]["state"] == "open"
+    assert client.stats()["rejected"] == 1
+
+def test_unexpected_error_releases_half_open_probe():
+    """
+    Uma exceção inesperada na chamada de teste (half_open) não trava o circuito
+    """
+    responses = [httpx.Response(500), RuntimeError("bug no transporte"), _ok("voltou")]
+
+    def handler(request):
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    client = _client(handler, max_retries=0, threshold=1)
+    client.breaker.reset_seconds = 0
+
+    async def run():
+        with pytest.raises(LLMError):
+            await client.chat(MESSAGES, "modelo", 50, 0.0)
+        with pytest.raises(LLMError):
+            await client.chat(MESSAGES, "modelo", 50, 0.0)
+        return await client.chat(MESSAGES, "modelo", 50, 0.0)
+
+    assert asyncio.run(run()) == "voltou"
+    assert client.stats()["breaker"]["state"] == "closed"
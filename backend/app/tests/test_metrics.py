@@ -0,0 +1,76 @@
+"""
+Testes das métricas e do endpoint /metrics
+Verifica o formato de texto do Prometheus e a instrumentação do pipeline
+"""
+
+from fastapi.testclient import TestClient
+from app.main import app
+from app.tests.helpers import wav_bytes
+from app.utils import metrics
+
+client = TestClient(app)
+
+def test_histogram_renders_cumulative_buckets():
+    """
+    Os buckets devem ser cumulativos, com soma e contagem por label
+    """
+    registry = metrics.Registry()
+    histogram = metrics.Histogram(
+        "test_seconds", "Teste", ("stage",), buckets=(0.1, 1.0), registry=registry
+    )
+    histogram.observe(0.05, stage="stt")
+    histogram.observe(0.5, stage="stt")
+    histogram.observe(5.0, stage="stt")
+
+    text = registry.render()
+    assert "# TYPE test_seconds histogram" in text
+    assert 'test_seconds_bucket{stage="stt",le="0.1"} 1' in text
+    assert 'test_seconds_bucket{stage="stt",le="1.0"} 2' in text
+    assert 'test_seconds_bucket{stage="stt",le="+Inf"} 3' in text
+    assert 'test_seconds_count{stage="stt"} 3' in text
+    assert histogram.count(stage="stt") == 3
+
+def test_counters_and_callback_gauges():
+    """
+    Contadores somam por label; gauges com fn são lidos só na coleta
+    """
+    registry = metrics.Registry()
+    errors = metrics.Counter("test_errors_total", "Teste", ("component",), registry=registry)
+    queue = []
+    metrics.Gauge("test_queue", "Teste", fn=lambda: len(queue), registry=registry)
+    errors.inc(component="stt")
+    errors.inc(2, component="stt")
+    queue.extend([1, 2])
+
+    text = registry.render()
+    assert 'test_errors_total{component="stt"} 3.0' in text
+    assert "test_queue 2.0" in text
+
+def test_duplicate_metric_names_are_rejected():
+    """
+    Registrar duas métricas com o mesmo nome é erro de programação
+    """
+    registry = metrics.Registry()
+    metrics.Counter("test_total", "Teste", registry=registry)
+    try:
+        metrics.Counter("test_total", "Teste", registry=registry)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("nome duplicado aceito")
+
+def test_metrics_endpoint_reports_answer_stages():
+    """
+    Depois de um /answer, /metrics deve expor a duração das etapas e do request
+    """
+    stt_before = metrics.STAGE_SECONDS.count(pipeline="answer", stage="stt")
+    files = {"audio": ("test.wav", wav_bytes(1.0), "audio/wav")}
+    assert client.post("/answer", files=files).status_code == 200
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert metrics.STAGE_SECONDS.count(pipeline="answer", stage="stt") == stt_before + 1
+    assert 'sidekick_answer_seconds_count{status="200"}' in response.text
+    assert "sidekick_pipeline_pending_jobs 0" in response.text
+    assert "sidekick_tmp_bytes" in response.text
@@ -5,12 +5,14 @@ Verifica se arquivos de áudio gerados podem ser baixados
 
 from fastapi.testclient import TestClient
 from app.main import app
+from app.utils import config
 from pathlib import Path
 
 client = TestClient(app)
 
-TMP_DIR = Path("tmp")
-TMP_DIR.mkdir(exist_ok=True)
+# Os áudios servidos ficam no diretório do cache TTS
+TMP_DIR = Path(config.TTS_CACHE_DIR)
+TMP_DIR.mkdir(parents=True, exist_ok=True)
 
 def test_play_audio_file_exists():
     """
@@ -28,9 +30,9 @@ def test_play_audio_file_exists():
 
 def test_play_audio_file_not_found():
     """
-    Testa erro ao tentar baixar arquivo inexistente
+    Testa erro 404 ao tentar baixar arquivo inexistente
     """
     response = client.get("/play_audio/nonexistent.mp3")
-    assert response.status_code == 200
+    assert response.status_code == 404
     data = response.json()
-    assert "error" in data
+    assert "detail" in data
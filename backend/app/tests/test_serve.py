@@ -0,0 +1,95 @@
+"""
+Testes do launcher multi-worker (app.serve)
+Verifica que os workers herdam o modelo carregado no pai, que os stores SQLite
+reabrem a conexão após o fork e que o launcher encerra com SIGTERM
+"""
+
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+
+from app.utils.ttl_store import SQLiteTTLStore
+from benchmarks.memory import child_pids
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+
+def start_server(tmp_path, port: int, *extra):
+    env = dict(os.environ, STT_ENGINE="fake", TTS_ENGINE="fake", SUMMARY_ENGINE="extractive",
+               TTS_CACHE_DIR=str(tmp_path / "tts"))
+    return subprocess.Popen(
+        [sys.executable, "-m", "app.serve", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", "2", "--log-level", "warning", *extra],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+def wait_health(port: int) -> dict:
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            return httpx.get(f"http://127.0.0.1:{port}/api/health", timeout=2).json()
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    raise AssertionError("API não respondeu")
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def test_workers_inherit_the_model_loaded_by_the_parent(tmp_path):
+    """
+    Com preload, o modelo é carregado uma vez no pai e os workers respondem com ele
+    """
+    port = free_port()
+    server = start_server(tmp_path, port)
+    try:
+        status = wait_health(port)["stt_model"]
+        assert status["state"] == "ready"
+        assert status["load_pid"] == server.pid
+        assert status["pid"] != server.pid
+        assert len(child_pids(server.pid)) == 2
+    finally:
+        server.send_signal(signal.SIGTERM)
+        assert server.wait(timeout=30) == 0
+
+def test_no_preload_loads_one_model_per_worker(tmp_path):
+    """
+    Sem preload (modo de comparação), cada worker carrega a própria cópia
+    """
+    port = free_port()
+    server = start_server(tmp_path, port, "--no-preload")
+    try:
+        status = wait_health(port)["stt_model"]
+        assert status["state"] == "ready"
+        assert status["load_pid"] == status["pid"] != server.pid
+    finally:
+        server.send_signal(signal.SIGTERM)
+        assert server.wait(timeout=30) == 0
+
+def test_sqlite_store_reconnects_after_fork(tmp_path):
+    """
+    Um store SQLite criado antes do fork (como no import de app.main) escreve do filho com conexão própria
+    """
+    store = SQLiteTTLStore(60, str(tmp_path / "store.db"), "sessions")
+    store.set("pai", {"n": 1})
+    parent_conn = store._conn
+
+    pid = os.fork()
+    if pid == 0:
+        ok = False
+        try:
+            ok = store._conn is not parent_conn
+            store.update("filho", lambda value: {"n": 2})
+            ok = ok and store.get("pai") == {"n": 1}
+        finally:
+            os._exit(0 if ok else 1)
+    _, status = os.waitpid(pid, 0)
+
+    assert os.waitstatus_to_exitcode(status) == 0
+    assert store._conn is parent_conn
+    assert store.get("filho") == {"n": 2}
@@ -0,0 +1,69 @@
+"""
+Testes do estado de entrevista por sessão
+Verifica isolamento entre sessões, persistência no SQLite e limpeza das expiradas
+"""
+
+from app.services import session_service
+from app.services.bot_service import DEFAULT_QUESTIONS, InterviewBot
+from app.services.session_service import InterviewState
+from app.utils import config
+from app.utils.ttl_store import MemoryTTLStore, SQLiteTTLStore
+
+def _next(session_id):
+    return session_service.advance(
+        session_id, lambda state: InterviewBot(state=state).get_next_question()
+    )
+
+def test_sessions_do_not_share_progress():
+    """
+    Duas entrevistas simultâneas avançam de forma independente
+    """
+    first_a, _ = _next("sessao-a")
+    second_a, state_a = _next("sessao-a")
+    first_b, state_b = _next("sessao-b")
+
+    assert first_a == first_b == DEFAULT_QUESTIONS[0]
+    assert second_a == DEFAULT_QUESTIONS[1]
+    assert state_a.question_index == 2
+    assert state_b.question_index == 1
+
+def test_state_survives_in_sqlite_store(monkeypatch, tmp_path):
+    """
+    Com o store SQLite, outra instância (outro worker) vê o mesmo estado
+    """
+    db_path = str(tmp_path / "sessions.db")
+    monkeypatch.setattr(session_service, "store", SQLiteTTLStore(60, db_path, "sessions"))
+    _next("sessao-sqlite")
+
+    monkeypatch.setattr(session_service, "store", SQLiteTTLStore(60, db_path, "sessions"))
+    question, state = _next("sessao-sqlite")
+
+    assert question == DEFAULT_QUESTIONS[1]
+    assert state.question_index == 2
+
+def test_interview_state_is_compact():
+    """
+    InterviewState usa __slots__ e serializa de/para dict
+    """
+    state = InterviewState("abc", question_index=3)
+    assert not hasattr(state, "__dict__")
+    assert InterviewState.from_dict(state.to_dict()).question_index == 3
+
+def test_new_sessions_purge_expired_ones(monkeypatch):
+    """
+    Criar sessões remove as expiradas do store, no máximo uma vez por intervalo
+    """
+    store = MemoryTTLStore(ttl_seconds=-1)
+    monkeypatch.setattr(session_service, "store", store)
+    monkeypatch.setattr(session_service, "_last_purge", float("-inf"))
+    monkeypatch.setattr(config, "SESSION_PURGE_INTERVAL_SECONDS", 3600)
+    _next("expirada-1")
+    _next("expirada-2")
+
+    session_service.new_session_id()
+    assert len(store._items) == 0
+
+    _next("expirada-3")
+    session_service.new_session_id()
+    assert len(store._items) == 1
+    assert session_service.purge_expired(force=True) == 1
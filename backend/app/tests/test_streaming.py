@@ -0,0 +1,69 @@
+"""
+Testes da transcrição incremental (/ws/transcribe)
+Verifica o protocolo do WebSocket e a emenda entre janelas
+"""
+
+from fastapi.testclient import TestClient
+from app.main import app
+from app.utils import config
+from app.services.streaming_service import merge_overlap
+from app.tests.helpers import wav_bytes
+
+def test_merge_overlap_removes_repeated_words():
+    """
+    Palavras repetidas na sobreposição devem aparecer uma única vez
+    """
+    left = "Eu trabalhei com Python por cinco anos"
+    right = "por cinco anos, principalmente com FastAPI"
+    assert merge_overlap(left, right) == (
+        "Eu trabalhei com Python por cinco anos principalmente com FastAPI"
+    )
+    assert merge_overlap("", "olá") == "olá"
+    assert merge_overlap("olá", "") == "olá"
+
+def test_stream_returns_final_transcription():
+    """
+    Envia chunks de áudio e espera a transcrição final, o resumo e a próxima pergunta após "stop"
+    """
+    data = wav_bytes(2.0)
+    with TestClient(app) as client:
+        with client.websocket_connect("/ws/transcribe?session_id=sessao-ws") as ws:
+            for start in range(0, len(data), 8000):
+                ws.send_bytes(data[start:start + 8000])
+            ws.send_text("stop")
+
+            messages = [ws.receive_json()]
+            while messages[-1]["type"] != "next_question":
+                messages.append(ws.receive_json())
+
+    types = [m["type"] for m in messages if m["type"] not in ("partial", "summary_delta")]
+    assert types == ["final", "summary", "next_question"]
+    assert isinstance(messages[-1]["question"], str)
+    assert messages[-1]["session_id"] == "sessao-ws"
+    assert "next_question_audio" in messages[-1]
+
+def test_stream_over_upload_limit_sends_error(monkeypatch):
+    """
+    Passar de UPLOAD_MAX_BYTES encerra o streaming com {"type": "error"}
+    """
+    monkeypatch.setattr(config, "UPLOAD_MAX_BYTES", 4096)
+    data = wav_bytes(1.0)
+    with TestClient(app) as client:
+        with client.websocket_connect("/ws/transcribe") as ws:
+            for start in range(0, len(data), 2048):
+                ws.send_bytes(data[start:start + 2048])
+            message = ws.receive_json()
+            while message["type"] == "partial":
+                message = ws.receive_json()
+    assert message["type"] == "error"
+
+def test_stream_with_invalid_audio_sends_error():
+    """
+    Áudio que o ffmpeg não decodifica vira {"type": "error"} em vez de texto vazio
+    """
+    with TestClient(app) as client:
+        with client.websocket_connect("/ws/transcribe") as ws:
+            ws.send_bytes(b"isto nao e audio" * 64)
+            ws.send_text("stop")
+            message = ws.receive_json()
+    assert message["type"] == "error"
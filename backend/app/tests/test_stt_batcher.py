@@ -0,0 +1,48 @@
+"""
+Testes do micro-batching de STT
+Verifica o agrupamento de requisições concorrentes e a ordem dos resultados
+"""
+
+import asyncio
+
+import numpy as np
+
+from app.services.stt_batcher import BatchScheduler
+
+def test_concurrent_requests_share_one_batch():
+    """
+    Requisições simultâneas dentro da janela devem ir em um único lote
+    """
+    batches = []
+
+    async def runner(audios):
+        batches.append(len(audios))
+        return [f"texto {len(audio)}" for audio in audios]
+
+    async def main():
+        scheduler = BatchScheduler(max_batch_size=8, max_wait_ms=20, runner=runner)
+        audios = [np.zeros(n, dtype=np.float32) for n in (100, 200, 300)]
+        return await asyncio.gather(*(scheduler.submit(a) for a in audios))
+
+    results = asyncio.run(main())
+    assert results == ["texto 100", "texto 200", "texto 300"]
+    assert batches == [3]
+
+def test_batch_is_split_at_max_size_and_errors_propagate():
+    """
+    Lotes respeitam o tamanho máximo e falhas chegam a quem pediu
+    """
+    batches = []
+
+    async def runner(audios):
+        batches.append(len(audios))
+        raise RuntimeError("falha no modelo")
+
+    async def main():
+        scheduler = BatchScheduler(max_batch_size=2, max_wait_ms=20, runner=runner)
+        audios = [np.zeros(10, dtype=np.float32)] * 3
+        return await asyncio.gather(*(scheduler.submit(a) for a in audios), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert sorted(batches) == [1, 2]
+    assert all(isinstance(r, RuntimeError) for r in results)
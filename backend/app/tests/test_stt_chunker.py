@@ -0,0 +1,88 @@
+"""
+Testes da transcrição em pedaços de respostas longas
+Verifica cortes nos silêncios, sobreposição sem pausa e a ordem do texto final
+"""
+
+import asyncio
+
+import numpy as np
+
+from app.services import stt_chunker
+from app.utils import config
+from app.utils.audio_decoder import SAMPLE_RATE
+
+def tone(seconds: float) -> np.ndarray:
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (0.3 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+def silence(seconds: float) -> np.ndarray:
+    return np.zeros(int(seconds * SAMPLE_RATE), dtype=np.float32)
+
+def test_long_audio_is_cut_at_pauses():
+    """
+    Com pausas disponíveis, os pedaços ficam contíguos, sem sobreposição e com corte no silêncio
+    """
+    audio = np.concatenate([np.concatenate([tone(9), silence(0.5)]) for _ in range(10)])
+    chunks = stt_chunker.plan_chunks(audio)
+
+    assert len(chunks) > 2
+    assert chunks[0][0] == 0 and chunks[-1][1] == len(audio)
+    for (_, end, _), (start, _, overlapped) in zip(chunks, chunks[1:]):
+        assert start == end
+        assert not overlapped
+        assert not audio[end:end + 100].any()
+    for start, end, _ in chunks:
+        assert end - start <= config.STT_CHUNK_MAX_SECONDS * SAMPLE_RATE
+
+def test_continuous_speech_uses_overlap():
+    """
+    Sem pausas, cada pedaço repete o fim do anterior (STT_CHUNK_OVERLAP_SECONDS)
+    """
+    audio = tone(70)
+    chunks = stt_chunker.plan_chunks(audio)
+    overlap = int(config.STT_CHUNK_OVERLAP_SECONDS * SAMPLE_RATE)
+
+    assert [o for _, _, o in chunks] == [False] + [True] * (len(chunks) - 1)
+    for (_, end, _), (start, _, _) in zip(chunks, chunks[1:]):
+        assert start == end - overlap
+
+def test_stitch_removes_duplicated_words_at_overlapping_seams():
+    """
+    As palavras repetidas na emenda sobreposta devem aparecer uma vez só
+    """
+    texts = ["eu trabalhei com python", "com python e fastapi", "por cinco anos"]
+    assert stt_chunker.stitch(texts, [False, True, False]) == (
+        "eu trabalhei com python e fastapi por cinco anos"
+    )
+
+def test_chunks_are_transcribed_in_parallel_and_kept_in_order(monkeypatch):
+    """
+    Cada pedaço vai para o pool separadamente; o texto final respeita a ordem do áudio
+    """
+    running = {"now": 0, "max": 0}
+
+    async def fake_run_cpu(func, audios, *args):
+        running["now"] += 1
+        running["max"] = max(running["max"], running["now"])
+        # Pedaços menores terminam antes: a ordem não pode depender disso
+        await asyncio.sleep(len(audios[0]) / SAMPLE_RATE / 1000)
+        running["now"] -= 1
+        return {"texts": [f"{len(audios[0]) // SAMPLE_RATE}s"], "status": {"state": "ready", "pid": 1}}
+
+    monkeypatch.setattr(stt_chunker.stt_batcher.executor, "run_cpu", fake_run_cpu)
+    audio = np.concatenate([tone(25), silence(0.5), tone(10), silence(0.5), tone(25)])
+    chunks = stt_chunker.plan_chunks(audio)
+
+    text = asyncio.run(stt_chunker.transcribe(audio))
+    assert text == " ".join(f"{(end - start) // SAMPLE_RATE}s" for start, end, _ in chunks)
+    assert running["max"] == len(chunks)
+
+def test_short_audio_goes_to_the_batcher(monkeypatch):
+    """
+    Abaixo de STT_CHUNK_MIN_SECONDS o áudio segue inteiro pelo stt_batcher
+    """
+    async def fake_batcher(audio, model_size=None):
+        return "curto"
+
+    monkeypatch.setattr(stt_chunker.stt_batcher, "transcribe", fake_batcher)
+    assert asyncio.run(stt_chunker.transcribe(tone(5))) == "curto"
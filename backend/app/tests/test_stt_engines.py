@@ -0,0 +1,140 @@
+"""
+Testes do registro de motores STT
+Verifica a seleção por configuração, o motor fake determinístico, o lote igual ao
+individual e o status do modelo por worker do pool
+"""
+
+import asyncio
+import os
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.services import model_manager, stt_batcher, stt_service
+from app.services.model_manager import ModelManager
+from app.services.stt_engines import ENGINES, batch_result_text, create_engine
+from app.utils import config
+
+def test_registry_exposes_all_backends():
+    """
+    Os três motores devem estar registrados
+    """
+    assert {"whisper", "faster-whisper", "fake"} <= set(ENGINES)
+
+def test_create_engine_declares_model_parameters():
+    """
+    Cada motor declara modelo, compute type e threads
+    """
+    engine = create_engine("faster-whisper", model_size="tiny", threads=2)
+    assert engine.describe() == {
+        "engine": "faster-whisper",
+        "model_size": "tiny",
+        "compute_type": "int8",
+        "threads": 2,
+    }
+    with pytest.raises(ValueError):
+        create_engine("inexistente")
+
+def test_fake_engine_is_deterministic(monkeypatch):
+    """
+    O motor fake responde sem carregar modelo e sempre com o mesmo texto
+    """
+    manager = ModelManager(factory=lambda: create_engine("fake"))
+    monkeypatch.setattr(model_manager, "manager", manager)
+
+    audio = np.zeros(32000, dtype=np.float32)
+    assert stt_service.transcribe(audio) == stt_service.transcribe(audio)
+    assert "2.0 segundos" in stt_service.transcribe(audio)
+
+def test_batch_matches_single_transcription():
+    """
+    transcribe_batch devolve o mesmo texto que transcribe para cada áudio, na ordem
+    """
+    engine = create_engine("fake")
+    engine.load()
+    audios = [np.zeros(16000 * seconds, dtype=np.float32) for seconds in (3, 1, 40, 2)]
+    assert engine.transcribe_batch(audios) == [engine.transcribe(audio) for audio in audios]
+
+def test_batched_whisper_results_follow_transcribe_thresholds():
+    """
+    Resultados do lote que o transcribe refaria (compressão/logprob) voltam ao caminho individual
+    """
+    def result(compression_ratio=1.5, avg_logprob=-0.3, no_speech_prob=0.1):
+        return SimpleNamespace(
+            text=" Olá ", compression_ratio=compression_ratio,
+            avg_logprob=avg_logprob, no_speech_prob=no_speech_prob,
+        )
+
+    assert batch_result_text(result()) == "Olá"
+    assert batch_result_text(result(compression_ratio=3.0)) is None
+    assert batch_result_text(result(avg_logprob=-1.5)) is None
+    assert batch_result_text(result(avg_logprob=-1.5, no_speech_prob=0.9)) == ""
+
+def test_model_manager_loads_once_on_first_use():
+    """
+    O modelo só é carregado no primeiro get() e a instância é compartilhada
+    """
+    loads = []
+
+    def factory():
+        loads.append(1)
+        return create_engine("fake")
+
+    manager = ModelManager(factory=factory)
+    assert manager.status()["state"] == "not_loaded"
+
+    first = manager.get()
+    second = manager.get()
+
+    assert first is second
+    assert len(loads) == 1
+    status = manager.status()
+    assert status["state"] == "ready"
+    assert status["engine"] == "fake"
+    assert status["load_seconds"] is not None
+
+def test_model_manager_retries_failed_load_after_backoff(monkeypatch):
+    """
+    Uma carga que falhou não fica "failed" para sempre: é tentada de novo após o backoff
+    """
+    loads = []
+
+    def factory():
+        loads.append(1)
+        if len(loads) == 1:
+            raise RuntimeError("download interrompido")
+        return create_engine("fake")
+
+    monkeypatch.setattr(config, "STT_LOAD_RETRY_SECONDS", 60)
+    manager = ModelManager(factory=factory)
+    assert manager.get() is None
+    assert manager.get() is None
+    assert len(loads) == 1
+    assert manager.status()["error"] == "download interrompido"
+
+    monkeypatch.setattr(config, "STT_LOAD_RETRY_SECONDS", 0)
+    assert manager.get() is not None
+    assert len(loads) == 2
+    assert manager.status()["state"] == "ready"
+    assert "error" not in manager.status()
+
+def test_pool_transcriptions_report_status_per_worker(monkeypatch):
+    """
+    Cada transcrição no pool de CPU registra o status do modelo do worker que a atendeu, por pid
+    """
+    manager = ModelManager()
+    monkeypatch.setattr(model_manager, "manager", manager)
+    monkeypatch.setattr(config, "CPU_WORKERS", 1)
+
+    asyncio.run(stt_batcher.run_on_cpu_pool([np.zeros(16000, dtype=np.float32)]))
+    summary = manager.worker_summary()
+
+    assert manager.state == "not_loaded"  # o processo principal não carrega o modelo
+    assert len(summary["workers"]) == 1
+    pid, status = next(iter(summary["workers"].items()))
+    assert pid == str(status["pid"]) != str(os.getpid())
+    assert summary["state"] == status["state"] in ("ready", "failed")
+
+    manager.record_worker_status({"pid": 1, "state": "ready"})
+    assert list(manager.worker_summary()["workers"]) == ["1"]
@@ -0,0 +1,93 @@
+"""
+Testes do roteamento adaptativo de modelos de STT
+Verifica a escolha por duração/fila/SLO, o ajuste do rtf medido no worker e o modelo informado no /answer
+"""
+
+import asyncio
+
+import numpy as np
+
+from app.services import stt_batcher, stt_router
+from app.services.stt_router import ModelRouter
+from app.utils.audio_decoder import SAMPLE_RATE
+
+SIZES = ["tiny", "base", "small"]
+
+def test_idle_router_picks_the_largest_model_within_slo():
+    """
+    Sem fila, respostas curtas usam o maior modelo; longas descem para o que cabe no SLO
+    """
+    router = ModelRouter(SIZES, slo_seconds=5, workers=1)
+
+    assert router.choose(10) == "small"   # 0,25 × 10 = 2,5 s
+    assert router.choose(30) == "base"    # small: 7,5 s; base: 2,4 s
+    assert router.choose(100) == "tiny"   # base: 8 s; tiny: 4 s
+    assert router.choose(1000) == "tiny"  # nenhum cabe: o menor
+
+def test_router_degrades_under_load_and_upgrades_when_idle():
+    """
+    Transcrições em andamento aumentam a latência prevista e empurram para modelos menores
+    """
+    router = ModelRouter(SIZES, slo_seconds=5, workers=1)
+
+    with router.serving("small", 10), router.serving("small", 10):
+        # 5 s de fila: nem o tiny cabe
+        assert router.choose(10) == "tiny"
+        assert router.stats()["inflight"] == 2
+
+    assert router.stats()["backlog_seconds"] == 0
+    assert router.choose(10) == "small"
+
+def test_more_workers_absorb_the_queue():
+    """
+    A fila é dividida entre os workers do pool de CPU
+    """
+    router = ModelRouter(SIZES, slo_seconds=5, workers=4)
+
+    with router.serving("small", 10), router.serving("small", 10):
+        assert router.choose(10) == "small"  # 5 s / 4 workers + 2,5 s
+
+def test_rtf_follows_speed_measured_in_the_worker(monkeypatch):
+    """
+    O tempo medido no worker ajusta o rtf; chamadas que carregaram o modelo são ignoradas
+    """
+    router = ModelRouter(SIZES, slo_seconds=5, workers=1)
+    monkeypatch.setattr(stt_router, "router", router)
+    reports = iter([{"warm": False, "seconds": 30.0}, {"warm": True, "seconds": 5.0}])
+
+    async def fake_run_cpu(func, audios, model_size):
+        return {"texts": ["texto"], "status": {"pid": 1, "state": "ready"}, **next(reports)}
+
+    monkeypatch.setattr(stt_batcher.executor, "run_cpu", fake_run_cpu)
+    audio = np.zeros(10 * SAMPLE_RATE, dtype=np.float32)
+    before = router.rtf["small"]
+
+    asyncio.run(stt_batcher.run_on_cpu_pool([audio], "small"))
+    assert router.rtf["small"] == before  # carga a frio: 30 s não é velocidade do modelo
+
+    asyncio.run(stt_batcher.run_on_cpu_pool([audio], "small"))
+    assert router.rtf["small"] == before + 0.2 * (0.5 - before)
+
+def test_answer_reports_the_routed_model(monkeypatch):
+    """
+    O pipeline transcreve com o modelo escolhido e o informa em stt_model
+    """
+    from app.services import answer_service
+
+    calls = []
+
+    async def fake_transcribe(audio, model_size=None):
+        calls.append(model_size)
+        return "texto"
+
+    monkeypatch.setattr(stt_router, "router", ModelRouter(SIZES, slo_seconds=5, workers=1))
+    monkeypatch.setattr(stt_router.stt_chunker, "transcribe", fake_transcribe)
+    monkeypatch.setattr(answer_service.config, "VAD_ENABLED", False)
+
+    pcm = (0.3 * np.sin(np.arange(2 * SAMPLE_RATE) / 10)).astype(np.float32)
+    result = asyncio.run(answer_service.process_answer(pcm))
+
+    assert calls == ["small"]
+    assert result["stt_model"] == "small"
+    assert result["transcription"] == "texto"
+    assert stt_router.ROUTED.value(model="small") >= 1
@@ -0,0 +1,83 @@
+"""
+Testes dos motores de resumo
+Verifica o resumo extrativo local e o fallback quando o LLM falha
+"""
+
+import time
+
+import pytest
+
+from app.services import summary_service
+from app.services.summarizers import (
+    ExtractiveSummarizer, Summarizer, SummarizerError, create_summarizer, split_sentences,
+)
+from app.services.summary_service import SummaryCache
+
+ANSWER = (
+    "Trabalhei cinco anos com Python em projetos de dados. "
+    "Nos projetos de dados usei Python com pandas e Airflow. "
+    "Gosto de futebol aos domingos. "
+    "Também liderei um time pequeno em projetos de dados com Python. "
+    "Meu gato se chama Tom."
+)
+
+def test_extractive_keeps_central_sentences_in_order():
+    """
+    As frases mais centrais são escolhidas e mantêm a ordem original
+    """
+    summary = ExtractiveSummarizer(max_sentences=2).summarize(ANSWER, max_tokens=100)
+
+    assert "futebol" not in summary
+    assert "gato" not in summary
+    # Empate entre as frases centrais → as mais antigas, na ordem original
+    assert summary.index("cinco anos") < summary.index("pandas")
+
+def test_extractive_is_fast_and_deterministic():
+    """
+    Respostas curtas são resumidas em milissegundos, sempre com o mesmo resultado
+    """
+    summarizer = create_summarizer("extractive", max_sentences=2)
+    start = time.perf_counter()
+    results = {summarizer.summarize(ANSWER, 100) for _ in range(10)}
+    elapsed = (time.perf_counter() - start) / 10
+
+    assert len(results) == 1
+    assert elapsed < 0.01
+
+def test_unpunctuated_transcript_is_split_in_chunks():
+    """
+    Transcrições sem pontuação são divididas em blocos de palavras
+    """
+    text = " ".join(f"palavra{i}" for i in range(100))
+    assert len(split_sentences(text)) == 5
+
+def test_unknown_summarizer_raises():
+    """
+    Nome de motor inexistente gera erro claro
+    """
+    with pytest.raises(ValueError):
+        create_summarizer("inexistente")
+
+class FailingLLM(Summarizer):
+    name = "llm"
+
+    def summarize(self, text, max_tokens):
+        raise SummarizerError("prazo esgotado")
+
+    async def summarize_async(self, text, max_tokens):
+        raise SummarizerError("prazo esgotado")
+
+def test_fallback_is_used_when_llm_fails(monkeypatch):
+    """
+    Com o LLM falhando, o resumo extrativo é usado e não vai para o cache
+    """
+    cache = SummaryCache(max_entries=10)
+    monkeypatch.setattr(summary_service, "cache", cache)
+    monkeypatch.setattr(summary_service, "engine", FailingLLM())
+    monkeypatch.setattr(summary_service, "fallback", ExtractiveSummarizer(max_sentences=2))
+
+    summary = summary_service.summarize(ANSWER)
+
+    assert summary != ANSWER
+    assert "pandas" in summary
+    assert cache.stats()["entries"] == 0
@@ -0,0 +1,102 @@
+"""
+Testes do cache de resumos
+Verifica reuso por texto normalizado, camada em disco e single-flight
+"""
+
+import asyncio
+import threading
+import time
+
+from app.services import summary_service
+from app.services.summarizers import Summarizer, SummarizerError
+from app.services.summary_service import SummaryCache
+from app.utils.ttl_store import SQLiteTTLStore
+
+class FakeLLM(Summarizer):
+    """Substitui o LLM, contando as requisições"""
+    name = "fake-llm"
+
+    def __init__(self, delay=0.0):
+        super().__init__()
+        self.delay = delay
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def summarize(self, text, max_tokens):
+        with self._lock:
+            self.calls.append(text)
+        time.sleep(self.delay)
+        return f"resumo de {len(text)} caracteres"
+
+    async def summarize_async(self, text, max_tokens):
+        with self._lock:
+            self.calls.append(text)
+        await asyncio.sleep(self.delay)
+        return f"resumo de {len(text)} caracteres"
+
+def _fake_api(monkeypatch, cache, delay=0.0):
+    engine = FakeLLM(delay)
+    monkeypatch.setattr(summary_service, "cache", cache)
+    monkeypatch.setattr(summary_service, "engine", engine)
+    monkeypatch.setattr(summary_service, "fallback", None)
+    return engine.calls
+
+def test_same_transcript_is_summarized_once(monkeypatch):
+    """
+    Transcrições iguais (ignorando espaços e caixa) reutilizam o resumo
+    """
+    calls = _fake_api(monkeypatch, SummaryCache(max_entries=10))
+
+    first = summary_service.summarize("Eu trabalhei com Python")
+    second = summary_service.summarize("  eu trabalhei   com python ")
+    other = summary_service.summarize("Eu trabalhei com Python", max_tokens=50)
+
+    assert first == second
+    assert other == first
+    assert len(calls) == 2
+    assert summary_service.cache.stats()["hits"] == 1
+
+def test_api_errors_are_not_cached(monkeypatch):
+    """
+    Em caso de erro o texto original volta, a próxima chamada tenta de novo e o lock da chave é liberado
+    """
+    calls = _fake_api(monkeypatch, SummaryCache(max_entries=10))
+
+    def failing(text, max_tokens):
+        calls.append(text)
+        raise SummarizerError("timeout")
+
+    monkeypatch.setattr(summary_service.engine, "summarize", failing)
+    assert summary_service.summarize("texto") == "texto"
+    assert summary_service.summarize("texto") == "texto"
+    assert len(calls) == 2
+    assert summary_service.cache._key_locks == {}
+
+def test_disk_tier_survives_memory_eviction(monkeypatch, tmp_path):
+    """
+    Com a camada SQLite, um resumo removido da memória é lido do disco
+    """
+    disk = SQLiteTTLStore(60, str(tmp_path / "summaries.sqlite3"), table="summaries")
+    calls = _fake_api(monkeypatch, SummaryCache(max_entries=1, disk=disk))
+
+    summary_service.summarize("primeira resposta")
+    summary_service.summarize("segunda resposta")
+    summary_service.summarize("primeira resposta")
+
+    assert len(calls) == 2
+    assert summary_service.cache.stats()["disk_hits"] == 1
+
+def test_concurrent_requests_share_one_call(monkeypatch):
+    """
+    Pedidos simultâneos do mesmo texto fazem uma única chamada à API
+    """
+    calls = _fake_api(monkeypatch, SummaryCache(max_entries=10), delay=0.1)
+
+    async def run():
+        return await asyncio.gather(
+            *(summary_service.summarize_async("resposta repetida") for _ in range(5))
+        )
+
+    results = asyncio.run(run())
+    assert len(set(results)) == 1
+    assert len(calls) == 1
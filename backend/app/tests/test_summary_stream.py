@@ -0,0 +1,139 @@
+"""
+Testes do resumo em streaming
+Verifica o stream do LLM, o endpoint SSE e o fallback antes do primeiro token
+"""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import summary_service
+from app.services.llm_client import CircuitBreaker, LLMClient, LLMError
+from app.services.summarizers import ExtractiveSummarizer, Summarizer, SummarizerError
+from app.services.summary_service import SummaryCache
+
+client = TestClient(app)
+
+ANSWER = (
+    "Trabalhei cinco anos com Python em projetos de dados. "
+    "Nos projetos de dados usei Python com pandas e Airflow. "
+    "Gosto de futebol aos domingos. "
+    "Também liderei um time pequeno em projetos de dados com Python."
+)
+
+def _events(body: str) -> list:
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+def test_llm_stream_yields_deltas():
+    """
+    Os pedaços do stream SSE da API são repassados conforme chegam
+    """
+    chunks = ["Resumo", " em", " partes"]
+    body = "".join(
+        f"data: {json.dumps({'choices': [{'delta': {'content': c}}]})}\n\n" for c in chunks
+    ) + "data: [DONE]\n\n"
+    llm = LLMClient(
+        "http://stub.local/v1", "test", timeout=1, deadline=5, max_retries=0, backoff=0,
+        max_concurrency=2, max_connections=2, breaker=CircuitBreaker(3, 60),
+        transport=httpx.MockTransport(lambda request: httpx.Response(200, text=body)),
+    )
+
+    async def run():
+        return [delta async for delta in llm.chat_stream([], "modelo", 50, 0.0)]
+
+    assert asyncio.run(run()) == chunks
+
+def _sse_chunk(text: str) -> bytes:
+    return f"data: {json.dumps({'choices': [{'delta': {'content': text}}]})}\n\n".encode()
+
+def _stream_client(handler, deadline=5, max_concurrency=2):
+    return LLMClient(
+        "http://stub.local/v1", "test", timeout=5, deadline=deadline, max_retries=0, backoff=0,
+        max_concurrency=max_concurrency, max_connections=2, breaker=CircuitBreaker(3, 60),
+        transport=httpx.MockTransport(handler),
+    )
+
+async def _collect(stream):
+    return [delta async for delta in stream]
+
+def test_slow_consumer_does_not_hold_the_concurrency_slot():
+    """
+    Um consumidor parado no meio do stream não impede outra chamada com LLM_MAX_CONCURRENCY=1
+    """
+    body = _sse_chunk("um") + _sse_chunk(" dois") + b"data: [DONE]\n\n"
+    llm = _stream_client(lambda request: httpx.Response(200, content=body), max_concurrency=1)
+
+    async def run():
+        slow = llm.chat_stream([], "modelo", 50, 0.0)
+        first = await anext(slow)
+        other = await asyncio.wait_for(_collect(llm.chat_stream([], "modelo", 50, 0.0)), 2)
+        rest = [delta async for delta in slow]
+        return first, other, rest
+
+    assert asyncio.run(run()) == ("um", ["um", " dois"], [" dois"])
+
+def test_deadline_reaches_a_suspended_consumer_as_llm_error():
+    """
+    Se o prazo estoura enquanto o consumidor está parado, o próximo pedaço levanta LLMError
+    """
+    async def body():
+        yield _sse_chunk("começo")
+        await asyncio.sleep(10)
+
+    llm = _stream_client(lambda request: httpx.Response(200, content=body()), deadline=0.3)
+
+    async def run():
+        stream = llm.chat_stream([], "modelo", 50, 0.0)
+        assert await anext(stream) == "começo"
+        await asyncio.sleep(0.5)
+        with pytest.raises(LLMError, match="Prazo"):
+            await anext(stream)
+
+    asyncio.run(run())
+
+def test_sse_endpoint_streams_tokens_then_done(monkeypatch):
+    """
+    POST /summary/stream envia eventos token e, no fim, o resumo completo
+    """
+    monkeypatch.setattr(summary_service, "cache", SummaryCache(max_entries=10))
+    monkeypatch.setattr(summary_service, "engine", ExtractiveSummarizer(max_sentences=2))
+    monkeypatch.setattr(summary_service, "fallback", None)
+
+    response = client.post("/summary/stream", json={"text": ANSWER})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = _events(response.text)
+    tokens = [data["text"] for event, data in events if event == "token"]
+    assert len(tokens) == 2
+    assert events[-1] == ("done", {"summary": "".join(tokens).strip()})
+
+class FailingStream(Summarizer):
+    name = "llm"
+
+    async def stream(self, text, max_tokens):
+        raise SummarizerError("circuito aberto")
+        yield
+
+def test_stream_falls_back_before_first_token(monkeypatch):
+    """
+    Se o LLM falha antes do primeiro token, o motor extrativo assume
+    """
+    monkeypatch.setattr(summary_service, "cache", SummaryCache(max_entries=10))
+    monkeypatch.setattr(summary_service, "engine", FailingStream())
+    monkeypatch.setattr(summary_service, "fallback", ExtractiveSummarizer(max_sentences=2))
+
+    async def run():
+        return [delta async for delta in summary_service.stream_summary(ANSWER)]
+
+    summary = "".join(asyncio.run(run()))
+    assert "pandas" in summary
+    assert "futebol" not in summary
@@ -0,0 +1,88 @@
+"""
+Testes do grafo de etapas do pipeline
+Verifica paralelismo entre ramos, ordem das dependências e falhas
+"""
+
+import asyncio
+import time
+
+import numpy as np
+import pytest
+
+from app.services import answer_service, tts_service
+from app.utils.task_graph import TaskGraph
+
+def test_independent_stages_run_concurrently():
+    """
+    Ramos independentes rodam juntos: latência ≈ max(ramos), não a soma
+    """
+    async def slow(value):
+        await asyncio.sleep(0.2)
+        return value
+
+    async def run():
+        graph = TaskGraph()
+        graph.add("a", lambda: slow(1))
+        graph.add("b", lambda: slow(2))
+        graph.add("c", lambda a, b: slow(a + b), deps=("a", "b"))
+        start = time.perf_counter()
+        results = await graph.run()
+        return results, graph.timings, time.perf_counter() - start
+
+    results, timings, elapsed = asyncio.run(run())
+    assert results == {"a": 1, "b": 2, "c": 3}
+    assert set(timings) == {"a", "b", "c"}
+    assert elapsed < 0.55
+
+def test_failure_cancels_other_stages():
+    """
+    A falha de uma etapa cancela as demais e a exceção original sobe
+    """
+    events = []
+
+    async def on_stage(stage, status):
+        events.append((stage, status))
+
+    async def fail():
+        raise ValueError("áudio inválido")
+
+    async def forever():
+        await asyncio.sleep(10)
+
+    async def run():
+        graph = TaskGraph(on_stage)
+        graph.add("slow", forever)
+        graph.add("decode", fail)
+        graph.add("stt", lambda decode: forever(), deps=("decode",))
+        await graph.run()
+
+    with pytest.raises(ValueError):
+        asyncio.run(run())
+    assert ("decode", "error") in events
+    assert ("stt", "running") not in events
+
+def test_next_question_tts_overlaps_upload(monkeypatch):
+    """
+    O TTS da próxima pergunta roda enquanto o áudio ainda está chegando
+    """
+    monkeypatch.setattr(answer_service.config, "VAD_ENABLED", False)
+
+    def slow_tts(text):
+        time.sleep(0.3)
+        return "tmp/audio/tts_pergunta.mp3"
+
+    monkeypatch.setattr(tts_service, "generate_audio", slow_tts)
+
+    async def upload():
+        await asyncio.sleep(0.3)
+        return np.zeros(0, dtype=np.float32)
+
+    async def run():
+        start = time.perf_counter()
+        result = await answer_service.process_answer(upload())
+        return result, time.perf_counter() - start
+
+    result, elapsed = asyncio.run(run())
+    assert result["next_question_audio"] == "tts_pergunta.mp3"
+    assert set(result["timings"]) == set(answer_service.STAGES)
+    assert elapsed < 0.55
@@ -0,0 +1,166 @@
+"""
+Testes do cache de áudio TTS
+Verifica reuso por (texto, idioma), nomes estáveis, remoção LRU e motores
+"""
+
+import threading
+import time
+
+import gtts
+import pytest
+
+from app.services import tts_engines, tts_service
+from app.services.tts_service import TTSCache
+
+class CountingEngine(tts_engines.TTSEngine):
+    """Substitui o motor real (sem rede), contando as sínteses"""
+    name = "gtts"
+
+    def __init__(self, fail: bool = False):
+        super().__init__()
+        self.calls = 0
+        self.fail = fail
+
+    def synthesize(self, text, lang, path):
+        self.calls += 1
+        if self.fail:
+            raise tts_engines.TTSError("sem rede")
+        with open(path, "wb") as f:
+            f.write(text.encode("utf-8"))
+
+def test_repeated_question_is_served_from_cache(monkeypatch, tmp_path):
+    """
+    A mesma pergunta deve gerar um único arquivo com nome estável
+    """
+    cache = TTSCache(str(tmp_path), max_bytes=1024, max_entries=10)
+    engine = CountingEngine()
+    monkeypatch.setattr(tts_service, "cache", cache)
+    monkeypatch.setattr(tts_service, "engine", engine)
+
+    first = tts_service.generate_audio("Quais são seus pontos fortes?")
+    second = tts_service.generate_audio("Quais são seus pontos fortes?")
+    other_lang = tts_service.generate_audio("Quais são seus pontos fortes?", lang="en")
+
+    assert first == second
+    assert first != other_lang
+    assert engine.calls == 2
+    assert cache.stats()["hits"] == 1
+    assert cache._key_locks == {}
+
+def test_fallback_engine_is_used_when_primary_fails(monkeypatch, tmp_path):
+    """
+    Se o motor principal falha, o fallback gera o áudio (em vez de caminho vazio)
+    """
+    cache = TTSCache(str(tmp_path), max_bytes=1024 * 1024, max_entries=10)
+    monkeypatch.setattr(tts_service, "cache", cache)
+    monkeypatch.setattr(tts_service, "engine", CountingEngine(fail=True))
+    monkeypatch.setattr(tts_service, "fallback", tts_engines.create_engine("fake"))
+
+    path = tts_service.generate_audio("Fale sobre um projeto recente.")
+    assert path.endswith(".ogg")  # TTS_OUTPUT_CODEC=opus
+    assert (tmp_path / path.rsplit("/", 1)[-1]).stat().st_size > 0
+
+    monkeypatch.setattr(tts_service, "fallback", None)
+    assert tts_service.generate_audio("Outra pergunta") == ""
+    assert cache._key_locks == {}
+
+def test_local_engine_runs_subprocess_and_reports_failures(monkeypatch, tmp_path):
+    """
+    O espeak-ng recebe o texto no stdin e grava WAV; binário ausente vira TTSError
+    """
+    fake_bin = tmp_path / "espeak-ng"
+    # Simula o espeak-ng: grava o texto recebido no arquivo do -w
+    fake_bin.write_text('#!/bin/sh\nwhile [ "$1" != "-w" ]; do shift; done\ncat > "$2"\n')
+    fake_bin.chmod(0o755)
+    monkeypatch.setattr(tts_engines.config, "TTS_ESPEAK_BIN", str(fake_bin))
+
+    engine = tts_engines.create_engine("espeak-ng")
+    assert engine.available()
+    assert engine.extension == "wav"
+    assert engine.command("pt", "out.wav")[:4] == [str(fake_bin), "--stdin", "-v", "pt-br"]
+    engine.synthesize("Olá", "pt", str(tmp_path / "out.wav"))
+    assert (tmp_path / "out.wav").read_text() == "Olá"
+
+    monkeypatch.setattr(tts_engines.config, "TTS_ESPEAK_BIN", str(tmp_path / "missing"))
+    engine = tts_engines.create_engine("espeak-ng")
+    assert not engine.available()
+    try:
+        engine.synthesize("Olá", "pt", str(tmp_path / "x.wav"))
+    except tts_engines.TTSError:
+        pass
+    else:
+        raise AssertionError("binário ausente não levantou TTSError")
+
+def test_hanging_gtts_request_times_out(monkeypatch, tmp_path):
+    """
+    Um gTTS sem resposta vira TTSError em TTS_TIMEOUT_SECONDS e não grava o arquivo depois
+    """
+    release = threading.Event()
+
+    class HangingGTTS:
+        def __init__(self, text, lang):
+            pass
+
+        def write_to_fp(self, fp):
+            release.wait(10)
+            fp.write(b"tarde demais")
+
+    monkeypatch.setattr(gtts, "gTTS", HangingGTTS)
+    monkeypatch.setattr(tts_engines.config, "TTS_TIMEOUT_SECONDS", 0.2)
+    path = tmp_path / "pergunta.mp3"
+
+    start = time.perf_counter()
+    with pytest.raises(tts_engines.TTSError, match="sem resposta"):
+        tts_engines.create_engine("gtts").synthesize("Olá", "pt", str(path))
+    assert time.perf_counter() - start < 2
+    release.set()
+    time.sleep(0.05)
+    assert not path.exists()
+
+def test_abandoned_gtts_requests_count_against_concurrency(monkeypatch, tmp_path):
+    """
+    Requisições abandonadas pelo timeout seguram a vaga até a thread terminar
+    """
+    release = threading.Event()
+
+    class HangingGTTS:
+        def __init__(self, text, lang):
+            pass
+
+        def write_to_fp(self, fp):
+            release.wait(10)
+            fp.write(b"audio")
+
+    monkeypatch.setattr(gtts, "gTTS", HangingGTTS)
+    monkeypatch.setattr(tts_engines.config, "TTS_TIMEOUT_SECONDS", 0.1)
+    engine = tts_engines.create_engine("gtts", concurrency=1)
+    path = tmp_path / "pergunta.mp3"
+
+    with pytest.raises(tts_engines.TTSError, match="sem resposta"):
+        engine.synthesize("Olá", "pt", str(path))
+    with pytest.raises(tts_engines.TTSError, match="conexões ocupadas"):
+        engine.synthesize("Olá", "pt", str(path))
+
+    release.set()
+    time.sleep(0.05)
+    engine.synthesize("Olá", "pt", str(path))
+    assert path.read_bytes() == b"audio"
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    """
+    Ao passar do limite de entradas, o áudio menos usado é removido do disco
+    """
+    cache = TTSCache(str(tmp_path), max_bytes=1024, max_entries=2)
+    paths = {}
+    for key in ("a", "b", "c"):
+        paths[key] = cache.path_for(key)
+        with open(paths[key], "wb") as f:
+            f.write(b"x")
+        cache.put(key, paths[key])
+        if key == "b":
+            cache.get("a")  # "a" passa a ser o mais recente
+
+    assert cache.get("b") is None
+    assert not (tmp_path / "tts_b.mp3").exists()
+    assert cache.get("a") == paths["a"]
+    assert cache.get("c") == paths["c"]
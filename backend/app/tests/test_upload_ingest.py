@@ -0,0 +1,92 @@
+"""
+Testes do recebimento de áudio em streaming
+Verifica limite de tamanho, identificação do formato e decodificação
+"""
+
+from io import BytesIO
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.tests.helpers import wav_bytes
+from app.utils import upload_ingest
+from app.utils.upload_ingest import sniff_container
+
+client = TestClient(app)
+
+def test_sniff_container_uses_magic_bytes():
+    """
+    O formato vem dos primeiros bytes, não do content_type
+    """
+    assert sniff_container(wav_bytes(0.1)[:12]) == "wav"
+    assert sniff_container(b"\x1a\x45\xdf\xa3" + b"\x00" * 8) == "webm"
+    assert sniff_container(b"OggS" + b"\x00" * 8) == "ogg"
+    assert sniff_container(b"ID3\x04" + b"\x00" * 8) == "mp3"
+    assert sniff_container(b"not audio at all") is None
+
+def test_oversized_upload_is_rejected(monkeypatch):
+    """
+    Uploads acima de UPLOAD_MAX_BYTES recebem 413
+    """
+    monkeypatch.setattr(upload_ingest.config, "UPLOAD_MAX_BYTES", 1024)
+    files = {"audio": ("big.wav", BytesIO(wav_bytes(1.0)), "audio/wav")}
+    response = client.post("/answer", files=files)
+    assert response.status_code == 413
+
+def test_unknown_format_is_rejected_even_with_audio_content_type():
+    """
+    Conteúdo que não é áudio recebe 415 mesmo declarando audio/wav
+    """
+    files = {"audio": ("fake.wav", BytesIO(b"not audio data here"), "audio/wav")}
+    response = client.post("/answer", files=files)
+    assert response.status_code == 415
+
+def test_raw_body_is_decoded_while_streaming():
+    """
+    O áudio bruto no corpo (sem multipart) também é aceito
+    """
+    response = client.post(
+        "/answer", content=wav_bytes(0.5), headers={"Content-Type": "application/octet-stream"}
+    )
+    assert response.status_code == 200
+    assert "transcription" in response.json()
+
+def test_chunked_upload_with_oversized_form_field_is_rejected(monkeypatch):
+    """
+    Sem Content-Length, campos fora do áudio também contam para o limite
+    """
+    monkeypatch.setattr(upload_ingest.config, "UPLOAD_MAX_BYTES", 1024)
+    boundary = "limite"
+
+    def body():
+        yield (
+            f"--{boundary}\r\n"
+            'Content-Disposition: form-data; name="notes"\r\n\r\n'
+        ).encode()
+        for _ in range(200):
+            yield b"x" * 1024
+        yield f"\r\n--{boundary}--\r\n".encode()
+
+    response = client.post(
+        "/answer",
+        content=body(),
+        headers={"Content-Type": f"multipart/form-data; boundary={boundary}"},
+    )
+    assert response.status_code == 413
+
+def test_oversized_part_header_is_rejected():
+    """
+    Cabeçalhos de parte gigantes não crescem sem limite na memória
+    """
+    boundary = "limite"
+    body = (
+        f"--{boundary}\r\n"
+        f"X-Padding: {'x' * 3 * 1024}\r\n"
+        'Content-Disposition: form-data; name="audio"; filename="a.wav"\r\n\r\n'
+    ).encode() + wav_bytes(0.1) + f"\r\n--{boundary}--\r\n".encode()
+    response = client.post(
+        "/answer",
+        content=body,
+        headers={"Content-Type": f"multipart/form-data; boundary={boundary}"},
+    )
+    assert response.status_code == 413
@@ -0,0 +1,59 @@
+"""
+Testes do VAD (remoção de silêncio antes do STT)
+Verifica a detecção dos segmentos de fala e o tempo removido
+"""
+
+import numpy as np
+
+from app.services.vad_service import trim_silence
+
+SR = 16000
+
+def _tone(seconds: float) -> np.ndarray:
+    t = np.arange(int(seconds * SR)) / SR
+    return (0.3 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+def _silence(seconds: float, level: float = 0.001) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    return (level * rng.standard_normal(int(seconds * SR))).astype(np.float32)
+
+def test_trims_leading_trailing_and_long_pauses():
+    """
+    Silêncios longos são removidos e a fala vira dois segmentos
+    """
+    audio = np.concatenate([
+        _silence(2.0), _tone(1.0), _silence(1.5), _tone(1.0), _silence(2.0)
+    ])
+    result = trim_silence(audio)
+
+    assert len(result["segments"]) == 2
+    assert 2.0 <= result["speech_seconds"] <= 3.0
+    assert result["trimmed_seconds"] >= 4.5
+    assert len(result["audio"]) < len(audio) / 2
+
+def test_continuous_speech_is_kept():
+    """
+    Fala contínua sem pausas não deve ser descartada
+    """
+    result = trim_silence(_tone(3.0))
+    assert len(result["segments"]) == 1
+    assert result["trimmed_seconds"] < 0.1
+
+def test_silence_only_returns_empty_audio():
+    """
+    Áudio sem fala não deve ir para o STT
+    """
+    result = trim_silence(_silence(3.0))
+    assert result["segments"] == []
+    assert len(result["audio"]) == 0
+
+def test_short_speech_in_loud_noise_is_trimmed():
+    """
+    Com ruído de ~-40 dBFS e menos de 5% de fala, o ruído ainda é removido
+    """
+    audio = np.concatenate([_silence(15.0, 0.01), _tone(1.0), _silence(14.0, 0.01)])
+    result = trim_silence(audio)
+
+    assert len(result["segments"]) == 1
+    assert 1.0 <= result["speech_seconds"] <= 1.5
+    assert result["trimmed_seconds"] >= 28.5
@@ -0,0 +1,198 @@
+"""
+artifact_store.py - Ciclo de vida dos arquivos em tmp/
+------------------------------------------------------
+Sem limpeza, os áudios gerados se acumulam em tmp/ até encher o disco.
+O ArtifactStore:
+- Registra cada arquivo gerado com um TTL próprio (register).
+- Atualiza o último acesso quando o arquivo é servido (touch).
+- Em cada varredura (sweep) remove arquivos expirados e, se o total
+  passar de ARTIFACT_MAX_BYTES / ARTIFACT_MAX_FILES, remove os menos
+  acessados (LRU).
+- Arquivos não registrados (ex.: de execuções anteriores) são descobertos
+  na varredura e recebem o TTL padrão a partir do mtime, desde que tenham
+  o prefixo de um artefato gerado (tts_, answer_). Outros arquivos em tmp/
+  (ex.: os áudios de exemplo versionados em tmp/audio) nunca são apagados.
+- Bancos SQLite (jobs/sessões) são ignorados: têm expiração própria.
+
+run_sweeper() roda a varredura periodicamente como task asyncio.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+
+from app.utils import config, executor, metrics
+
+logger = logging.getLogger(__name__)
+
+_IGNORED_SUFFIXES = (".sqlite3", ".sqlite3-wal", ".sqlite3-shm", ".db")
+# Prefixos dos arquivos que o próprio backend gera (tts_service, answer_service)
+_GENERATED_PREFIXES = ("tts_", "answer_")
+
+
+class ArtifactStore:
+    """Índice de arquivos temporários com TTL, quota e remoção LRU."""
+
+    def __init__(self, root: str, default_ttl: int, max_bytes: int, max_files: int):
+        self.root = root
+        self.default_ttl = default_ttl
+        self.max_bytes = max_bytes
+        self.max_files = max_files
+        self._files = {}  # path -> [size, last_access, expires_at]
+        self._lock = threading.Lock()
+        self.metrics = {
+            "files": 0,
+            "bytes": 0,
+            "expired": 0,
+            "evictions": 0,
+            "sweeps": 0,
+            "last_sweep": None,
+        }
+
+    def register(self, path: str, ttl_seconds: int = None):
+        """Registra um arquivo recém-gerado."""
+        now = time.time()
+        ttl = self.default_ttl if ttl_seconds is None else ttl_seconds
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return
+        with self._lock:
+            self._files[os.path.normpath(path)] = [size, now, now + ttl]
+
+    def touch(self, path: str):
+        """Marca o arquivo como usado agora (posição no LRU)."""
+        with self._lock:
+            entry = self._files.get(os.path.normpath(path))
+            if entry is not None:
+                entry[1] = time.time()
+
+    def _scan(self) -> dict:
+        found = {}
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                if name.endswith(_IGNORED_SUFFIXES):
+                    continue
+                path = os.path.normpath(os.path.join(dirpath, name))
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                found[path] = st
+        return found
+
+    def _remove(self, path: str) -> bool:
+        try:
+            os.remove(path)
+            return True
+        except FileNotFoundError:
+            return True
+        except OSError as e:
+            logger.warning(f"Não foi possível remover {path}: {e}")
+            return False
+
+    def sweep(self) -> dict:
+        """Remove expirados e aplica a quota. Retorna as métricas atualizadas."""
+        if not os.path.isdir(self.root):
+            return self.stats()
+        found = self._scan()
+        now = time.time()
+
+        with self._lock:
+            # Sincroniza o índice com o disco
+            for path in list(self._files):
+                if path not in found:
+                    del self._files[path]
+            for path, st in found.items():
+                entry = self._files.get(path)
+                if entry is None:
+                    if not os.path.basename(path).startswith(_GENERATED_PREFIXES):
+                        continue
+                    self._files[path] = [
+                        st.st_size, st.st_mtime, st.st_mtime + self.default_ttl
+                    ]
+                else:
+                    entry[0] = st.st_size
+
+            expired = [path for path, (_, _, exp) in self._files.items() if exp <= now]
+            by_access = sorted(
+                (path for path in self._files if path not in expired),
+                key=lambda path: self._files[path][1],
+            )
+
+        removed_expired = [path for path in expired if self._remove(path)]
+
+        with self._lock:
+            for path in removed_expired:
+                self._files.pop(path, None)
+            total = sum(size for size, _, _ in self._files.values())
+            evicted = []
+            for path in by_access:
+                if total <= self.max_bytes and len(self._files) - len(evicted) <= self.max_files:
+                    break
+                if path in self._files:
+                    evicted.append(path)
+                    total -= self._files[path][0]
+
+        evicted = [path for path in evicted if self._remove(path)]
+
+        with self._lock:
+            for path in evicted:
+                self._files.pop(path, None)
+            self.metrics["expired"] += len(removed_expired)
+            self.metrics["evictions"] += len(evicted)
+            self.metrics["sweeps"] += 1
+            self.metrics["last_sweep"] = now
+
+        if removed_expired or evicted:
+            logger.info(
+                f"Limpeza de {self.root}: {len(removed_expired)} expirado(s), "
+                f"{len(evicted)} removido(s) por quota"
+            )
+        return self.stats()
+
+    def stats(self) -> dict:
+        with self._lock:
+            self.metrics["files"] = len(self._files)
+            self.metrics["bytes"] = sum(size for size, _, _ in self._files.values())
+            return dict(self.metrics)
+
+
+store = ArtifactStore(
+    config.ARTIFACT_ROOT,
+    config.ARTIFACT_TTL_SECONDS,
+    config.ARTIFACT_MAX_BYTES,
+    config.ARTIFACT_MAX_FILES,
+)
+
+TMP_BYTES = metrics.Gauge(
+    "sidekick_tmp_bytes",
+    "Bytes dos artefatos registrados em tmp/ (áudios TTS, uploads)",
+    fn=lambda: store.stats()["bytes"],
+)
+TMP_FILES = metrics.Gauge(
+    "sidekick_tmp_files",
+    "Artefatos registrados em tmp/",
+    fn=lambda: store.stats()["files"],
+)
+REMOVED = metrics.Counter(
+    "sidekick_tmp_removed_total",
+    "Artefatos removidos pela limpeza, por motivo",
+    ("reason",),
+    fn=lambda: {
+        ("expired",): store.metrics["expired"], ("evicted",): store.metrics["evictions"],
+    },
+)
+
+
+async def run_sweeper(interval: float = None):
+    """Loop de limpeza em background (cancelado no shutdown da aplicação)."""
+    interval = interval or config.ARTIFACT_SWEEP_INTERVAL_SECONDS
+    while True:
+        try:
+            await executor.run_io(store.sweep)
+        except Exception as e:
+            logger.error(f"Erro na limpeza de artefatos: {e}")
+        await asyncio.sleep(interval)
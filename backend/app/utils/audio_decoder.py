@@ -0,0 +1,137 @@
+"""
+audio_decoder.py - Decodificação de áudio via pipe do ffmpeg
+------------------------------------------------------------
+- Usa o executável do imageio-ffmpeg (o mesmo configurado no PyDub)
+- Entrega PCM 16 kHz mono float32 (formato esperado pelo Whisper)
+- decode_bytes: bytes do upload → array NumPy com um único ffmpeg
+  (stdin → stdout), sem arquivos temporários nem WAV intermediário
+- StreamDecoder: processo ffmpeg persistente alimentado chunk a chunk
+  (ex.: pedaços do MediaRecorder chegando por WebSocket, ou o corpo de
+  um upload sendo recebido)
+"""
+
+import asyncio
+import logging
+import subprocess
+
+import imageio_ffmpeg
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+FFMPEG_EXE = imageio_ffmpeg.get_ffmpeg_exe()
+
+# Saída comum: PCM s16le, mono, 16 kHz no stdout
+_OUTPUT_ARGS = ["-f", "s16le", "-ac", "1", "-ar", str(SAMPLE_RATE), "pipe:1"]
+
+
+class AudioDecodeError(Exception):
+    """O ffmpeg não conseguiu decodificar o áudio recebido."""
+
+
+def pcm16_to_float32(data: bytes) -> np.ndarray:
+    """Converte PCM s16le em float32 normalizado em [-1, 1]."""
+    return np.frombuffer(data, dtype=np.int16).astype(np.float32) / 32768.0
+
+
+def decode_bytes(data: bytes) -> np.ndarray:
+    """
+    Decodifica um áudio completo (webm, ogg, wav, mp3...) em memória.
+
+    Uma única invocação do ffmpeg lê do stdin e escreve PCM no stdout;
+    o resultado vai direto para o Whisper. Containers que exigem seek
+    (ex.: mp4 com moov no final) não são suportados via pipe.
+
+    Retorna:
+    -------
+    np.ndarray
+        PCM float32, mono, 16 kHz.
+    """
+    if not data:
+        raise AudioDecodeError("Áudio vazio")
+    proc = subprocess.run(
+        [FFMPEG_EXE, "-hide_banner", "-loglevel", "error", "-i", "pipe:0", *_OUTPUT_ARGS],
+        input=data,
+        capture_output=True,
+    )
+    if proc.returncode != 0:
+        message = proc.stderr.decode(errors="ignore").strip().splitlines()
+        raise AudioDecodeError(message[-1] if message else "ffmpeg falhou")
+    return pcm16_to_float32(proc.stdout)
+
+
+class StreamDecoder:
+    """
+    Decodificador incremental: chunks de um container (webm/ogg/wav) entram
+    no stdin do ffmpeg e o PCM decodificado é acumulado por uma task leitora.
+
+    Uso:
+        decoder = StreamDecoder()
+        await decoder.start()
+        await decoder.feed(chunk)
+        samples = decoder.read()      # amostras novas desde a última leitura
+        samples = await decoder.close()  # resto do áudio ao final
+    """
+
+    def __init__(self, low_latency: bool = True):
+        # low_latency: sondagem mínima do container (chunks ao vivo do
+        # MediaRecorder); desligado para arquivos completos (ex.: mp3 com ID3)
+        self.low_latency = low_latency
+        self._proc = None
+        self._reader = None
+        self._pcm = bytearray()
+
+    async def start(self):
+        probe_args = ["-probesize", "2048", "-analyzeduration", "0"] if self.low_latency else []
+        self._proc = await asyncio.create_subprocess_exec(
+            FFMPEG_EXE, "-hide_banner", "-loglevel", "error",
+            *probe_args,
+            "-i", "pipe:0", *_OUTPUT_ARGS,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+        self._reader = asyncio.create_task(self._read_stdout())
+
+    async def _read_stdout(self):
+        while True:
+            data = await self._proc.stdout.read(8192)
+            if not data:
+                break
+            self._pcm.extend(data)
+
+    async def feed(self, chunk: bytes):
+        """Envia um pedaço do container para o ffmpeg."""
+        try:
+            self._proc.stdin.write(chunk)
+            await self._proc.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError):
+            logger.warning("ffmpeg encerrou o stdin; chunk descartado")
+
+    def read(self) -> np.ndarray:
+        """Retorna (e consome) as amostras decodificadas até agora."""
+        usable = len(self._pcm) - (len(self._pcm) % 2)
+        samples = pcm16_to_float32(bytes(self._pcm[:usable]))
+        del self._pcm[:usable]
+        return samples
+
+    async def close(self) -> np.ndarray:
+        """Fecha o stdin, espera o ffmpeg terminar e retorna o restante."""
+        if self._proc is None:
+            return np.zeros(0, dtype=np.float32)
+        if not self._proc.stdin.is_closing():
+            self._proc.stdin.close()
+        await self._reader
+        await self._proc.wait()
+        return self.read()
+
+    @property
+    def returncode(self):
+        """Código de saída do ffmpeg (None enquanto estiver rodando)."""
+        return None if self._proc is None else self._proc.returncode
+
+    def kill(self):
+        """Encerra o ffmpeg sem esperar (ex.: cliente desconectou)."""
+        if self._proc is not None and self._proc.returncode is None:
+            self._proc.kill()
@@ -0,0 +1,351 @@
+"""
+audio_delivery.py - Entrega de áudio com Range, ETag e cache
+------------------------------------------------------------
+Usado pelo /play_audio (main.py):
+- Range/206: o navegador busca só o trecho pedido ao avançar/voltar o player.
+- ETag forte + If-None-Match/304: replays não baixam o arquivo de novo.
+  Áudios endereçados por conteúdo (`tts_<hash>.*`) usam o próprio hash
+  e recebem `Cache-Control: immutable`; os demais usam sha256 do arquivo.
+- Cache quente em memória (LRU) para os áudios mais tocados, evitando
+  ler o disco a cada requisição. Arquivos maiores que
+  AUDIO_HOT_CACHE_MAX_FILE_BYTES são transmitidos em blocos.
+- Negociação pelo Accept: se o cliente não aceita o formato guardado (ex.:
+  Opus/OGG para quem só aceita audio/mpeg), serve o formato aceito de maior
+  q, convertido uma vez (app.utils.audio_encoder) e guardado ao lado do
+  original. Formatos aceitos são servidos como estão (sem reconversão).
+  Opus/OGG só vai para quem lista audio/ogg ou audio/opus: `*/*`, `audio/*`
+  ou Accept ausente (ex.: Safari, que não toca Ogg) recebem MP3.
+"""
+
+import hashlib
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+
+from fastapi import Request
+from fastapi.responses import Response, StreamingResponse
+
+from app.utils import audio_encoder, config, executor, metrics
+from app.utils.artifact_store import store as artifact_store
+
+logger = logging.getLogger(__name__)
+
+MEDIA_TYPES = {
+    ".mp3": "audio/mpeg",
+    ".wav": "audio/wav",
+    ".ogg": "audio/ogg",
+    ".opus": "audio/ogg",
+    ".webm": "audio/webm",
+}
+
+# Formatos que só são servidos a quem os pede explicitamente; os demais recebem _SAFE_CODEC
+_EXPLICIT_ONLY = ("audio/ogg", "audio/opus")
+_SAFE_CODEC = "mp3"
+
+_CONTENT_ADDRESSED = re.compile(r"^tts_([0-9a-f]{16,64})\.(\w+)$")
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class HotCache:
+    """LRU de conteúdos de áudio em memória, limitado em bytes."""
+
+    def __init__(self, max_bytes: int, max_file_bytes: int):
+        self.max_bytes = max_bytes
+        self.max_file_bytes = max_file_bytes
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()  # (path, mtime_ns, size) -> bytes
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            data = self._items.get(key)
+            if data is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return data
+
+    def put(self, key, data: bytes):
+        if len(data) > self.max_file_bytes or len(data) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._items:
+                return
+            self._items[key] = data
+            self.total_bytes += len(data)
+            while self.total_bytes > self.max_bytes:
+                _, old = self._items.popitem(last=False)
+                self.total_bytes -= len(old)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._items),
+                "bytes": self.total_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+hot_cache = HotCache(config.AUDIO_HOT_CACHE_MAX_BYTES, config.AUDIO_HOT_CACHE_MAX_FILE_BYTES)
+
+HOT_CACHE_REQUESTS = metrics.Counter(
+    "sidekick_audio_hot_cache_requests_total",
+    "Consultas ao cache em memória do /play_audio por resultado",
+    ("result",),
+    fn=lambda: {("hit",): hot_cache.hits, ("miss",): hot_cache.misses},
+)
+
+# sha256 de arquivos não endereçados por conteúdo: (path, mtime_ns, size) -> etag
+# (LRU de AUDIO_ETAG_CACHE_MAX_ENTRIES: os arquivos answer_<uuid> não param de chegar)
+_etags = OrderedDict()
+_etags_lock = threading.Lock()
+
+
+def resolve(directory: Path, filename: str):
+    """Caminho do arquivo dentro de `directory`, ou None (inexistente ou nome inválido)."""
+    if not filename or filename != Path(filename).name or filename.startswith("."):
+        return None
+    path = Path(directory) / filename
+    return path if path.is_file() else None
+
+
+def media_type(path: Path) -> str:
+    return MEDIA_TYPES.get(path.suffix.lower(), "application/octet-stream")
+
+
+def is_immutable(path: Path) -> bool:
+    return _CONTENT_ADDRESSED.match(path.name) is not None
+
+
+def _file_etag(path: Path, key) -> str:
+    match = _CONTENT_ADDRESSED.match(path.name)
+    if match:
+        # Cada formato do mesmo conteúdo é uma representação (ETag) diferente
+        return f'"{match.group(1)}.{match.group(2)}"'
+    with _etags_lock:
+        cached = _etags.get(key)
+        if cached:
+            _etags.move_to_end(key)
+            return cached
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(config.AUDIO_CHUNK_BYTES), b""):
+            digest.update(block)
+    etag = f'"{digest.hexdigest()[:32]}"'
+    with _etags_lock:
+        _etags[key] = etag
+        while len(_etags) > config.AUDIO_ETAG_CACHE_MAX_ENTRIES:
+            _etags.popitem(last=False)
+    return etag
+
+
+def parse_range(header: str, size: int):
+    """
+    Interpreta um header Range de intervalo único.
+
+    Retorna:
+    -------
+    tuple | None | str
+        (início, fim) inclusivos; None para ignorar o Range (resposta 200);
+        "invalid" quando o intervalo não é satisfazível (416).
+    """
+    match = _RANGE.match(header.strip())
+    if not match:
+        # Múltiplos intervalos ou unidade desconhecida: envia o arquivo inteiro
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return "invalid"
+    if not first:
+        length = int(last)
+        if length == 0:
+            return "invalid"
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return "invalid"
+    return start, end
+
+
+def parse_accept(header: str) -> list:
+    """Faixas do header Accept como (media type, q), maior q primeiro."""
+    ranges = []
+    for part in header.split(","):
+        media, *params = [p.strip() for p in part.split(";")]
+        if not media:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        ranges.append((media.lower(), q))
+    return sorted(ranges, key=lambda item: -item[1])
+
+
+def _quality(media: str, ranges: list) -> float:
+    """q do media type pela faixa mais específica que o cobre (0 = não aceito)."""
+    kind = media.split("/")[0]
+    for pattern in (media, f"{kind}/*", "*/*"):
+        for candidate, q in ranges:
+            if candidate == pattern:
+                return q
+    return 0.0
+
+
+# Conversões em andamento: variante -> [lock, interessados] (uma conversão por arquivo)
+_variant_locks = {}
+_variant_locks_lock = threading.Lock()
+
+
+@contextmanager
+def _variant_lock(key: str):
+    """
+    Lock por variante; sai do dicionário quando o último interessado termina,
+    com a conversão bem-sucedida ou não.
+    """
+    with _variant_locks_lock:
+        entry = _variant_locks.setdefault(key, [threading.Lock(), 0])
+        entry[1] += 1
+    try:
+        with entry[0]:
+            yield
+    finally:
+        with _variant_locks_lock:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del _variant_locks[key]
+
+
+def _make_variant(source: Path, variant: Path, codec: str) -> bool:
+    with _variant_lock(str(variant)):
+        if variant.is_file():
+            return True
+        try:
+            audio_encoder.transcode(str(source), str(variant), codec)
+        except audio_encoder.AudioEncodeError as e:
+            logger.warning(f"Conversão de {source.name} para {codec} falhou: {e}")
+            return False
+        artifact_store.register(str(variant))
+    return True
+
+
+async def negotiate(request: Request, path: Path) -> Path:
+    """Arquivo a servir para o Accept do cliente (`path` ou uma variante convertida)."""
+    ranges = parse_accept(request.headers.get("accept") or "*/*")
+    media = media_type(path)
+    if media in _EXPLICIT_ONLY:
+        if any(candidate in _EXPLICIT_ONLY and q > 0 for candidate, q in ranges):
+            return path
+    elif _quality(media, ranges) > 0:
+        return path
+    codecs = [
+        audio_encoder.codec_for_media_type(candidate) for candidate, q in ranges if q > 0
+    ]
+    # Curingas (*/*, audio/*) aceitam o formato seguro
+    if _quality(audio_encoder.get_codec(_SAFE_CODEC)["media_type"], ranges) > 0:
+        codecs.append(_SAFE_CODEC)
+    for codec in codecs:
+        if codec is None:
+            continue
+        variant = path.with_suffix(f".{audio_encoder.extension(codec)}")
+        if variant == path:
+            continue
+        if await executor.run_io(_make_variant, path, variant, codec):
+            return variant
+    # Nenhum formato aceito disponível: envia o original
+    return path
+
+
+def _iter_file(path: Path, start: int, length: int):
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = length
+        while remaining > 0:
+            block = f.read(min(config.AUDIO_CHUNK_BYTES, remaining))
+            if not block:
+                break
+            remaining -= len(block)
+            yield block
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    candidates = [tag.strip() for tag in header.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def _inspect(path: Path):
+    st = path.stat()
+    key = (str(path), st.st_mtime_ns, st.st_size)
+    return key, st.st_size, _file_etag(path, key)
+
+
+def _read(path: Path) -> bytes:
+    return path.read_bytes()
+
+
+async def build_response(request: Request, path: Path) -> Response:
+    """Monta a resposta (200, 206, 304 ou 416) para servir `path` no formato negociado."""
+    path = await negotiate(request, path)
+    key, size, etag = await executor.run_io(_inspect, path)
+    headers = {
+        "ETag": etag,
+        "Vary": "Accept",
+        "Accept-Ranges": "bytes",
+        "Cache-Control": (
+            f"public, max-age={config.AUDIO_IMMUTABLE_MAX_AGE}, immutable"
+            if is_immutable(path) else "no-cache"
+        ),
+    }
+    media = media_type(path)
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    byte_range = None
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (not if_range or if_range.strip() == etag):
+        byte_range = parse_range(range_header, size)
+    if byte_range == "invalid":
+        headers["Content-Range"] = f"bytes */{size}"
+        return Response(status_code=416, headers=headers)
+
+    start, end = byte_range or (0, size - 1)
+    length = end - start + 1 if size else 0
+    status_code = 206 if byte_range else 200
+    if byte_range:
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+
+    data = hot_cache.get(key)
+    if data is None and size <= hot_cache.max_file_bytes:
+        data = await executor.run_io(_read, path)
+        hot_cache.put(key, data)
+    if data is not None:
+        return Response(
+            content=data[start:end + 1], status_code=status_code,
+            headers=headers, media_type=media,
+        )
+
+    headers["Content-Length"] = str(length)
+    return StreamingResponse(
+        _iter_file(path, start, length), status_code=status_code,
+        headers=headers, media_type=media,
+    )
+
+
+def stats() -> dict:
+    return {"hot_cache": hot_cache.stats()}
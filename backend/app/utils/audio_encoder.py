@@ -0,0 +1,104 @@
+"""
+audio_encoder.py - Codificação de áudio para armazenamento e entrega
+--------------------------------------------------------------------
+Camada de codecs de saída usada pelo TTS (TTS_OUTPUT_CODEC), pelo arquivo
+de respostas (ANSWER_ARCHIVE_CODEC) e pela negociação do /play_audio:
+- "opus": Opus em OGG (~24 kbps para voz mono; ~10x menor que WAV 16 kHz);
+- "webm": Opus em WebM (o formato do MediaRecorder dos navegadores);
+- "mp3": para clientes sem Opus;
+- "wav": PCM s16le, sem compressão.
+
+Cada codificação é uma única chamada ao ffmpeg (o mesmo executável do
+audio_decoder) gravando em `<destino>.part`, renomeado no final: quem lê
+o diretório nunca vê um arquivo pela metade.
+"""
+
+import logging
+import os
+import subprocess
+
+import numpy as np
+
+from app.utils import config
+from app.utils.audio_decoder import FFMPEG_EXE, SAMPLE_RATE
+
+logger = logging.getLogger(__name__)
+
+# codec -> extensão, media type e argumentos de saída do ffmpeg
+CODECS = {
+    "opus": {
+        "extension": "ogg",
+        "media_type": "audio/ogg",
+        "args": lambda: ["-c:a", "libopus", "-b:a", config.AUDIO_OPUS_BITRATE, "-ac", "1", "-f", "ogg"],
+    },
+    "webm": {
+        "extension": "webm",
+        "media_type": "audio/webm",
+        "args": lambda: ["-c:a", "libopus", "-b:a", config.AUDIO_OPUS_BITRATE, "-ac", "1", "-f", "webm"],
+    },
+    "mp3": {
+        "extension": "mp3",
+        "media_type": "audio/mpeg",
+        "args": lambda: ["-c:a", "libmp3lame", "-b:a", config.AUDIO_MP3_BITRATE, "-ac", "1", "-f", "mp3"],
+    },
+    "wav": {
+        "extension": "wav",
+        "media_type": "audio/wav",
+        "args": lambda: ["-c:a", "pcm_s16le", "-ac", "1", "-f", "wav"],
+    },
+}
+
+
+class AudioEncodeError(Exception):
+    """O ffmpeg não conseguiu codificar o áudio."""
+
+
+def get_codec(name: str) -> dict:
+    if name not in CODECS:
+        raise ValueError(f"Codec desconhecido: {name} (disponíveis: {sorted(CODECS)})")
+    return CODECS[name]
+
+
+def extension(name: str) -> str:
+    return get_codec(name)["extension"]
+
+
+def codec_for_media_type(media_type: str):
+    """Nome do codec que produz `media_type` (ex.: "audio/ogg"), ou None."""
+    for name, codec in CODECS.items():
+        if codec["media_type"] == media_type:
+            return name
+    return None
+
+
+def _run(input_args: list, path: str, codec: str, data: bytes = None):
+    partial = f"{path}.part"
+    try:
+        proc = subprocess.run(
+            [FFMPEG_EXE, "-hide_banner", "-loglevel", "error", "-y",
+             *input_args, *get_codec(codec)["args"](), partial],
+            input=data,
+            capture_output=True,
+        )
+        if proc.returncode != 0:
+            message = proc.stderr.decode(errors="ignore").strip().splitlines()
+            raise AudioEncodeError(message[-1] if message else "ffmpeg falhou")
+        os.replace(partial, path)
+    finally:
+        if os.path.exists(partial):
+            os.remove(partial)
+
+
+def encode_pcm(pcm: np.ndarray, path: str, codec: str, sample_rate: int = SAMPLE_RATE):
+    """Grava PCM float32 mono (16 kHz) em `path` com `codec`."""
+    data = (np.clip(pcm, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+    _run(["-f", "s16le", "-ac", "1", "-ar", str(sample_rate), "-i", "pipe:0"], path, codec, data)
+
+
+def transcode(source: str, path: str, codec: str):
+    """Converte o arquivo de áudio `source` para `codec` em `path`."""
+    _run(["-i", source], path, codec)
+    logger.info(
+        f"Áudio convertido para {codec}: {os.path.basename(path)} "
+        f"({os.path.getsize(source)} → {os.path.getsize(path)} bytes)"
+    )
@@ -30,9 +30,192 @@ DATABASE_URL: str = os.getenv("DATABASE_URL", "")
 ENVIRONMENT: str = os.getenv("ENVIRONMENT", "development")  # dev, staging, prod
 DEBUG: bool = os.getenv("DEBUG", "false").lower() == "true"
 
+# ------------------------
+# Execução do pipeline (executores e backpressure)
+# ------------------------
+# IO_WORKERS: threads para etapas de I/O (ffmpeg, gTTS, OpenAI)
+# CPU_WORKERS: processos para etapas de CPU (Whisper)
+# CPU_EXECUTOR: "process" (padrão) ou "thread" (útil em testes/depuração)
+# MAX_PENDING_JOBS: máximo de requisições no pipeline antes de responder 503
+IO_WORKERS: int = int(os.getenv("IO_WORKERS", "8"))
+CPU_WORKERS: int = int(os.getenv("CPU_WORKERS", "1"))
+CPU_EXECUTOR: str = os.getenv("CPU_EXECUTOR", "process")  # process, thread
+CPU_START_METHOD: str = os.getenv("CPU_START_METHOD", "spawn")  # spawn, fork, forkserver
+MAX_PENDING_JOBS: int = int(os.getenv("MAX_PENDING_JOBS", "4"))
+RETRY_AFTER_SECONDS: int = int(os.getenv("RETRY_AFTER_SECONDS", "5"))
+
+# ------------------------
+# Speech to Text (motor selecionável)
+# ------------------------
+# STT_ENGINE: whisper, faster-whisper (CTranslate2 int8) ou fake (testes)
+# STT_COMPUTE_TYPE vazio usa o padrão do motor (float32 / int8)
+# STT_THREADS=0 usa todos os núcleos disponíveis
+STT_ENGINE: str = os.getenv("STT_ENGINE", "whisper")
+STT_MODEL_SIZE: str = os.getenv("STT_MODEL_SIZE", "base")
+STT_COMPUTE_TYPE: str = os.getenv("STT_COMPUTE_TYPE", "")
+STT_THREADS: int = int(os.getenv("STT_THREADS", "0"))
+STT_BEAM_SIZE: int = int(os.getenv("STT_BEAM_SIZE", "5"))
+# STT_WARMUP_ON_STARTUP: carrega o modelo em background ao subir a API
+# (caso contrário, a carga acontece na primeira transcrição)
+STT_WARMUP_ON_STARTUP: bool = os.getenv("STT_WARMUP_ON_STARTUP", "false").lower() == "true"
+# STT_LOAD_RETRY_SECONDS: após uma falha na carga do modelo, espera antes de tentar de novo
+STT_LOAD_RETRY_SECONDS: float = float(os.getenv("STT_LOAD_RETRY_SECONDS", "30"))
+# STT_PRELOAD: definido por app.serve quando o modelo é carregado no processo
+# pai antes do fork dos workers (compartilhado por copy-on-write)
+STT_PRELOAD: bool = os.getenv("STT_PRELOAD", "false").lower() == "true"
+# STT_MMAP_WEIGHTS: Whisper lido de um arquivo de pesos float32 mapeado em
+# memória (gerado em STT_WEIGHTS_DIR no primeiro uso); processos que carregam
+# o mesmo modelo compartilham as páginas do arquivo
+STT_MMAP_WEIGHTS: bool = os.getenv("STT_MMAP_WEIGHTS", "false").lower() == "true"
+STT_WEIGHTS_DIR: str = os.getenv("STT_WEIGHTS_DIR", os.path.expanduser("~/.cache/sidekick/stt"))
+# Micro-batching: agrupa transcrições concorrentes por até MAX_WAIT_MS
+STT_BATCHING: bool = os.getenv("STT_BATCHING", "true").lower() == "true"
+STT_BATCH_MAX_SIZE: int = int(os.getenv("STT_BATCH_MAX_SIZE", "8"))
+STT_BATCH_MAX_WAIT_MS: float = float(os.getenv("STT_BATCH_MAX_WAIT_MS", "25"))
+# Roteamento adaptativo: com STT_ROUTE_MODELS (ex.: "tiny,base,small") cada
+# resposta usa o maior modelo cuja latência prevista (duração do áudio, fila de
+# STT e velocidade medida de cada modelo) cabe em STT_LATENCY_SLO_SECONDS.
+# Vazio: sempre STT_MODEL_SIZE.
+STT_ROUTE_MODELS: list = [s.strip() for s in os.getenv("STT_ROUTE_MODELS", "").split(",") if s.strip()]
+STT_LATENCY_SLO_SECONDS: float = float(os.getenv("STT_LATENCY_SLO_SECONDS", "5"))
+# Respostas longas: cortadas nos silêncios em pedaços de ~TARGET (máx. MAX)
+# segundos, transcritos em paralelo no pool de CPU (um pedaço por worker).
+# OVERLAP só é usado quando não há silêncio para cortar (sem partir palavras).
+STT_CHUNKING: bool = os.getenv("STT_CHUNKING", "true").lower() == "true"
+STT_CHUNK_MIN_SECONDS: float = float(os.getenv("STT_CHUNK_MIN_SECONDS", "40"))
+STT_CHUNK_TARGET_SECONDS: float = float(os.getenv("STT_CHUNK_TARGET_SECONDS", "20"))
+STT_CHUNK_MAX_SECONDS: float = float(os.getenv("STT_CHUNK_MAX_SECONDS", "30"))
+STT_CHUNK_OVERLAP_SECONDS: float = float(os.getenv("STT_CHUNK_OVERLAP_SECONDS", "1"))
+
+# ------------------------
+# VAD (remoção de silêncio antes do STT)
+# ------------------------
+VAD_ENABLED: bool = os.getenv("VAD_ENABLED", "true").lower() == "true"
+VAD_FRAME_MS: int = int(os.getenv("VAD_FRAME_MS", "30"))
+VAD_MARGIN_DB: float = float(os.getenv("VAD_MARGIN_DB", "12"))
+VAD_MIN_DB: float = float(os.getenv("VAD_MIN_DB", "-45"))
+VAD_PAD_MS: int = int(os.getenv("VAD_PAD_MS", "210"))
+VAD_MIN_SPEECH_MS: int = int(os.getenv("VAD_MIN_SPEECH_MS", "120"))
+
+# ------------------------
+# Jobs assíncronos (/jobs)
+# ------------------------
+JOB_STORE: str = os.getenv("JOB_STORE", "memory")  # memory, sqlite
+JOB_DB_PATH: str = os.getenv("JOB_DB_PATH", "tmp/jobs.sqlite3")
+JOB_TTL_SECONDS: int = int(os.getenv("JOB_TTL_SECONDS", "3600"))
+JOB_CONCURRENCY: int = int(os.getenv("JOB_CONCURRENCY", "2"))
+JOB_MAX_QUEUED: int = int(os.getenv("JOB_MAX_QUEUED", "32"))
+
+# ------------------------
+# Sessões de entrevista (estado por session id)
+# ------------------------
+SESSION_STORE: str = os.getenv("SESSION_STORE", "memory")  # memory, sqlite
+SESSION_DB_PATH: str = os.getenv("SESSION_DB_PATH", "tmp/sessions.sqlite3")
+SESSION_TTL_SECONDS: int = int(os.getenv("SESSION_TTL_SECONDS", "7200"))
+# Intervalo mínimo entre limpezas das sessões expiradas (feitas ao criar sessões)
+SESSION_PURGE_INTERVAL_SECONDS: float = float(os.getenv("SESSION_PURGE_INTERVAL_SECONDS", "60"))
+
+# ------------------------
+# Transcrição em streaming (WebSocket /ws/transcribe)
+# ------------------------
+STREAM_WINDOW_SECONDS: float = float(os.getenv("STREAM_WINDOW_SECONDS", "10"))
+STREAM_STEP_SECONDS: float = float(os.getenv("STREAM_STEP_SECONDS", "1"))
+STREAM_OVERLAP_SECONDS: float = float(os.getenv("STREAM_OVERLAP_SECONDS", "1"))
+STREAM_MAX_SESSIONS: int = int(os.getenv("STREAM_MAX_SESSIONS", "8"))
+
+# ------------------------
+# Text to Speech e cache de áudio TTS
+# ------------------------
+# TTS_ENGINE: gtts (rede), espeak-ng ou piper (locais, offline) ou fake
+# (áudio mudo determinístico, sem rede; testes e benchmarks)
+# TTS_FALLBACK: motor usado quando o principal falha (se estiver instalado)
+# TTS_CONCURRENCY=0 usa o limite padrão do motor (gtts 4, locais = núcleos)
+TTS_ENGINE: str = os.getenv("TTS_ENGINE", "gtts")
+TTS_FALLBACK: str = os.getenv("TTS_FALLBACK", "espeak-ng")
+TTS_CONCURRENCY: int = int(os.getenv("TTS_CONCURRENCY", "0"))
+TTS_TIMEOUT_SECONDS: float = float(os.getenv("TTS_TIMEOUT_SECONDS", "10"))
+TTS_ESPEAK_BIN: str = os.getenv("TTS_ESPEAK_BIN", "espeak-ng")
+TTS_ESPEAK_VOICE: str = os.getenv("TTS_ESPEAK_VOICE", "")  # vazio: derivada do idioma
+TTS_ESPEAK_SPEED: int = int(os.getenv("TTS_ESPEAK_SPEED", "160"))  # palavras por minuto
+TTS_PIPER_BIN: str = os.getenv("TTS_PIPER_BIN", "piper")
+TTS_PIPER_MODEL: str = os.getenv("TTS_PIPER_MODEL", "")
+TTS_CACHE_DIR: str = os.getenv("TTS_CACHE_DIR", "tmp/audio")
+TTS_CACHE_MAX_BYTES: int = int(os.getenv("TTS_CACHE_MAX_BYTES", str(50 * 1024 * 1024)))
+TTS_CACHE_MAX_ENTRIES: int = int(os.getenv("TTS_CACHE_MAX_ENTRIES", "512"))
+TTS_PREWARM: bool = os.getenv("TTS_PREWARM", "false").lower() == "true"
+
+# ------------------------
+# Codecs de saída (app.utils.audio_encoder)
+# ------------------------
+# TTS_OUTPUT_CODEC: formato em que o áudio das perguntas é guardado e servido
+# (opus = Opus em OGG, webm, mp3 ou wav; vazio mantém o formato do motor)
+# ANSWER_ARCHIVE: guarda o áudio de cada resposta (answer_<id>) em TTS_CACHE_DIR
+# AUDIO_OPUS_BITRATE: voz mono; 24k é ~10x menor que WAV 16 kHz e ~25% menor que o MP3 do gTTS
+TTS_OUTPUT_CODEC: str = os.getenv("TTS_OUTPUT_CODEC", "opus")
+ANSWER_ARCHIVE: bool = os.getenv("ANSWER_ARCHIVE", "false").lower() == "true"
+ANSWER_ARCHIVE_CODEC: str = os.getenv("ANSWER_ARCHIVE_CODEC", "opus")
+AUDIO_OPUS_BITRATE: str = os.getenv("AUDIO_OPUS_BITRATE", "24k")
+AUDIO_MP3_BITRATE: str = os.getenv("AUDIO_MP3_BITRATE", "32k")
+
+# ------------------------
+# Resumo (GPT) e cache de resumos
+# ------------------------
+# SUMMARY_ENGINE: "llm" (OpenAI) ou "extractive" (local, NumPy, sem rede)
+# SUMMARY_FALLBACK: motor usado se o principal falhar/estourar o prazo ("" desliga)
+SUMMARY_ENGINE: str = os.getenv("SUMMARY_ENGINE", "llm")
+SUMMARY_FALLBACK: str = os.getenv("SUMMARY_FALLBACK", "extractive")
+SUMMARY_MAX_SENTENCES: int = int(os.getenv("SUMMARY_MAX_SENTENCES", "3"))
+SUMMARY_MODEL: str = os.getenv("SUMMARY_MODEL", "gpt-3.5-turbo")
+SUMMARY_TEMPERATURE: float = float(os.getenv("SUMMARY_TEMPERATURE", "0.7"))
+SUMMARY_CACHE_MAX_ENTRIES: int = int(os.getenv("SUMMARY_CACHE_MAX_ENTRIES", "1024"))
+SUMMARY_CACHE_STORE: str = os.getenv("SUMMARY_CACHE_STORE", "memory")  # memory | sqlite
+SUMMARY_CACHE_DB_PATH: str = os.getenv("SUMMARY_CACHE_DB_PATH", "tmp/summaries.sqlite3")
+SUMMARY_CACHE_TTL_SECONDS: int = int(os.getenv("SUMMARY_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+
+# ------------------------
+# Cliente LLM (HTTP assíncrono com pool, retries e circuit breaker)
+# ------------------------
+# LLM_TIMEOUT_SECONDS: limite de cada tentativa
+# LLM_DEADLINE_SECONDS: limite total da chamada, somando retries e backoff
+# LLM_BREAKER_*: falhas seguidas que abrem o circuito e tempo até testar de novo
+LLM_BASE_URL: str = os.getenv("LLM_BASE_URL", "https://api.openai.com/v1")
+LLM_TIMEOUT_SECONDS: float = float(os.getenv("LLM_TIMEOUT_SECONDS", "8"))
+LLM_DEADLINE_SECONDS: float = float(os.getenv("LLM_DEADLINE_SECONDS", "20"))
+LLM_MAX_RETRIES: int = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_BACKOFF_SECONDS: float = float(os.getenv("LLM_BACKOFF_SECONDS", "0.5"))
+LLM_MAX_CONCURRENCY: int = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+LLM_MAX_CONNECTIONS: int = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+LLM_BREAKER_THRESHOLD: int = int(os.getenv("LLM_BREAKER_THRESHOLD", "5"))
+LLM_BREAKER_RESET_SECONDS: float = float(os.getenv("LLM_BREAKER_RESET_SECONDS", "30"))
+
+# ------------------------
+# Arquivos temporários (TTL, quota e limpeza em background)
+# ------------------------
+ARTIFACT_ROOT: str = os.getenv("ARTIFACT_ROOT", "tmp")
+ARTIFACT_TTL_SECONDS: int = int(os.getenv("ARTIFACT_TTL_SECONDS", str(24 * 3600)))
+ARTIFACT_MAX_BYTES: int = int(os.getenv("ARTIFACT_MAX_BYTES", str(500 * 1024 * 1024)))
+ARTIFACT_MAX_FILES: int = int(os.getenv("ARTIFACT_MAX_FILES", "5000"))
+ARTIFACT_SWEEP_INTERVAL_SECONDS: float = float(os.getenv("ARTIFACT_SWEEP_INTERVAL_SECONDS", "300"))
+
+# ------------------------
+# Entrega de áudio (/play_audio)
+# ------------------------
+AUDIO_HOT_CACHE_MAX_BYTES: int = int(os.getenv("AUDIO_HOT_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+AUDIO_HOT_CACHE_MAX_FILE_BYTES: int = int(os.getenv("AUDIO_HOT_CACHE_MAX_FILE_BYTES", str(1024 * 1024)))
+AUDIO_CHUNK_BYTES: int = int(os.getenv("AUDIO_CHUNK_BYTES", str(64 * 1024)))
+AUDIO_IMMUTABLE_MAX_AGE: int = int(os.getenv("AUDIO_IMMUTABLE_MAX_AGE", str(365 * 24 * 3600)))
+# ETags (sha256) guardadas dos áudios não endereçados por conteúdo (LRU)
+AUDIO_ETAG_CACHE_MAX_ENTRIES: int = int(os.getenv("AUDIO_ETAG_CACHE_MAX_ENTRIES", "1024"))
+
+# ------------------------
+# Upload de áudio
+# ------------------------
+UPLOAD_MAX_BYTES: int = int(os.getenv("UPLOAD_MAX_BYTES", str(5 * 1024 * 1024)))
+
 # ------------------------
 # Validação básica
 # ------------------------
-if not OPENAI_API_KEY:
+# Sem chave, o resumo só funciona com um motor local (principal ou fallback)
+if not OPENAI_API_KEY and SUMMARY_ENGINE == "llm" and not SUMMARY_FALLBACK:
     raise ValueError("❌ Variável de ambiente OPENAI_API_KEY não encontrada no .env")
 
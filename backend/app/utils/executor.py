@@ -0,0 +1,156 @@
+"""
+executor.py - Execução do pipeline fora do event loop
+-----------------------------------------------------
+- Pool de threads limitado para etapas de I/O (ffmpeg, gTTS, OpenAI)
+- Pool de processos limitado para etapas de CPU (Whisper)
+- Controle de admissão: quando a fila enche, a requisição é recusada
+  com PipelineBusyError (mapeado para 503 + Retry-After nos endpoints)
+
+Assim um Whisper de 10 segundos não congela /api/health nem /play_audio.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager
+from functools import partial
+
+from app.utils import config, metrics
+
+logger = logging.getLogger(__name__)
+
+
+class PipelineBusyError(Exception):
+    """Fila do pipeline cheia; o cliente deve tentar novamente mais tarde."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Pipeline ocupado, tente novamente em {retry_after}s")
+        self.retry_after = retry_after
+
+
+# ------------------------
+# Estado do módulo (um conjunto de pools por processo)
+# ------------------------
+_io_pool = None
+_cpu_pool = None
+_pending_jobs = 0
+
+
+def _get_io_pool() -> ThreadPoolExecutor:
+    global _io_pool
+    if _io_pool is None:
+        _io_pool = ThreadPoolExecutor(
+            max_workers=config.IO_WORKERS, thread_name_prefix="pipeline-io"
+        )
+        logger.info(f"Pool de I/O criado com {config.IO_WORKERS} threads")
+    return _io_pool
+
+
+def _get_cpu_pool():
+    global _cpu_pool
+    if _cpu_pool is None:
+        if config.CPU_EXECUTOR == "thread":
+            _cpu_pool = ThreadPoolExecutor(
+                max_workers=config.CPU_WORKERS, thread_name_prefix="pipeline-cpu"
+            )
+        else:
+            _cpu_pool = ProcessPoolExecutor(
+                max_workers=config.CPU_WORKERS,
+                mp_context=multiprocessing.get_context(config.CPU_START_METHOD),
+            )
+        logger.info(
+            f"Pool de CPU criado ({config.CPU_EXECUTOR}) com {config.CPU_WORKERS} workers"
+        )
+    return _cpu_pool
+
+
+# ------------------------
+# Controle de admissão (backpressure)
+# ------------------------
+@asynccontextmanager
+async def admission():
+    """
+    Reserva uma vaga no pipeline durante o bloco.
+
+    Levanta PipelineBusyError imediatamente se já houver MAX_PENDING_JOBS
+    requisições em andamento, em vez de enfileirar sem limite.
+    """
+    global _pending_jobs
+    if _pending_jobs >= config.MAX_PENDING_JOBS:
+        logger.warning(f"Pipeline cheio ({_pending_jobs} jobs), recusando requisição")
+        REJECTED.inc()
+        raise PipelineBusyError(config.RETRY_AFTER_SECONDS)
+    _pending_jobs += 1
+    try:
+        yield
+    finally:
+        _pending_jobs -= 1
+
+
+PENDING_JOBS = metrics.Gauge(
+    "sidekick_pipeline_pending_jobs",
+    "Requisições em andamento no pipeline (MAX_PENDING_JOBS é o limite)",
+    fn=lambda: _pending_jobs,
+)
+REJECTED = metrics.Counter(
+    "sidekick_pipeline_rejected_total",
+    "Requisições recusadas por backpressure (503)",
+)
+
+
+def stats() -> dict:
+    """Ocupação atual do pipeline (usado em /api/health)."""
+    return {
+        "pending_jobs": _pending_jobs,
+        "max_pending_jobs": config.MAX_PENDING_JOBS,
+        "io_workers": config.IO_WORKERS,
+        "cpu_workers": config.CPU_WORKERS,
+        "cpu_executor": config.CPU_EXECUTOR,
+    }
+
+
+# ------------------------
+# Execução das etapas
+# ------------------------
+async def run_io(func, *args, **kwargs):
+    """Executa uma etapa bloqueante de I/O no pool de threads."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_io_pool(), partial(func, *args, **kwargs))
+
+
+def submit_io(func, *args, **kwargs) -> Future:
+    """
+    Versão síncrona de run_io: agenda no mesmo pool de I/O e retorna o Future.
+    Não chamar de dentro do próprio pool esperando o resultado (deadlock se lotado).
+    """
+    return _get_io_pool().submit(func, *args, **kwargs)
+
+
+async def run_cpu(func, *args, **kwargs):
+    """
+    Executa uma etapa CPU-bound no pool de processos.
+
+    `func` precisa ser uma função de módulo (picklable). Se um worker morrer,
+    o pool é recriado na próxima chamada.
+    """
+    global _cpu_pool
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(_get_cpu_pool(), partial(func, *args, **kwargs))
+    except BrokenProcessPool:
+        logger.error("Pool de CPU quebrado, será recriado na próxima chamada")
+        _cpu_pool = None
+        raise
+
+
+def shutdown():
+    """Encerra os pools (chamado no shutdown da aplicação)."""
+    global _io_pool, _cpu_pool
+    for pool in (_io_pool, _cpu_pool):
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+    _io_pool = None
+    _cpu_pool = None
+    logger.info("Pools do pipeline encerrados")
@@ -0,0 +1,222 @@
+"""
+metrics.py - Métricas no formato de texto do Prometheus
+-------------------------------------------------------
+Instrumentos leves, sem dependências externas, expostos em GET /metrics:
+- Counter: contadores (erros, acertos de cache...);
+- Histogram: distribuição de latências (buckets cumulativos, soma e contagem);
+- Gauge: valores instantâneos (fila do pipeline, bytes em tmp...).
+
+No caminho quente, inc()/observe() custam um lock e uma soma (o bucket
+é achado por busca binária); a formatação do texto só acontece na coleta.
+Counter e Gauge aceitam `fn`: uma função lida apenas na coleta, que
+reaproveita os contadores que os serviços já mantêm (ex.: stats() dos
+caches) sem custo extra por requisição.
+
+Cada módulo declara seus instrumentos no topo, como o logger:
+    ERRORS = metrics.Counter("sidekick_x_errors_total", "Falhas de x")
+    ERRORS.inc()
+Instrumentos compartilhados pelos pipelines (STAGE_SECONDS, ERRORS) ficam aqui.
+
+Em CPU_EXECUTOR=process, o que roda nos workers (ex.: o modelo de STT)
+não aparece aqui: as medidas são feitas no processo da API, em volta das
+chamadas ao pool.
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+# Buckets de latência em segundos (5 ms a 60 s)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Registry:
+    """Conjunto de métricas renderizado em /metrics (ordem de registro)."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Métrica já registrada: {metric.name}")
+            self._metrics[metric.name] = metric
+
+    def get(self, name: str):
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames=(), registry: Registry = REGISTRY):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}  # tupla de labels -> valor
+        self._lock = threading.Lock()
+        if registry is not None:
+            registry.register(self)
+
+    def _key(self, labels: dict) -> tuple:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} espera os labels {self.labelnames}")
+        return tuple(labels[name] for name in self.labelnames)
+
+
+class _ValueMetric(_Metric):
+    """Base de Counter e Gauge: valor por labels ou lido de `fn` na coleta."""
+
+    def __init__(self, name: str, help: str, labelnames=(), fn=None, registry: Registry = REGISTRY):
+        super().__init__(name, help, labelnames, registry)
+        # fn() retorna um número ou, com labels, {tupla de labels: número}
+        self.fn = fn
+        if not self.labelnames:
+            # Sem labels a série existe desde o início (valor 0)
+            self._values[()] = 0.0
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        key = self._key(labels)
+        return self.collect().get(key, 0.0)
+
+    def collect(self) -> dict:
+        if self.fn is None:
+            with self._lock:
+                return dict(self._values)
+        values = self.fn()
+        return values if isinstance(values, dict) else {(): values}
+
+    def render(self) -> list:
+        return [
+            f"{self.name}{_labels(self.labelnames, key)} {_number(value)}"
+            for key, value in self.collect().items()
+        ]
+
+
+class Counter(_ValueMetric):
+    kind = "counter"
+
+
+class Gauge(_ValueMetric):
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames=(), buckets=LATENCY_BUCKETS,
+                 registry: Registry = REGISTRY):
+        super().__init__(name, help, labelnames, registry)
+        self.buckets = tuple(sorted(buckets))
+        if not self.labelnames:
+            self._values[()] = self._new_state()
+
+    def _new_state(self) -> list:
+        # contagens por bucket (+ último = acima do maior bucket) e soma
+        return [[0] * (len(self.buckets) + 1), 0.0]
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = self._new_state()
+            state[0][index] += 1
+            state[1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """Observa a duração (s) do bloco, inclusive quando ele falha."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels) -> int:
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            return sum(state[0]) if state else 0
+
+    def render(self) -> list:
+        with self._lock:
+            snapshot = {key: (list(counts), total) for key, (counts, total) in self._values.items()}
+        lines = []
+        for key, (counts, total) in snapshot.items():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                le = _labels(self.labelnames, key, f'le="{_number(bound)}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            labels = _labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_number(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+# ------------------------
+# Instrumentos compartilhados
+# ------------------------
+STAGE_SECONDS = Histogram(
+    "sidekick_stage_seconds",
+    "Duração de cada etapa do processamento de respostas",
+    ("pipeline", "stage"),
+)
+ERRORS = Counter(
+    "sidekick_errors_total",
+    "Falhas por componente",
+    ("component",),
+)
+
+
+def render() -> str:
+    """Texto de todas as métricas registradas (GET /metrics)."""
+    return REGISTRY.render()
@@ -0,0 +1,75 @@
+"""
+task_graph.py - Execução de etapas como grafo de dependências
+-------------------------------------------------------------
+Cada etapa declara de quais outras depende; as que não dependem entre si
+rodam ao mesmo tempo (ex.: TTS da próxima pergunta em paralelo com
+decode → VAD → STT → resumo). A latência total passa a ser a do ramo mais
+longo, não a soma das etapas.
+
+Uso:
+    graph = TaskGraph(on_stage)
+    graph.add("decode", decode)
+    graph.add("stt", lambda decode: transcribe(decode), deps=("decode",))
+    results = await graph.run()      # {"decode": ..., "stt": ...}
+    graph.timings                    # {"decode": 12.3, "stt": 840.1} (ms)
+
+Se uma etapa falha, as demais são canceladas e a exceção original sobe.
+"""
+
+import asyncio
+import time
+
+
+class TaskGraph:
+    """Grafo acíclico de etapas assíncronas."""
+
+    def __init__(self, on_stage=None):
+        # on_stage: coroutine `await on_stage(etapa, status)` com
+        # status "running", "done" ou "error"
+        self.on_stage = on_stage
+        self.timings = {}
+        self._nodes = {}  # nome -> (fn, deps)
+
+    def add(self, name: str, fn, deps=()):
+        """
+        Registra uma etapa. `fn` é uma coroutine function que recebe os
+        resultados das dependências como argumentos nomeados.
+        """
+        missing = [dep for dep in deps if dep not in self._nodes]
+        if missing:
+            raise ValueError(f"Etapa '{name}' depende de etapas não registradas: {missing}")
+        self._nodes[name] = (fn, tuple(deps))
+
+    async def _notify(self, name: str, status: str):
+        if self.on_stage is not None:
+            await self.on_stage(name, status)
+
+    async def _run_node(self, name: str, tasks: dict):
+        fn, deps = self._nodes[name]
+        inputs = {dep: await tasks[dep] for dep in deps}
+        await self._notify(name, "running")
+        start = time.perf_counter()
+        try:
+            result = await fn(**inputs)
+        except Exception:
+            await self._notify(name, "error")
+            raise
+        finally:
+            self.timings[name] = round((time.perf_counter() - start) * 1000, 1)
+        await self._notify(name, "done")
+        return result
+
+    async def run(self) -> dict:
+        """Executa o grafo e retorna {etapa: resultado}."""
+        tasks = {}
+        for name in self._nodes:
+            tasks[name] = asyncio.ensure_future(self._run_node(name, tasks))
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            # Aguarda os cancelamentos para não deixar tasks órfãs
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+        return {name: task.result() for name, task in tasks.items()}
@@ -0,0 +1,196 @@
+"""
+ttl_store.py - Armazenamento chave → JSON com expiração (TTL)
+-------------------------------------------------------------
+Base comum dos stores plugáveis (jobs, sessões de entrevista):
+- MemoryTTLStore: dicionário no processo (padrão, mais rápido).
+- SQLiteTTLStore: arquivo SQLite em modo WAL; compartilhado entre
+  workers/processos da mesma máquina e preservado entre restarts.
+
+Valores são dicionários serializáveis em JSON. Cada escrita renova o TTL.
+update() faz leitura-modificação-escrita atômica (lock no processo ou
+transação IMMEDIATE no SQLite), evitando corrida entre workers.
+
+Uma conexão SQLite não pode atravessar um fork (app.serve importa a API
+antes de criar os workers): cada processo abre a sua no primeiro uso.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import weakref
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+class TTLStore:
+    """Interface dos stores com expiração."""
+
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+
+    def get(self, key: str):
+        raise NotImplementedError
+
+    def set(self, key: str, value: dict):
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        raise NotImplementedError
+
+    def update(self, key: str, fn):
+        """
+        Aplica `fn(valor_atual_ou_None) -> novo_valor` de forma atômica
+        e retorna o novo valor.
+        """
+        raise NotImplementedError
+
+    def purge_expired(self) -> int:
+        raise NotImplementedError
+
+
+class MemoryTTLStore(TTLStore):
+    """Store em memória, protegido por lock (pode ser usado de threads)."""
+
+    def __init__(self, ttl_seconds: int):
+        super().__init__(ttl_seconds)
+        self._items = {}
+        self._lock = threading.Lock()
+
+    def _get_unlocked(self, key: str):
+        entry = self._items.get(key)
+        if entry is None:
+            return None
+        expires_at, payload = entry
+        if expires_at < time.time():
+            del self._items[key]
+            return None
+        return json.loads(payload)
+
+    def _set_unlocked(self, key: str, value: dict):
+        self._items[key] = (time.time() + self.ttl_seconds, json.dumps(value))
+
+    def get(self, key: str):
+        with self._lock:
+            return self._get_unlocked(key)
+
+    def set(self, key: str, value: dict):
+        with self._lock:
+            self._set_unlocked(key, value)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._items.pop(key, None)
+
+    def update(self, key: str, fn):
+        with self._lock:
+            value = fn(self._get_unlocked(key))
+            self._set_unlocked(key, value)
+            return value
+
+    def purge_expired(self) -> int:
+        now = time.time()
+        with self._lock:
+            expired = [key for key, (exp, _) in self._items.items() if exp < now]
+            for key in expired:
+                del self._items[key]
+        return len(expired)
+
+
+class SQLiteTTLStore(TTLStore):
+    """Store em arquivo SQLite local (substituto simples de um banco externo)."""
+
+    def __init__(self, ttl_seconds: int, db_path: str, table: str):
+        super().__init__(ttl_seconds)
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.db_path = db_path
+        self.table = table
+        self._lock = threading.Lock()
+        self._connection = None
+        self._pid = None
+        # Conexões herdadas do pai: mantidas abertas e nunca usadas (fechá-las
+        # no filho poderia fazer checkpoint/apagar o WAL em uso pelo pai)
+        self._inherited = []
+        ref = weakref.ref(self)
+        os.register_at_fork(after_in_child=lambda: ref() and ref()._after_fork())
+        with self._lock:
+            self._conn  # cria a tabela já na construção
+
+    def _after_fork(self):
+        # No filho só existe a thread que chamou fork: o lock pode ter sido herdado ocupado
+        self._lock = threading.Lock()
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        """Conexão deste processo (aberta no primeiro uso após import ou fork)."""
+        if self._pid != os.getpid():
+            if self._connection is not None:
+                self._inherited.append(self._connection)
+            # isolation_level=None: transações controladas explicitamente
+            self._connection = sqlite3.connect(
+                self.db_path, check_same_thread=False, timeout=30, isolation_level=None
+            )
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                "key TEXT PRIMARY KEY, payload TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._pid = os.getpid()
+        return self._connection
+
+    def _get_unlocked(self, key: str):
+        row = self._conn.execute(
+            f"SELECT payload FROM {self.table} WHERE key = ? AND expires_at >= ?",
+            (key, time.time()),
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _set_unlocked(self, key: str, value: dict):
+        self._conn.execute(
+            f"INSERT OR REPLACE INTO {self.table} (key, payload, expires_at) VALUES (?, ?, ?)",
+            (key, json.dumps(value), time.time() + self.ttl_seconds),
+        )
+
+    def get(self, key: str):
+        with self._lock:
+            return self._get_unlocked(key)
+
+    def set(self, key: str, value: dict):
+        with self._lock:
+            self._set_unlocked(key, value)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+
+    def update(self, key: str, fn):
+        with self._lock:
+            # IMMEDIATE: bloqueia outros escritores (inclusive de outros processos)
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                value = fn(self._get_unlocked(key))
+                self._set_unlocked(key, value)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            return value
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            cursor = self._conn.execute(
+                f"DELETE FROM {self.table} WHERE expires_at < ?", (time.time(),)
+            )
+        return cursor.rowcount
+
+
+def create_store(backend: str, ttl_seconds: int, db_path: str, table: str) -> TTLStore:
+    """Cria o store do backend indicado ("memory" ou "sqlite")."""
+    if backend == "sqlite":
+        return SQLiteTTLStore(ttl_seconds, db_path, table)
+    if backend != "memory":
+        logger.warning(f"Store desconhecido '{backend}', usando memória")
+    return MemoryTTLStore(ttl_seconds)
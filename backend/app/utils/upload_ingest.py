@@ -0,0 +1,256 @@
+"""
+upload_ingest.py - Recebimento de áudio em streaming
+----------------------------------------------------
+Lê o corpo da requisição chunk a chunk (sem UploadFile/spool em disco):
+- Rejeita de imediato se o Content-Length declarado passa de UPLOAD_MAX_BYTES
+  e aborta assim que a contagem real de bytes ultrapassa o limite.
+- Identifica o container pelos primeiros bytes (magic bytes), sem confiar
+  no content_type enviado pelo cliente.
+- Alimenta o ffmpeg (StreamDecoder) enquanto o upload chega: o áudio
+  nunca é copiado inteiro para a memória, só o PCM decodificado.
+
+Aceita multipart/form-data (campo "audio", como o frontend envia) ou o
+áudio bruto no corpo (Content-Type audio/* ou application/octet-stream).
+"""
+
+import logging
+
+import numpy as np
+import python_multipart
+from fastapi import Request
+from python_multipart.exceptions import MultipartParseError
+from python_multipart.multipart import parse_options_header
+
+from app.utils import config, metrics
+from app.utils.audio_decoder import AudioDecodeError, StreamDecoder
+
+logger = logging.getLogger(__name__)
+
+FIELD_NAME = "audio"
+
+# Bytes necessários para identificar todos os containers abaixo
+_SNIFF_BYTES = 12
+
+# Margem do corpo inteiro sobre o limite do áudio (cabeçalhos e campos do multipart)
+_MULTIPART_MARGIN_BYTES = 64 * 1024
+# Limite de cada nome/valor de cabeçalho de uma parte do multipart
+_MAX_PART_HEADER_BYTES = 2 * 1024
+
+# Corpo documentado no OpenAPI (o endpoint lê o stream diretamente)
+OPENAPI_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "properties": {FIELD_NAME: {"type": "string", "format": "binary"}},
+                    "required": [FIELD_NAME],
+                }
+            }
+        },
+    }
+}
+
+
+UPLOAD_BYTES = metrics.Counter(
+    "sidekick_upload_bytes_total",
+    "Bytes de áudio recebidos, por container",
+    ("container",),
+)
+REJECTED = metrics.Counter(
+    "sidekick_upload_rejected_total",
+    "Uploads recusados (tamanho, formato ou decodificação)",
+    ("reason",),
+)
+
+
+class UploadTooLargeError(Exception):
+    """O upload passou de UPLOAD_MAX_BYTES."""
+
+
+class UnsupportedMediaError(Exception):
+    """O conteúdo recebido não é um container de áudio reconhecido."""
+
+
+def sniff_container(head: bytes):
+    """
+    Identifica o container pelos magic bytes.
+
+    Retorna:
+    -------
+    str | None
+        "wav", "webm", "ogg", "mp3", "flac", "mp4" ou None se desconhecido.
+    """
+    if head[:4] == b"RIFF" and head[8:12] == b"WAVE":
+        return "wav"
+    if head[:4] == b"\x1a\x45\xdf\xa3":
+        return "webm"
+    if head[:4] == b"OggS":
+        return "ogg"
+    if head[:4] == b"fLaC":
+        return "flac"
+    if head[4:8] == b"ftyp":
+        return "mp4"
+    if head[:3] == b"ID3" or (len(head) >= 2 and head[0] == 0xFF and head[1] & 0xE0 == 0xE0):
+        return "mp3"
+    return None
+
+
+class _AudioSink:
+    """Recebe os bytes do áudio, valida o início e repassa ao ffmpeg."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.received = 0
+        self.container = None
+        self._head = bytearray()
+        self._decoder = None
+
+    async def write(self, data: bytes):
+        self.received += len(data)
+        if self.received > self.max_bytes:
+            raise UploadTooLargeError(
+                f"Áudio maior que o limite de {self.max_bytes} bytes"
+            )
+        if self._decoder is not None:
+            await self._decoder.feed(data)
+            return
+        self._head.extend(data)
+        if len(self._head) >= _SNIFF_BYTES:
+            await self._start()
+
+    async def _start(self):
+        self.container = sniff_container(bytes(self._head[:_SNIFF_BYTES]))
+        if self.container is None:
+            raise UnsupportedMediaError("Formato de áudio não reconhecido")
+        self._decoder = StreamDecoder(low_latency=False)
+        await self._decoder.start()
+        await self._decoder.feed(bytes(self._head))
+        self._head.clear()
+
+    async def finish(self) -> np.ndarray:
+        if self._decoder is None:
+            if not self._head:
+                raise AudioDecodeError("Áudio vazio")
+            await self._start()
+        audio = await self._decoder.close()
+        if self._decoder.returncode != 0:
+            raise AudioDecodeError(f"ffmpeg não decodificou o {self.container}")
+        return audio
+
+    def abort(self):
+        if self._decoder is not None:
+            self._decoder.kill()
+
+
+class _MultipartAudio:
+    """Extrai do multipart apenas os bytes do campo de áudio."""
+
+    def __init__(self, boundary: bytes):
+        self.pending = []
+        self.found = False
+        self._in_audio = False
+        self._header_field = bytearray()
+        self._header_value = bytearray()
+        self._headers = {}
+        self.parser = python_multipart.MultipartParser(boundary, {
+            "on_part_begin": self._on_part_begin,
+            "on_part_data": self._on_part_data,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+        })
+
+    def _on_part_begin(self):
+        self._headers = {}
+        self._in_audio = False
+
+    @staticmethod
+    def _extend_header(buffer: bytearray, data: bytes):
+        if len(buffer) + len(data) > _MAX_PART_HEADER_BYTES:
+            raise UploadTooLargeError(
+                f"Cabeçalho do multipart maior que {_MAX_PART_HEADER_BYTES} bytes"
+            )
+        buffer.extend(data)
+
+    def _on_header_field(self, data, start, end):
+        self._extend_header(self._header_field, data[start:end])
+
+    def _on_header_value(self, data, start, end):
+        self._extend_header(self._header_value, data[start:end])
+
+    def _on_header_end(self):
+        self._headers[bytes(self._header_field).lower()] = bytes(self._header_value)
+        self._header_field.clear()
+        self._header_value.clear()
+
+    def _on_headers_finished(self):
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        name = options.get(b"name", b"").decode("latin-1")
+        self._in_audio = not self.found and name == FIELD_NAME
+        self.found = self.found or self._in_audio
+
+    def _on_part_data(self, data, start, end):
+        if self._in_audio:
+            self.pending.append(data[start:end])
+
+
+async def read_audio(request: Request, max_bytes: int = None) -> np.ndarray:
+    """
+    Recebe o áudio do corpo da requisição e o decodifica durante o upload.
+
+    Retorna:
+    -------
+    np.ndarray
+        PCM float32, mono, 16 kHz.
+
+    Levanta UploadTooLargeError, UnsupportedMediaError ou AudioDecodeError.
+    """
+    max_bytes = max_bytes or config.UPLOAD_MAX_BYTES
+    # O corpo inteiro conta (campos fora do áudio também), com margem para o multipart
+    max_body_bytes = max_bytes + _MULTIPART_MARGIN_BYTES
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > max_body_bytes:
+        raise UploadTooLargeError(f"Upload de {declared} bytes excede o limite")
+
+    content_type, options = parse_options_header(request.headers.get("content-type", ""))
+    form = None
+    if content_type == b"multipart/form-data":
+        if b"boundary" not in options:
+            raise UnsupportedMediaError("Multipart sem boundary")
+        form = _MultipartAudio(options[b"boundary"])
+
+    sink = _AudioSink(max_bytes)
+    body_bytes = 0
+    try:
+        async for chunk in request.stream():
+            # Sem Content-Length (chunked) o limite só pode ser checado aqui
+            body_bytes += len(chunk)
+            if body_bytes > max_body_bytes:
+                raise UploadTooLargeError(f"Upload maior que o limite de {max_body_bytes} bytes")
+            if form is None:
+                await sink.write(chunk)
+                continue
+            try:
+                form.parser.write(chunk)
+            except MultipartParseError as e:
+                # Versões recentes do python-multipart já limitam os cabeçalhos
+                raise UnsupportedMediaError(f"Multipart inválido: {e}") from e
+            for data in form.pending:
+                await sink.write(data)
+            form.pending.clear()
+        if form is not None:
+            form.parser.finalize()
+            if not form.found:
+                raise UnsupportedMediaError(f"Campo '{FIELD_NAME}' não enviado")
+        audio = await sink.finish()
+    except Exception as e:
+        sink.abort()
+        REJECTED.inc(reason=type(e).__name__)
+        raise
+
+    UPLOAD_BYTES.inc(sink.received, container=sink.container)
+    logger.info(f"Upload recebido: {sink.received} bytes ({sink.container})")
+    return audio
@@ -0,0 +1,4 @@
+"""
+Benchmarks e testes de carga do pipeline de entrevista.
+Execute a partir de backend/: python -m benchmarks.run --help
+"""
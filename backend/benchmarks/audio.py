@@ -0,0 +1,85 @@
+"""
+audio.py - Áudio sintético para benchmarks
+------------------------------------------
+Gera respostas "faladas" de duração configurável sem arquivos externos:
+rajadas harmônicas com envelope de sílaba (o VAD as trata como voz)
+separadas por pausas curtas, sobre um piso de ruído baixo.
+
+O container/codec é escolhido como no navegador (webm/ogg com Opus),
+ou wav, mp3 e flac; a codificação usa o mesmo ffmpeg do backend.
+"""
+
+import io
+import subprocess
+import wave
+
+import numpy as np
+
+from app.utils.audio_decoder import FFMPEG_EXE, SAMPLE_RATE
+
+# Argumentos de saída do ffmpeg por codec (wav é escrito direto em Python)
+CODECS = {
+    "wav": None,
+    "webm": ["-c:a", "libopus", "-b:a", "32k", "-f", "webm"],
+    "ogg": ["-c:a", "libopus", "-b:a", "32k", "-f", "ogg"],
+    "mp3": ["-c:a", "libmp3lame", "-b:a", "64k", "-f", "mp3"],
+    "flac": ["-c:a", "flac", "-f", "flac"],
+}
+
+
+def speech_like(seconds: float, sample_rate: int = SAMPLE_RATE, seed: int = 0) -> np.ndarray:
+    """
+    PCM float32 mono que imita fala: "palavras" de 0,15-0,5 s com pitch
+    variável e pausas de 0,05-0,3 s. Mesma semente → mesmo áudio.
+    """
+    rng = np.random.default_rng(seed)
+    total = int(seconds * sample_rate)
+    audio = rng.normal(0, 0.002, total).astype(np.float32)  # piso de ruído
+    pos = int(rng.uniform(0.1, 0.3) * sample_rate)
+    while pos < total:
+        length = min(int(rng.uniform(0.15, 0.5) * sample_rate), total - pos)
+        t = np.arange(length) / sample_rate
+        pitch = rng.uniform(100, 220)
+        voice = sum(np.sin(2 * np.pi * pitch * k * t) / k for k in range(1, 5))
+        # Envelope de sílabas (~5 Hz) dentro da palavra
+        envelope = np.sin(np.pi * np.arange(length) / length) * (
+            0.6 + 0.4 * np.abs(np.sin(2 * np.pi * 5 * t))
+        )
+        audio[pos:pos + length] += (0.2 * voice * envelope).astype(np.float32)
+        pos += length + int(rng.uniform(0.05, 0.3) * sample_rate)
+    return np.clip(audio, -1, 1)
+
+
+def to_wav(pcm: np.ndarray, sample_rate: int = SAMPLE_RATE) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes((pcm * 32767).astype(np.int16).tobytes())
+    return buffer.getvalue()
+
+
+def encode(pcm: np.ndarray, codec: str = "wav", sample_rate: int = SAMPLE_RATE) -> bytes:
+    """Codifica o PCM no container pedido (ver CODECS)."""
+    if codec not in CODECS:
+        raise ValueError(f"Codec desconhecido: {codec} (disponíveis: {sorted(CODECS)})")
+    if CODECS[codec] is None:
+        return to_wav(pcm, sample_rate)
+    proc = subprocess.run(
+        [
+            FFMPEG_EXE, "-hide_banner", "-loglevel", "error",
+            "-f", "s16le", "-ar", str(sample_rate), "-ac", "1", "-i", "pipe:0",
+            *CODECS[codec], "pipe:1",
+        ],
+        input=(pcm * 32767).astype(np.int16).tobytes(),
+        capture_output=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"ffmpeg não codificou {codec}: {proc.stderr.decode(errors='ignore')}")
+    return proc.stdout
+
+
+def make_answer(seconds: float, codec: str = "wav", seed: int = 0) -> bytes:
+    """Resposta sintética pronta para enviar ao /answer."""
+    return encode(speech_like(seconds, seed=seed), codec)
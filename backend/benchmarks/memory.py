@@ -0,0 +1,238 @@
+"""
+memory.py - Memória por worker com e sem o modelo compartilhado
+---------------------------------------------------------------
+Sobe a API com app.serve em dois modos e mede a memória de cada processo
+(pai e workers) depois do warmup e de algumas requisições /answer:
+- preload: o pai carrega o modelo e os workers o herdam (copy-on-write);
+- no-preload: cada worker carrega a própria cópia.
+
+Por processo (Linux, /proc/<pid>/smaps_rollup):
+- rss: páginas residentes, contando as compartilhadas em cada processo;
+- pss: rss com cada página compartilhada dividida entre os processos que
+  a usam (a soma é a memória real do conjunto);
+- private: páginas só deste processo (o custo de um worker a mais).
+
+Exemplos (a partir de backend/):
+    python -m benchmarks.memory --workers 4 --stt whisper --model base
+    python -m benchmarks.memory --modes preload --workers 1,2,4 --output mem.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from benchmarks import audio
+
+MODES = ("preload", "no-preload")
+
+# Estabilidade do RSS: variação máxima (MB) entre duas amostras seguidas
+_SETTLE_MB = 1.0
+_SETTLE_INTERVAL_SECONDS = 0.5
+
+
+# ------------------------
+# Medidas
+# ------------------------
+def read_memory(pid: int) -> dict:
+    """rss, pss, shared e private (MB) de `pid`; {} se indisponível."""
+    fields = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) == 3 and parts[2] == "kB":
+                    fields[parts[0].rstrip(":")] = int(parts[1])
+    except OSError:
+        return {}
+    mb = lambda *names: round(sum(fields.get(name, 0) for name in names) / 1024, 1)  # noqa: E731
+    return {
+        "rss": mb("Rss"),
+        "pss": mb("Pss"),
+        "shared": mb("Shared_Clean", "Shared_Dirty"),
+        "private": mb("Private_Clean", "Private_Dirty"),
+    }
+
+
+def child_pids(pid: int) -> list:
+    """PIDs dos filhos diretos de `pid` (varre /proc/*/stat)."""
+    children = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # O nome do processo (2º campo) pode ter espaços: o ppid vem após o ")"
+        if int(stat.rsplit(")", 1)[1].split()[1]) == pid:
+            children.append(int(entry))
+    return sorted(children)
+
+
+def summarize(parent: dict, workers: list) -> dict:
+    """Totais do conjunto e custo médio de cada worker."""
+    processes = [parent, *workers]
+    return {
+        "total_rss_mb": round(sum(p.get("rss", 0) for p in processes), 1),
+        "total_pss_mb": round(sum(p.get("pss", 0) for p in processes), 1),
+        "worker_private_mb": round(
+            sum(p.get("private", 0) for p in workers) / len(workers), 1
+        ) if workers else 0.0,
+        "worker_pss_mb": round(
+            sum(p.get("pss", 0) for p in workers) / len(workers), 1
+        ) if workers else 0.0,
+    }
+
+
+# ------------------------
+# Execução
+# ------------------------
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_ready(url: str, parent: int, workers: int, timeout: float):
+    """Espera a API responder, os workers existirem e o RSS estabilizar."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{url}/api/health", timeout=2).status_code == 200:
+                break
+        except httpx.HTTPError:
+            pass
+        time.sleep(_SETTLE_INTERVAL_SECONDS)
+    else:
+        raise RuntimeError(f"API não respondeu em {timeout}s")
+
+    previous = None
+    while time.monotonic() < deadline:
+        pids = child_pids(parent)
+        current = [read_memory(pid).get("rss", 0) for pid in pids]
+        if len(pids) >= workers and previous is not None and len(previous) == len(current) and all(
+            abs(a - b) <= _SETTLE_MB for a, b in zip(previous, current)
+        ):
+            return
+        previous = current
+        time.sleep(_SETTLE_INTERVAL_SECONDS)
+    raise RuntimeError(f"Workers não estabilizaram em {timeout}s")
+
+
+def _snapshot(parent: int) -> dict:
+    workers = [read_memory(pid) for pid in child_pids(parent)]
+    parent_memory = read_memory(parent)
+    return {"parent": parent_memory, "workers": workers, **summarize(parent_memory, workers)}
+
+
+def run_mode(mode: str, workers: int, args) -> dict:
+    """Sobe app.serve em `mode` com `workers` workers e mede a memória."""
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}"
+    env = dict(os.environ)
+    env.setdefault("STT_ENGINE", args.stt)
+    env.setdefault("STT_MODEL_SIZE", args.model)
+    env.setdefault("SUMMARY_ENGINE", "extractive")
+    env.setdefault("TTS_ENGINE", "fake")
+    env.setdefault("TTS_CACHE_DIR", tempfile.mkdtemp(prefix="bench_tts_"))
+    command = [
+        sys.executable, "-m", "app.serve", "--host", "127.0.0.1", "--port", str(port),
+        "--workers", str(workers), "--log-level", "warning",
+    ]
+    if mode == "no-preload":
+        command.append("--no-preload")
+
+    started = time.perf_counter()
+    server = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        _wait_ready(url, server.pid, workers, args.timeout)
+        ready_seconds = round(time.perf_counter() - started, 2)
+        idle = _snapshot(server.pid)
+
+        answer = audio.make_answer(args.seconds, "wav")
+        statuses = {}
+        for _ in range(args.requests):
+            files = {"audio": ("answer.wav", answer, "audio/wav")}
+            status = str(httpx.post(f"{url}/answer", files=files, timeout=args.timeout).status_code)
+            statuses[status] = statuses.get(status, 0) + 1
+        return {
+            "mode": mode,
+            "workers": workers,
+            "ready_seconds": ready_seconds,
+            "idle": idle,
+            "after_requests": {"status": statuses, **_snapshot(server.pid)},
+        }
+    finally:
+        server.send_signal(signal.SIGTERM)
+        try:
+            server.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+
+# ------------------------
+# CLI
+# ------------------------
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Memória por worker com e sem preload do modelo")
+    parser.add_argument("--modes", default=",".join(MODES), help="preload, no-preload")
+    parser.add_argument("--workers", default="2,4", help="quantidades de workers, ex.: 1,2,4")
+    parser.add_argument("--stt", default="whisper", help="STT_ENGINE (whisper, fake...)")
+    parser.add_argument("--model", default="base", help="STT_MODEL_SIZE")
+    parser.add_argument("--requests", type=int, default=4, help="/answer antes da 2ª medida")
+    parser.add_argument("--seconds", type=float, default=5.0, help="duração do áudio de resposta")
+    parser.add_argument("--timeout", type=float, default=300.0, help="limite para subir a API (s)")
+    parser.add_argument("--output", help="arquivo JSON de saída (padrão: stdout)")
+    args = parser.parse_args(argv)
+    args.modes = [m for m in args.modes.split(",") if m]
+    unknown = set(args.modes) - set(MODES)
+    if unknown:
+        parser.error(f"Modos desconhecidos: {sorted(unknown)}")
+    args.workers = [int(w) for w in args.workers.split(",") if w]
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = []
+    for mode in args.modes:
+        for workers in args.workers:
+            result = run_mode(mode, workers, args)
+            after = result["after_requests"]
+            print(
+                f"{mode:>10} w={workers:<3} total_pss={after['total_pss_mb']}MB "
+                f"worker_private={after['worker_private_mb']}MB {after['status']}",
+                file=sys.stderr,
+            )
+            results.append(result)
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "stt": {"engine": args.stt, "model_size": args.model},
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
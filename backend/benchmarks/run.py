@@ -0,0 +1,308 @@
+"""
+run.py - Benchmark e teste de carga ponta a ponta
+-------------------------------------------------
+Dispara /answer, /play_audio e /next_question em níveis de concorrência
+fixos (loop fechado: N clientes, cada um envia a próxima requisição assim
+que a anterior termina) e imprime um JSON com, por endpoint × concorrência:
+- latência p50/p95/p99/média/máxima (ms) e vazão (req/s);
+- contagem de status HTTP (503 = backpressure, ver MAX_PENDING_JOBS);
+- RSS do processo da API (antes, depois e pico amostrado);
+- tempos por etapa do /answer (decode, vad, stt, summary, tts).
+
+Alvos:
+- em processo (padrão): importa app.main e chama a API via ASGI, sem rede.
+  Os motores vêm de --stt/--summary/--tts; o padrão é o conjunto fake
+  (STT fake, resumo extrativo, TTS mudo), que mede só o overhead do
+  pipeline. Use --stt whisper --summary llm --tts gtts para os reais.
+- servidor externo (--url): mede a API já rodando; os motores são os
+  dela e o RSS só é medido com --server-pid.
+
+Exemplos (a partir de backend/):
+    python -m benchmarks.run --concurrency 1,4,8 --requests 40
+    python -m benchmarks.run --codec webm --seconds 15 --output bench.json
+    python -m benchmarks.run --url http://localhost:8000 --server-pid 1234
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks import audio
+
+ENDPOINTS = ("answer", "play_audio", "next_question")
+
+_PERCENTILES = (50, 95, 99)
+
+# Intervalo de amostragem do RSS durante um cenário
+_RSS_SAMPLE_SECONDS = 0.05
+
+
+# ------------------------
+# Medidas
+# ------------------------
+def summarize_latencies(values: list) -> dict:
+    """Percentis, média e máximo de uma lista de latências (ms)."""
+    if not values:
+        return {}
+    data = np.asarray(values, dtype=np.float64)
+    result = {f"p{p}": round(float(np.percentile(data, p)), 1) for p in _PERCENTILES}
+    result["mean"] = round(float(data.mean()), 1)
+    result["max"] = round(float(data.max()), 1)
+    return result
+
+
+def read_rss_mb(pid: int = None):
+    """RSS atual de `pid` (padrão: este processo) em MB; None se indisponível."""
+    try:
+        with open(f"/proc/{pid or os.getpid()}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    if pid is None:
+        # Fora do Linux: pico do processo (KB no Linux, bytes no macOS)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+    return None
+
+
+class RSSSampler:
+    """Amostra o RSS em background para registrar o pico do cenário."""
+
+    def __init__(self, pid: int = None):
+        self.pid = pid
+        self.peak = None
+        self._task = None
+
+    async def _sample(self):
+        while True:
+            rss = read_rss_mb(self.pid)
+            if rss is not None:
+                self.peak = max(self.peak or 0, rss)
+            await asyncio.sleep(_RSS_SAMPLE_SECONDS)
+
+    def start(self):
+        self._task = asyncio.create_task(self._sample())
+
+    async def stop(self):
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+
+
+# ------------------------
+# Requisições
+# ------------------------
+class Workload:
+    """Monta a requisição de cada endpoint e coleta os tempos por etapa."""
+
+    def __init__(self, client, answer_bytes: bytes, codec: str):
+        self.client = client
+        self.answer_bytes = answer_bytes
+        self.filename = f"answer.{codec}"
+        self.audio_file = None  # servido pelo /play_audio
+
+    async def prepare(self):
+        """Um /answer inicial: aquece os caches e obtém um áudio para /play_audio."""
+        response = await self.answer()
+        if response.status_code != 200:
+            raise RuntimeError(f"/answer inicial falhou: {response.status_code} {response.text}")
+        self.audio_file = response.json().get("next_question_audio")
+
+    async def answer(self):
+        files = {"audio": (self.filename, self.answer_bytes, "application/octet-stream")}
+        return await self.client.post("/answer", files=files)
+
+    async def play_audio(self):
+        return await self.client.get(f"/play_audio/{self.audio_file}")
+
+    async def next_question(self):
+        return await self.client.get("/next_question")
+
+
+async def run_scenario(workload: Workload, endpoint: str, concurrency: int,
+                       requests: int, server_pid: int = None) -> dict:
+    """Executa `requests` chamadas a `endpoint` com `concurrency` clientes."""
+    call = getattr(workload, endpoint)
+    latencies, statuses, stages = [], {}, {}
+    remaining = iter(range(requests))
+
+    async def client_loop():
+        for _ in remaining:
+            start = time.perf_counter()
+            try:
+                response = await call()
+                status = str(response.status_code)
+            except Exception as e:
+                response, status = None, type(e).__name__
+            elapsed = (time.perf_counter() - start) * 1000
+            statuses[status] = statuses.get(status, 0) + 1
+            if status != "200":
+                continue
+            latencies.append(elapsed)
+            if endpoint == "answer":
+                for stage, ms in response.json().get("timings", {}).items():
+                    stages.setdefault(stage, []).append(ms)
+
+    sampler = RSSSampler(server_pid)
+    rss_before = read_rss_mb(server_pid)
+    sampler.start()
+    start = time.perf_counter()
+    await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+    duration = time.perf_counter() - start
+    await sampler.stop()
+
+    return {
+        "endpoint": endpoint,
+        "concurrency": concurrency,
+        "requests": requests,
+        "ok": len(latencies),
+        "status": statuses,
+        "duration_s": round(duration, 3),
+        "throughput_rps": round(len(latencies) / duration, 2) if duration else 0.0,
+        "latency_ms": summarize_latencies(latencies),
+        "stages_ms": {stage: summarize_latencies(values) for stage, values in stages.items()},
+        "rss_mb": {"before": rss_before, "after": read_rss_mb(server_pid), "peak": sampler.peak},
+    }
+
+
+# ------------------------
+# Alvos
+# ------------------------
+def configure_backends(args):
+    """
+    Seleciona os motores do processo atual antes de importar a API
+    (a configuração é lida no import). Variáveis já definidas prevalecem.
+    """
+    os.environ.setdefault("STT_ENGINE", args.stt)
+    os.environ.setdefault("SUMMARY_ENGINE", args.summary)
+    os.environ.setdefault("TTS_ENGINE", args.tts)
+    # Áudios do benchmark não se misturam com o cache TTS da aplicação
+    os.environ.setdefault("TTS_CACHE_DIR", tempfile.mkdtemp(prefix="bench_tts_"))
+    os.environ.setdefault("STT_WARMUP_ON_STARTUP", "false")
+    os.environ.setdefault("TTS_PREWARM", "false")
+
+
+async def _run(args, client, backends: dict, server_pid: int = None) -> dict:
+    answer_bytes = audio.make_answer(args.seconds, args.codec)
+    workload = Workload(client, answer_bytes, args.codec)
+    await workload.prepare()
+
+    scenarios = []
+    for endpoint in args.endpoints:
+        for concurrency in args.concurrency:
+            for _ in range(args.warmup):
+                await getattr(workload, endpoint)()
+            result = await run_scenario(
+                workload, endpoint, concurrency, args.requests, server_pid
+            )
+            print(
+                f"{endpoint:>14} c={concurrency:<3} "
+                f"p50={result['latency_ms'].get('p50')}ms "
+                f"p99={result['latency_ms'].get('p99')}ms "
+                f"{result['throughput_rps']} req/s {result['status']}",
+                file=sys.stderr,
+            )
+            scenarios.append(result)
+
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "target": args.url or "in-process",
+            "backends": backends,
+            "audio": {"seconds": args.seconds, "codec": args.codec, "bytes": len(answer_bytes)},
+            "requests_per_scenario": args.requests,
+        },
+        "scenarios": scenarios,
+    }
+
+
+async def run_in_process(args) -> dict:
+    configure_backends(args)
+    import httpx
+    from app.main import app
+    from app.utils import config
+
+    backends = {
+        "stt": config.STT_ENGINE,
+        "summary": config.SUMMARY_ENGINE,
+        "tts": config.TTS_ENGINE,
+        "cpu_executor": config.CPU_EXECUTOR,
+    }
+    await app.router.startup()
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://benchmark", timeout=args.timeout
+        ) as client:
+            return await _run(args, client, backends)
+    finally:
+        await app.router.shutdown()
+
+
+async def run_remote(args) -> dict:
+    import httpx
+
+    limits = httpx.Limits(max_connections=max(args.concurrency))
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits) as client:
+        return await _run(args, client, {"remote": True}, args.server_pid)
+
+
+# ------------------------
+# CLI
+# ------------------------
+def _int_list(value: str) -> list:
+    return [int(v) for v in value.split(",") if v]
+
+
+def _endpoint_list(value: str) -> list:
+    names = [v for v in value.split(",") if v]
+    unknown = set(names) - set(ENDPOINTS)
+    if unknown:
+        raise argparse.ArgumentTypeError(f"Endpoints desconhecidos: {sorted(unknown)}")
+    return names
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark ponta a ponta do Zoom Sidekick")
+    parser.add_argument("--url", help="API já rodando (padrão: em processo via ASGI)")
+    parser.add_argument("--server-pid", type=int, help="PID da API remota para medir RSS")
+    parser.add_argument("--endpoints", type=_endpoint_list, default=list(ENDPOINTS))
+    parser.add_argument("--concurrency", type=_int_list, default=[1, 4, 8])
+    parser.add_argument("--requests", type=int, default=20, help="requisições por cenário")
+    parser.add_argument("--warmup", type=int, default=1, help="requisições descartadas por cenário")
+    parser.add_argument("--seconds", type=float, default=5.0, help="duração do áudio de resposta")
+    parser.add_argument("--codec", choices=sorted(audio.CODECS), default="webm")
+    parser.add_argument("--stt", default="fake", help="STT_ENGINE em processo (fake, whisper...)")
+    parser.add_argument("--summary", default="extractive", help="SUMMARY_ENGINE em processo")
+    parser.add_argument("--tts", default="fake", help="TTS_ENGINE em processo (fake, gtts)")
+    parser.add_argument("--timeout", type=float, default=120.0, help="timeout por requisição (s)")
+    parser.add_argument("--output", help="arquivo JSON de saída (padrão: stdout)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    runner = run_remote if args.url else run_in_process
+    report = asyncio.run(runner(args))
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,10 +5,23 @@
  * 1. Captura do microfone usando MediaRecorder API.
  * 2. Envio do áudio para o backend FastAPI via POST.
  * 3. Atualiza transcrição, resumo e toca áudio da próxima pergunta.
+ * 4. Envia os chunks por WebSocket durante a gravação e mostra a
+ *    transcrição parcial enquanto o usuário ainda está falando.
+ * 5. Mostra o resumo token a token assim que a transcrição termina.
+ *
+ * Cada resposta é processada uma única vez: com o WebSocket aberto, o
+ * resultado final, o resumo e a próxima pergunta chegam por ele; o POST
+ * /answer só é usado quando o streaming não está disponível.
  */
 
 let mediaRecorder;
 let audioChunks = [];
+let transcriptionSocket = null;
+// Entrevista atual (devolvida pelo backend; mantém o progresso das perguntas)
+let sessionId = null;
+
+// Intervalo (ms) entre chunks do MediaRecorder enviados por streaming
+const CHUNK_INTERVAL_MS = 250;
 
 const recordButton = document.getElementById("record-btn");
 const transcriptionDiv = document.getElementById("transcription");
@@ -17,6 +30,78 @@ const audioPlayer = document.getElementById("next-question-audio");
 
 // URL do backend FastAPI
 const BACKEND_URL = "http://127.0.0.1:8000";
+const BACKEND_WS_URL = BACKEND_URL.replace(/^http/, "ws");
+
+function playNextQuestion(filename) {
+    if (filename) {
+        audioPlayer.src = `${BACKEND_URL}/play_audio/${filename}`;
+        audioPlayer.play();
+    }
+}
+
+function openTranscriptionSocket() {
+    const query = sessionId ? `?session_id=${encodeURIComponent(sessionId)}` : "";
+    const socket = new WebSocket(`${BACKEND_WS_URL}/ws/transcribe${query}`);
+    socket.binaryType = "arraybuffer";
+
+    // Chunks gravados antes da conexão abrir (inclui o cabeçalho do webm)
+    socket.onopen = () => {
+        audioChunks.forEach((chunk) => socket.send(chunk));
+    };
+
+    // O resumo desta resposta começa no primeiro pedaço recebido
+    let summaryStarted = false;
+
+    socket.onmessage = (event) => {
+        const data = JSON.parse(event.data);
+        if (data.type === "summary_delta") {
+            // Resumo chega em pedaços logo após a transcrição final
+            if (!summaryStarted) {
+                summaryDiv.textContent = "";
+                summaryStarted = true;
+            }
+            summaryDiv.textContent += data.text;
+        } else if (data.type === "summary") {
+            summaryDiv.textContent = data.text || "Sem resumo";
+        } else if (data.type === "next_question") {
+            sessionId = data.session_id;
+            playNextQuestion(data.next_question_audio);
+        } else if (data.text) {
+            transcriptionDiv.textContent = data.text;
+        }
+    };
+
+    socket.onerror = (error) => {
+        console.warn("Streaming de transcrição indisponível:", error);
+    };
+
+    // Fim da resposta processada pelo streaming
+    socket.onclose = () => {
+        recordButton.disabled = false;
+    };
+
+    return socket;
+}
+
+/**
+ * Encerra o streaming. Retorna true se o backend vai processar a resposta
+ * pelo WebSocket; false se o áudio precisa ir pelo POST /answer.
+ */
+function finishTranscriptionSocket() {
+    const socket = transcriptionSocket;
+    transcriptionSocket = null;
+    if (socket && socket.readyState === WebSocket.OPEN) {
+        socket.send("stop");
+        return true;
+    }
+    if (socket) {
+        // O resultado virá do POST: mensagens atrasadas do socket são ignoradas
+        socket.onmessage = null;
+        socket.onclose = null;
+        socket.close();
+    }
+    return false;
+}
 
 async function initMicrophone() {
     try {
@@ -25,14 +110,21 @@ async function initMicrophone() {
 
         mediaRecorder.ondataavailable = (event) => {
             audioChunks.push(event.data);
+            if (transcriptionSocket && transcriptionSocket.readyState === WebSocket.OPEN) {
+                transcriptionSocket.send(event.data);
+            }
         };
 
         mediaRecorder.onstop = async () => {
+            recordButton.disabled = true; // desabilita enquanto processa
+            // O último chunk chega antes do onstop; só então encerra o streaming
+            const streamed = finishTranscriptionSocket();
             const audioBlob = new Blob(audioChunks, { type: "audio/webm" });
             audioChunks = [];
-            recordButton.disabled = true; // desabilita enquanto envia
-            await sendAudio(audioBlob);
-            recordButton.disabled = false;
+            if (!streamed) {
+                await sendAudio(audioBlob);
+                recordButton.disabled = false;
+            }
         };
     } catch (error) {
         console.error("Erro ao acessar microfone:", error);
@@ -47,6 +139,7 @@ async function sendAudio(audioBlob) {
     try {
         const response = await fetch(`${BACKEND_URL}/answer`, {
             method: "POST",
+            headers: sessionId ? { "X-Session-Id": sessionId } : {},
             body: formData
         });
 
@@ -55,16 +148,14 @@ async function sendAudio(audioBlob) {
         }
 
         const data = await response.json();
+        sessionId = data.session_id;
 
         // Atualiza a interface com a transcrição e resumo
         transcriptionDiv.textContent = data.transcription || "Sem transcrição";
         summaryDiv.textContent = data.summary || "Sem resumo";
 
         // Reproduz o áudio da próxima pergunta
-        if (data.next_question_audio) {
-            audioPlayer.src = `${BACKEND_URL}/play_audio/${data.next_question_audio}`;
-            audioPlayer.play();
-        }
+        playNextQuestion(data.next_question_audio);
 
     } catch (error) {
         console.error("Erro ao processar áudio:", error);
@@ -79,7 +170,10 @@ recordButton.addEventListener("click", () => {
     }
 
     if (mediaRecorder.state === "inactive") {
-        mediaRecorder.start();
+        transcriptionDiv.textContent = "";
+        summaryDiv.textContent = "";
+        transcriptionSocket = openTranscriptionSocket();
+        mediaRecorder.start(CHUNK_INTERVAL_MS);
         recordButton.textContent = "Parar Gravação";
     } else if (mediaRecorder.state === "recording") {
         mediaRecorder.stop();